@@ -15,12 +15,32 @@
 
 """Python client library for the IBM Cloudant"""
 
+import importlib
+import sys
+
 from ibm_cloud_sdk_core import IAMTokenManager, DetailedResponse, BaseService, ApiException, get_authenticator
 from .couchdb_session_authenticator import CouchDbSessionAuthenticator
 from .couchdb_session_get_authenticator_patch import new_construct_authenticator
-from .couchdb_session_base_service_patch import new_init, new_set_service_url, new_set_default_headers
+from .couchdb_session_base_service_patch import new_init, new_set_service_url, new_set_default_headers, \
+    new_set_http_config
 from .couchdb_session_token_manager import CouchDbSessionTokenManager
+from .prepare_request_base_service_patch import new_encode_path_vars, new_prepare_request, \
+    set_gzip_compression_level, set_gzip_compression_threshold
+from .json_codec_base_service_patch import set_json_codec
+from .connection_pool_base_service_patch import set_connection_pool
+from .post_bulk_docs_patch import new_post_bulk_docs
+from .metrics_base_service_patch import set_metrics
+from .response_cache_base_service_patch import set_response_cache
+from .rate_limiter_base_service_patch import set_rate_limiter
+from .retry_policy_base_service_patch import new_send, set_retry_policy
+from . import cloudant_v1
 from .cloudant_v1 import CloudantV1
+from .connection_pool import ConnectionPool
+from .json_codec import DeferredJsonModule, JsonCodec, OrjsonCodec, get_fastest_json_codec
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter
+from .retry_policy import RetryPolicy
+from .metrics import MetricsCollector
 
 # sdk-core's __construct_authenticator works with a long switch-case so monkey-patching is required
 get_authenticator.__construct_authenticator = new_construct_authenticator
@@ -30,3 +50,80 @@ CloudantV1.__init__ = new_init
 CloudantV1.set_service_url = new_set_service_url
 
 CloudantV1.set_default_headers = new_set_default_headers
+
+CloudantV1.set_http_config = new_set_http_config
+
+CloudantV1.prepare_request = new_prepare_request
+
+CloudantV1.set_gzip_compression_level = set_gzip_compression_level
+
+CloudantV1.set_gzip_compression_threshold = set_gzip_compression_threshold
+
+# the operations serialize their bodies with json.dumps, leave that to the codec of the client in prepare_request
+cloudant_v1.json = DeferredJsonModule()
+
+CloudantV1.encode_path_vars = staticmethod(new_encode_path_vars)
+
+CloudantV1.post_bulk_docs = new_post_bulk_docs
+
+# the send patches wrap each other, from the outside in: retries, rate limiting, response caching, metrics,
+# JSON decoding
+CloudantV1.send = new_send
+
+CloudantV1.set_response_cache = set_response_cache
+
+CloudantV1.set_rate_limiter = set_rate_limiter
+
+CloudantV1.set_retry_policy = set_retry_policy
+
+CloudantV1.set_metrics = set_metrics
+
+CloudantV1.set_json_codec = set_json_codec
+
+CloudantV1.set_connection_pool = set_connection_pool
+
+# The helpers are only imported on first access, keeping the import of the
+# package cheap for short-lived processes, in particular aiohttp is only
+# imported with AsyncCloudantV1.
+_LAZY_ATTRIBUTES = {
+    'AsyncCloudantV1': 'cloudant_v1_async',
+    'AsyncResultStream': 'result_stream',
+    'ResultStream': 'result_stream',
+    'ChangesFollower': 'changes_follower',
+    'BulkWriter': 'bulk_writer',
+    'DocumentLoader': 'document_loader',
+    'DocumentCache': 'document_cache',
+    'AllDocsScanner': 'all_docs_scanner',
+    'AllDocsPager': 'pagination',
+    'FindPager': 'pagination',
+    'SearchPager': 'pagination',
+    'ViewPager': 'pagination',
+    'CompactChangesResultItem': 'compact_models',
+    'CompactDocsResultRow': 'compact_models',
+    'CompactViewResultRow': 'compact_models',
+    'LazyAllDocsResult': 'lazy_models',
+    'LazyFindResult': 'lazy_models',
+    'LazyViewResult': 'lazy_models',
+    'SessionTokenStore': 'session_token_store',
+    'MemorySessionTokenStore': 'session_token_store',
+    'FileSessionTokenStore': 'session_token_store',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):
+    # module __getattr__ (PEP 562) is not supported
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
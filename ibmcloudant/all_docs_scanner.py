@@ -0,0 +1,269 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for scanning all documents of a database with parallel key ranges
+"""
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from .changes_follower import is_transient_error
+from .cloudant_v1 import CloudantV1, DocsResultRow
+from .result_stream import ResultStream
+
+_RESERVED_PARAMS = frozenset(['db', 'descending', 'endkey', 'inclusive_end', 'key', 'keys', 'limit', 'skip',
+                              'startkey'])
+
+# Document IDs are interpolated as numbers with this many code point digits
+_KEY_DIGITS = 12
+_KEY_BASE = 0x110000
+
+# Marks the end of the rows of a range
+_END_OF_RANGE = object()
+
+
+class _ScanError:
+    """Wrapper passing a worker error to the consumer."""
+
+    def __init__(self, err: Exception):
+        self.err = err
+
+
+def _key_to_int(key: str) -> int:
+    number = 0
+    for char in key[:_KEY_DIGITS].ljust(_KEY_DIGITS, '\0'):
+        number = number * _KEY_BASE + ord(char)
+    return number
+
+
+def _int_to_key(number: int) -> str:
+    chars = []
+    for _ in range(_KEY_DIGITS):
+        (number, code_point) = divmod(number, _KEY_BASE)
+        # surrogates cannot be encoded in a request, use the next valid code point
+        chars.append(chr(0xE000 if 0xD800 <= code_point <= 0xDFFF else code_point))
+    return ''.join(reversed(chars)).rstrip('\0')
+
+
+class AllDocsScanner:
+    """Reads all rows of a database's primary index with concurrent
+    post_all_docs_as_stream requests over disjoint document ID ranges.
+
+    The ID space between the first and the last document ID is split into
+    ``partitions`` ranges. Unless ``balanced`` is False the split points are
+    found by sampling the rank of candidate IDs, the ``offset`` of a
+    zero-row post_all_docs request, so that the ranges hold about the same
+    number of documents whatever the shape of the IDs; otherwise the ID code
+    points are interpolated evenly. The ranges are then streamed by
+    ``workers`` threads, retrying transient errors from the last ID read.
+
+    Rows are returned in document ID order when ``ordered`` is True, and in
+    the order they arrive, which is faster, otherwise. At most
+    ``buffer_size`` rows per range are held in memory.
+
+    Typical usage::
+
+        for row in AllDocsScanner(service, 'db', workers=8, include_docs=True):
+            process(row.doc)
+
+    Args:
+        service: The service client to read the rows with.
+        db: The name of the database to scan.
+
+    Keyword Args:
+        workers: The number of ranges read concurrently. Defaults to 4.
+        partitions: The number of ranges to split the IDs into.
+            Defaults to 4 times workers.
+        ordered: True to return the rows in document ID order.
+            Defaults to False.
+        balanced: False to skip sampling the ranks of the split points.
+            Defaults to True.
+        buffer_size: The maximum number of rows read ahead per range.
+            Defaults to 1000.
+        max_retries: The number of times a range is resumed after a transient
+            error. Defaults to 3.
+        **all_docs_params: Any other post_all_docs_as_stream parameters, e.g.
+            include_docs or conflicts.
+
+    Raises:
+        ValueError: A parameter managed by the scanner was supplied.
+    """
+
+    def __init__(self,
+                 service: CloudantV1,
+                 db: str,
+                 *,
+                 workers: int = 4,
+                 partitions: int = None,
+                 ordered: bool = False,
+                 balanced: bool = True,
+                 buffer_size: int = 1000,
+                 max_retries: int = 3,
+                 **all_docs_params) -> None:
+        reserved = _RESERVED_PARAMS.intersection(all_docs_params)
+        if reserved:
+            raise ValueError('The {0} parameter(s) cannot be set for an AllDocsScanner'.format(
+                ', '.join(sorted(reserved))))
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        self.service = service
+        self.db = db
+        self.workers = workers
+        self.partitions = partitions if partitions is not None else 4 * workers
+        self.ordered = ordered
+        self.balanced = balanced
+        self.buffer_size = buffer_size
+        self.max_retries = max_retries
+        self.all_docs_params = all_docs_params
+
+    def __iter__(self) -> Iterator[DocsResultRow]:
+        stopped = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='AllDocsScanner') as executor:
+            try:
+                ranges = self.ranges(executor)
+                if self.ordered:
+                    queues = [queue.Queue(self.buffer_size) for _ in ranges]
+                    for (key_range, rows) in zip(ranges, queues):
+                        executor.submit(self._scan, key_range, rows, stopped)
+                    for rows in queues:
+                        yield from self._drain(rows, 1)
+                else:
+                    rows = queue.Queue(self.buffer_size * len(ranges))
+                    for key_range in ranges:
+                        executor.submit(self._scan, key_range, rows, stopped)
+                    yield from self._drain(rows, len(ranges))
+            finally:
+                stopped.set()
+
+    def ranges(self, executor: ThreadPoolExecutor = None) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Split the document IDs into ranges.
+
+        Args:
+            executor: (optional) The executor to sample the split points with.
+
+        Returns:
+            The list of (startkey, endkey) ranges in ID order, where endkey
+            is excluded and None means unbounded.
+        """
+        first = self._first_row(descending=False)
+        last = self._first_row(descending=True)
+        if first is None or self.partitions < 2 or first['id'] == last['id']:
+            return [(None, None)]
+        (low, high) = (_key_to_int(first['id']), _key_to_int(last['id']))
+        if low >= high:
+            return [(None, None)]
+        total = last['total_rows']
+        candidates = [low + (high - low) * i // self.partitions for i in range(1, self.partitions)]
+        if self.balanced:
+            targets = [total * i // self.partitions for i in range(1, self.partitions)]
+            searches = [(low, high, target) for target in targets]
+            if executor is not None:
+                ranked = list(executor.map(lambda s: self._find_rank(*s), searches))
+            else:
+                ranked = [self._find_rank(*s) for s in searches]
+            if None not in ranked:
+                candidates = ranked
+        splits = sorted(set(_int_to_key(c) for c in candidates) - {''})
+        bounds = [None] + splits + [None]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _first_row(self, descending: bool) -> Optional[dict]:
+        result = self.service.post_all_docs(self.db, descending=descending, limit=1).get_result()
+        if not result['rows']:
+            return None
+        return dict(result['rows'][0], total_rows=result['total_rows'])
+
+    def _probe(self, key: str) -> Tuple[Optional[str], Optional[int]]:
+        """Return the first ID at or after the key and its rank, the number
+        of IDs before it."""
+        result = self.service.post_all_docs(self.db, startkey=key, limit=1).get_result()
+        return (result['rows'][0]['id'] if result['rows'] else None, result.get('offset'))
+
+    def _find_rank(self, low: int, high: int, target: int, max_probes: int = 32) -> Optional[int]:
+        """Bisect the ID space for a key with about the target rank.
+
+        A probe too low moves the lower bound to the ID found rather than to
+        the probed key, which skips over the code points no ID uses. Returns
+        None when the server does not report ranks."""
+        tolerance = max(1, target // (4 * self.partitions))
+        for _ in range(max_probes):
+            if high - low <= 1:
+                break
+            middle = (low + high) // 2
+            (found, rank) = self._probe(_int_to_key(middle))
+            if rank is None:
+                return None
+            if found is None or rank > target + tolerance:
+                high = middle
+            elif rank < target - tolerance:
+                low = max(low, _key_to_int(found))
+            else:
+                return _key_to_int(found)
+        return (low + high) // 2
+
+    def _drain(self, rows: queue.Queue, ranges: int) -> Iterator[DocsResultRow]:
+        while ranges:
+            row = rows.get()
+            if row is _END_OF_RANGE:
+                ranges -= 1
+            elif isinstance(row, _ScanError):
+                raise row.err
+            else:
+                yield row
+
+    @staticmethod
+    def _put(rows: queue.Queue, item, stopped: threading.Event) -> bool:
+        while not stopped.is_set():
+            try:
+                rows.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan(self, key_range: Tuple[Optional[str], Optional[str]], rows: queue.Queue,
+              stopped: threading.Event) -> None:
+        (startkey, endkey) = key_range
+        last_id = None
+        retries = 0
+        while not stopped.is_set():
+            try:
+                params = dict(self.all_docs_params)
+                if last_id is not None or startkey is not None:
+                    params['startkey'] = last_id if last_id is not None else startkey
+                if endkey is not None:
+                    params['endkey'] = endkey
+                    params['inclusive_end'] = False
+                response = self.service.post_all_docs_as_stream(self.db, **params)
+                with ResultStream(response, DocsResultRow) as stream:
+                    for row in stream:
+                        if row.id == last_id:
+                            # the row resumed from was already returned
+                            continue
+                        if not self._put(rows, row, stopped):
+                            return
+                        last_id = row.id
+                self._put(rows, _END_OF_RANGE, stopped)
+                return
+            except Exception as err:  # pylint: disable=broad-except
+                if retries < self.max_retries and (is_transient_error(err) or isinstance(err, ValueError)):
+                    retries += 1
+                    stopped.wait(random.uniform(0, 0.5 * 2 ** retries))
+                    continue
+                self._put(rows, _ScanError(err), stopped)
+                return
@@ -0,0 +1,206 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for batching document writes into bulk requests
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple, Union
+
+from ibm_cloud_sdk_core.utils import convert_model
+from .cloudant_v1 import CloudantV1, Document, DocumentResult
+from .json_codec import get_json_codec
+
+
+class BulkWriter:
+    """Collects individual document writes into post_bulk_docs requests.
+
+    Each call to write() returns a Future that resolves to the
+    DocumentResult of the document once its batch has been written. Note
+    that a document rejected by the server, e.g. because of a conflict,
+    resolves to a DocumentResult with the error set; the future only fails
+    when the whole request fails.
+
+    A batch is sent as soon as it holds ``batch_size`` documents, when
+    adding the next document would take its encoded size over
+    ``max_batch_bytes``, or ``flush_interval`` seconds after its first
+    document was written. Up to ``concurrency`` batches are sent at the same
+    time; write() blocks while twice that many batches are waiting to be
+    sent, which bounds the memory held by the writer.
+
+    Typical usage::
+
+        with BulkWriter(service, 'db') as writer:
+            futures = [writer.write(doc) for doc in docs]
+        results = [f.result() for f in futures]
+
+    Args:
+        service: The service client to write the documents with.
+        db: The name of the database to write to.
+
+    Keyword Args:
+        batch_size: The maximum number of documents in a request.
+            Defaults to 500.
+        max_batch_bytes: The maximum size of the encoded documents in a
+            request. Defaults to 1 MiB.
+        flush_interval: The maximum number of seconds a document waits before
+            its batch is sent. Defaults to 1.
+        concurrency: The number of requests sent concurrently. Defaults to 4.
+        new_edits: (optional) Set to False to store documents with their
+            existing revisions, as the replicator does.
+    """
+
+    def __init__(self,
+                 service: CloudantV1,
+                 db: str,
+                 *,
+                 batch_size: int = 500,
+                 max_batch_bytes: int = 1048576,
+                 flush_interval: float = 1.0,
+                 concurrency: int = 4,
+                 new_edits: bool = None) -> None:
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        self.service = service
+        self.db = db
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.new_edits = new_edits
+        self._lock = threading.Condition()
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_started = None
+        self._in_flight = []
+        self._slots = threading.BoundedSemaphore(2 * concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='BulkWriter')
+        self._timer = None
+        self._closed = False
+
+    def __enter__(self) -> 'BulkWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write(self, document: Union[Document, dict]) -> 'Future[DocumentResult]':
+        """Queue a document to be written.
+
+        Args:
+            document: The document to create, update or delete.
+
+        Returns:
+            A Future resolving to the DocumentResult of the document.
+
+        Raises:
+            ValueError: The writer has been closed.
+        """
+        encoded = get_json_codec(self.service).dumps_bytes(convert_model(document))
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise ValueError('The BulkWriter is closed')
+            if self._batch and self._batch_bytes + len(encoded) + 1 > self.max_batch_bytes:
+                self._dispatch()
+            if not self._batch:
+                self._batch_started = time.monotonic()
+                self._start_timer()
+            self._batch.append((encoded, future))
+            self._batch_bytes += len(encoded) + 1
+            if len(self._batch) >= self.batch_size:
+                self._dispatch()
+        return future
+
+    def flush(self) -> None:
+        """Send the current batch and wait for all requests in flight."""
+        with self._lock:
+            if self._batch:
+                self._dispatch()
+            in_flight = list(self._in_flight)
+        for request in in_flight:
+            request.exception()
+
+    def close(self) -> None:
+        """Flush the pending documents and release the worker threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _start_timer(self) -> None:
+        if self._timer is None:
+            self._timer = threading.Thread(target=self._flush_periodically,
+                                           name='BulkWriter-timer',
+                                           daemon=True)
+            self._timer.start()
+
+    def _flush_periodically(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._batch:
+                    self._lock.wait()
+                    continue
+                remaining = self._batch_started + self.flush_interval - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+                self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand the current batch to the executor. Called holding the lock."""
+        batch = self._batch
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_started = None
+        # Waiting for a slot releases the lock so the requests in flight can finish.
+        while not self._slots.acquire(blocking=False):
+            self._lock.wait()
+        request = self._executor.submit(self._send, batch)
+        self._in_flight.append(request)
+        request.add_done_callback(self._done)
+        self._lock.notify_all()
+
+    def _done(self, request: Future) -> None:
+        self._slots.release()
+        with self._lock:
+            self._in_flight.remove(request)
+            self._lock.notify_all()
+
+    def _send(self, batch: List[Tuple[bytes, Future]]) -> None:
+        batch = [(encoded, future) for (encoded, future) in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        body = b'{"docs":[' + b','.join(encoded for (encoded, _) in batch) + b']'
+        if self.new_edits is not None:
+            body += b',"new_edits":' + (b'true' if self.new_edits else b'false')
+        body += b'}'
+        try:
+            results = self.service.post_bulk_docs(self.db, body).get_result()
+        except Exception as err:  # pylint: disable=broad-except
+            for (_, future) in batch:
+                future.set_exception(err)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(DocumentResult.from_dict(result))
+        for (_, future) in batch[len(results):]:
+            future.set_exception(ValueError('No result was returned for the document'))
@@ -0,0 +1,326 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for following a database changes feed
+"""
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Iterator, List
+
+from requests.exceptions import RequestException
+
+from ibm_cloud_sdk_core import ApiException
+from .cloudant_v1 import ChangesResultItem, CloudantV1, Document
+from .result_stream import ResultStream
+
+logger = logging.getLogger(__name__)
+
+_RESERVED_PARAMS = frozenset(['db', 'feed', 'heartbeat', 'since', 'last_event_id'])
+
+
+def is_transient_error(err: Exception) -> bool:
+    """Return True for errors that are expected to go away when the request
+    is repeated: network errors, read timeouts and 408, 429 and 5xx status
+    codes."""
+    if isinstance(err, ApiException):
+        return err.code in (408, 429) or err.code >= 500
+    return isinstance(err, (RequestException, ConnectionError, TimeoutError))
+
+
+class _FeedError:
+    """Wrapper passing a permanent reader error to the consumer."""
+
+    def __init__(self, err: Exception):
+        self.err = err
+
+
+class ChangesFollower:
+    """Follows the changes feed of a database indefinitely.
+
+    A background thread reads a continuous changes feed with
+    post_changes_as_stream and hands the ChangesResultItems to the caller,
+    either one at a time by iterating the follower or in lists with
+    batches(). When the connection fails, times out or is closed by the
+    server the feed is resumed from the last sequence read, after an
+    exponentially increasing delay for errors.
+
+    The server sends a newline every ``heartbeat`` milliseconds while there
+    are no changes, so a connection that stays silent for longer than the
+    read timeout of the service (60 seconds unless set with set_http_config)
+    is treated as dead and reconnected. The heartbeat must therefore be
+    shorter than the read timeout. A ``since`` of 'now' is replaced by the
+    update_seq of the database before the feed is first opened, so that
+    changes made while the follower reconnects are not missed.
+
+    When a ``checkpoint_id`` is given the sequence of the last change
+    handed to the caller is stored in the ``_local/{checkpoint_id}``
+    document, at most every ``checkpoint_interval`` seconds and when the
+    follower is stopped, and a restarted follower resumes from it. A change
+    counts as processed once the caller asks for the next one, or the next
+    batch when using batches().
+
+    Args:
+        service: The service client to read the changes with.
+        db: The name of the database to follow.
+
+    Keyword Args:
+        since: The sequence to start from when there is no checkpoint.
+            Defaults to 'now'.
+        heartbeat: Milliseconds between heartbeats sent by the server.
+            Defaults to 30000.
+        batch_size: The maximum number of changes in a batch. Defaults to 500.
+        batch_wait: The maximum number of seconds to wait for a batch to fill
+            up once it holds at least one change. Defaults to 1.
+        checkpoint_id: (optional) The ID, without the _local/ prefix, of the
+            local document to persist the checkpoint in.
+        checkpoint_interval: The minimum number of seconds between checkpoint
+            writes. Defaults to 10.
+        retry_delay: The initial delay in seconds before reconnecting after
+            an error. Defaults to 1.
+        max_retry_delay: The maximum delay in seconds before reconnecting.
+            Defaults to 60.
+        **changes_params: Any other post_changes_as_stream parameters, e.g.
+            include_docs, filter or selector.
+
+    Raises:
+        ValueError: A parameter managed by the follower was supplied.
+    """
+
+    def __init__(self,
+                 service: CloudantV1,
+                 db: str,
+                 *,
+                 since: str = 'now',
+                 heartbeat: int = 30000,
+                 batch_size: int = 500,
+                 batch_wait: float = 1.0,
+                 checkpoint_id: str = None,
+                 checkpoint_interval: float = 10.0,
+                 retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0,
+                 **changes_params) -> None:
+        reserved = _RESERVED_PARAMS.intersection(changes_params)
+        if reserved:
+            raise ValueError('The {0} parameter(s) cannot be set for a ChangesFollower'.format(
+                ', '.join(sorted(reserved))))
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        self.service = service
+        self.db = db
+        self.heartbeat = heartbeat
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.checkpoint_id = checkpoint_id
+        self.checkpoint_interval = checkpoint_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.changes_params = changes_params
+        self._since = since
+        self._read_seq = since
+        self._processed_seq = None
+        self._checkpointed_seq = None
+        self._checkpoint_rev = None
+        self._last_checkpoint_time = 0.0
+        self._checkpoint_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=2 * batch_size)
+        self._stopped = threading.Event()
+        self._reader = None
+        self._response = None
+        self._last_contact = None
+
+    @property
+    def last_seq(self) -> str:
+        """The sequence of the last change handed to the caller, i.e. the
+        position the follower would resume from after a restart."""
+        return self._processed_seq if self._processed_seq is not None else self._since
+
+    @property
+    def last_contact(self) -> float:
+        """The time.monotonic() time at which the server was last heard from,
+        by a response, change or heartbeat, or None before the feed connected."""
+        return self._last_contact
+
+    def __iter__(self) -> Iterator[ChangesResultItem]:
+        for batch in self.batches():
+            for item in batch:
+                yield item
+                if item.seq is not None:
+                    self._processed_seq = item.seq
+
+    def batches(self) -> Iterator[List[ChangesResultItem]]:
+        """Return the changes in lists of up to batch_size items.
+
+        A batch is returned as soon as it is full or batch_wait seconds after
+        its first change arrived. Iteration ends when stop() is called.
+
+        Raises:
+            ApiException: The server rejected the changes request with a
+                non-transient error, e.g. because the database does not exist.
+        """
+        self._start()
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if batch:
+                yield batch
+                if batch[-1].seq is not None:
+                    self._processed_seq = batch[-1].seq
+            if self.checkpoint_id is not None:
+                now = time.monotonic()
+                if now - self._last_checkpoint_time >= self.checkpoint_interval:
+                    self._last_checkpoint_time = now
+                    self.checkpoint()
+
+    def stop(self) -> None:
+        """Stop following the changes feed and write a final checkpoint.
+
+        The reader thread notices the request at the latest with the next
+        heartbeat from the server, use join() to wait for it to finish.
+        """
+        self._stopped.set()
+        response = self._response
+        if response is not None:
+            response.close()
+        if self.checkpoint_id is not None:
+            self.checkpoint()
+
+    def join(self, timeout: float = None) -> None:
+        """Wait until the reader thread has finished after stop() was called.
+
+        Args:
+            timeout: (optional) The maximum number of seconds to wait.
+        """
+        if self._reader is not None:
+            self._reader.join(timeout)
+
+    def checkpoint(self) -> None:
+        """Persist the sequence of the last processed change to the checkpoint
+        document, if it changed since the last write."""
+        if self.checkpoint_id is None:
+            raise ValueError('No checkpoint_id was configured')
+        with self._checkpoint_lock:
+            seq = self._processed_seq
+            if seq is None or seq == self._checkpointed_seq:
+                return
+            document = Document(rev=self._checkpoint_rev, seq=seq)
+            result = self.service.put_local_document(self.db, self.checkpoint_id, document).get_result()
+            self._checkpoint_rev = result.get('rev')
+            self._checkpointed_seq = seq
+
+    def _load_checkpoint(self) -> None:
+        try:
+            result = self.service.get_local_document(self.db, self.checkpoint_id).get_result()
+        except ApiException as err:
+            if err.code == 404:
+                return
+            raise
+        self._checkpoint_rev = result.get('_rev')
+        if result.get('seq') is not None:
+            self._since = self._read_seq = self._checkpointed_seq = result['seq']
+
+    def _start(self) -> None:
+        if self._reader is not None:
+            return
+        if self.checkpoint_id is not None:
+            self._load_checkpoint()
+            self._last_checkpoint_time = time.monotonic()
+        self._reader = threading.Thread(target=self._follow,
+                                        name='ChangesFollower-{0}'.format(self.db),
+                                        daemon=True)
+        self._reader.start()
+
+    def _next_batch(self) -> List[ChangesResultItem]:
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size and not self._stopped.is_set():
+            if deadline is None:
+                timeout = 1.0
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is not None:
+                    break
+                continue
+            if isinstance(item, _FeedError):
+                self._stopped.set()
+                raise item.err
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.batch_wait
+        return batch
+
+    def _put(self, item) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def _chunks(self, response) -> Iterator[bytes]:
+        try:
+            for chunk in response.iter_content(chunk_size=None):
+                if self._stopped.is_set():
+                    return
+                self._last_contact = time.monotonic()
+                yield chunk
+        finally:
+            self._response = None
+            response.close()
+
+    def _follow(self) -> None:
+        delay = self.retry_delay
+        while not self._stopped.is_set():
+            response = None
+            try:
+                if self._read_seq == 'now':
+                    # a feed reconnecting with since=now would skip the
+                    # changes made while it was disconnected
+                    self._read_seq = self.service.get_database_information(self.db).get_result()['update_seq']
+                response = self.service.post_changes_as_stream(self.db,
+                                                               feed='continuous',
+                                                               heartbeat=self.heartbeat,
+                                                               since=self._read_seq,
+                                                               **self.changes_params).get_result()
+                self._response = response
+                self._last_contact = time.monotonic()
+                stream = ResultStream(self._chunks(response), ChangesResultItem, continuous=True)
+                for item in stream:
+                    if item.seq is not None:
+                        self._read_seq = item.seq
+                    self._put(item)
+                    delay = self.retry_delay
+                if stream.last_seq is not None:
+                    self._read_seq = stream.last_seq
+            except Exception as err:  # pylint: disable=broad-except
+                if self._stopped.is_set():
+                    return
+                # a ValueError once the response has arrived means it was truncated
+                truncated = response is not None and isinstance(err, ValueError)
+                if not (truncated or is_transient_error(err)):
+                    self._put(_FeedError(err))
+                    return
+                logger.warning('Changes feed for %s interrupted, resuming from %s in %.1fs: %s',
+                               self.db, self._read_seq, delay, err)
+                # full jitter keeps a fleet of followers from reconnecting in lockstep
+                self._stopped.wait(random.uniform(0, delay))
+                delay = min(delay * 2, self.max_retry_delay)
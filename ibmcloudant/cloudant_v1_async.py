@@ -0,0 +1,359 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for the asyncio client of the Cloudant V1 service
+"""
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+
+from requests import Request
+from requests.cookies import RequestsCookieJar, get_cookie_header
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+from ibm_cloud_sdk_core.authenticators import Authenticator
+from .cloudant_v1 import CloudantV1
+from .common import get_operation_id
+from .json_codec import JsonCodec, get_json_codec
+from .metrics import RequestRecord
+from .metrics_base_service_patch import request_record
+from .prepare_request_base_service_patch import new_prepare_request
+from .streamed_body import StreamedBody
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncCloudantV1(CloudantV1):
+    """The Cloudant V1 service for asyncio applications.
+
+    Every operation of CloudantV1 is available with the same parameters, but
+    returns a coroutine that resolves to the DetailedResponse::
+
+        async with AsyncCloudantV1(authenticator) as service:
+            service.set_service_url('https://~replace-with-cloudant-host~.cloudantnosqldb.appdomain.cloud')
+            response = await service.get_document(db='db', doc_id='doc1')
+            document = response.get_result()
+
+    Requests are sent with aiohttp over a connection pool shared by all
+    operations of the client. The result of the *_as_stream operations is
+    the unread aiohttp.ClientResponse, whose rows can be iterated with
+    ``async for`` by wrapping the DetailedResponse in an AsyncResultStream.
+
+    Authenticator tokens, including CouchDbSessionAuthenticator session
+    cookies, are fetched or refreshed in the default executor so that the
+    event loop is never blocked. Concurrent requests that find the token
+    stale share a single refresh.
+
+    The RetryPolicy, RateLimiter and MetricsCollector set with
+    set_retry_policy, set_rate_limiter and set_metrics apply as for
+    CloudantV1, waiting with asyncio.sleep. A response cache and a
+    ConnectionPool are not supported and their setters raise
+    NotImplementedError.
+
+    Args:
+        authenticator: The authenticator specifies the authentication mechanism.
+
+    Keyword Args:
+        max_connections: The maximum number of open connections.
+            Defaults to 100.
+        max_connections_per_host: The maximum number of open connections to
+            the same host, 0 for no limit. Defaults to 0.
+
+    Raises:
+        ImportError: The aiohttp package is not installed.
+    """
+
+    def __init__(self,
+                 authenticator: Authenticator = None,
+                 *,
+                 max_connections: int = 100,
+                 max_connections_per_host: int = 0) -> None:
+        if aiohttp is None:
+            raise ImportError('AsyncCloudantV1 requires the aiohttp package, install ibmcloudant[async]')
+        super().__init__(authenticator)
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._session = None
+        self._auth_lock = None
+
+    async def __aenter__(self) -> 'AsyncCloudantV1':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the connections of the pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def prepare_request(self, method: str, url: str, **kwargs) -> dict:
+        """Capture the arguments of a request, which is prepared by send once
+        the authenticator token is known to be fresh.
+
+        Args:
+            method: The HTTP method of the request ex. GET, POST, etc.
+            url: The origin + pathname according to WHATWG spec.
+
+        Returns:
+            The arguments of BaseService.prepare_request.
+        """
+        return dict(kwargs, method=method, url=url)
+
+    def send(self, request: dict, **kwargs) -> 'asyncio.Future[DetailedResponse]':
+        """Send a request and wrap the response in a DetailedResponse or
+        ApiException.
+
+        Args:
+            request: The arguments returned by prepare_request.
+
+        Returns:
+            A coroutine resolving to the DetailedResponse.
+        """
+        return self._send(request, **kwargs)
+
+    async def _send(self, request_args: dict, **kwargs) -> DetailedResponse:
+        await self._refresh_token()
+        request = new_prepare_request(self, **request_args)
+        policy = getattr(self, 'retry_policy', None)
+        state = policy.start(request) if policy is not None else None
+        if state is None:
+            return await self._send_limited(request, kwargs)
+        while True:
+            timeout = state.attempt_timeout()
+            if timeout is not None:
+                kwargs['timeout'] = timeout
+            try:
+                return await self._send_limited(request, kwargs)
+            except Exception as err:  # pylint: disable=broad-except
+                delay = state.retry_delay(err)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _send_limited(self, request: dict, kwargs: Dict[str, Any]) -> DetailedResponse:
+        """Send a request once a token of the rate limiter is due."""
+        limiter = getattr(self, 'rate_limiter', None)
+        if limiter is None:
+            return await self._send_measured(request, kwargs)
+        operation_id = get_operation_id(request['headers'])
+        wait = limiter.reserve(operation_id)
+        if wait:
+            await asyncio.sleep(wait)
+        try:
+            return await self._send_measured(request, kwargs)
+        except ApiException as err:
+            if err.code == 429:
+                limiter.throttle(operation_id)
+            raise
+
+    async def _send_measured(self, request: dict, kwargs: Dict[str, Any]) -> DetailedResponse:
+        """Send a request, recording it with the metrics collector."""
+        collector = getattr(self, 'metrics', None)
+        if collector is None:
+            return await self._send_request(request, kwargs)
+        exchange = {}
+        start = time.perf_counter()
+        status_code = None
+        try:
+            result = await self._send_request(request, kwargs, exchange)
+            status_code = result.get_status_code()
+            return result
+        except ApiException as err:
+            status_code = err.code
+            raise
+        finally:
+            collector.record(_record(request, exchange, status_code, start))
+
+    async def _send_request(self, request: dict, kwargs: Dict[str, Any], exchange: dict = None) -> DetailedResponse:
+        """Send a request with aiohttp.
+
+        Args:
+            request: The request returned by prepare_request.
+            kwargs: The requests options of the request.
+            exchange: (optional) A dict the response, the time its headers
+                arrived and the size of its body are stored in.
+        """
+        if exchange is None:
+            exchange = {}
+        start = time.perf_counter()
+        kwargs = dict({'timeout': 60}, **kwargs)
+        kwargs = dict(kwargs, **self.http_config)
+        stream_response = kwargs.get('stream') or False
+        headers = dict(request['headers'])
+        if self.jar is not None and len(self.jar) > 0:
+            # The jar is copied as the session jar has no usable cookie policy.
+            jar = RequestsCookieJar()
+            jar.update(self.jar)
+            cookie = get_cookie_header(jar, Request(request['method'], request['url']))
+            if cookie:
+                headers['Cookie'] = cookie
+        try:
+            response = await self._get_session().request(request['method'],
+                                                          request['url'],
+                                                          params=request['params'] or None,
+                                                          data=_async_body(request['data']),
+                                                          headers=headers,
+                                                          **self._request_options(request['url'], kwargs))
+            exchange['response'] = response
+            exchange['time_to_first_byte'] = time.perf_counter() - start
+            if 200 <= response.status <= 299:
+                if response.status == 204 or request['method'] == 'HEAD':
+                    # There is no body content for a HEAD request or a 204 response
+                    response.release()
+                    exchange['response_bytes'] = 0
+                    result = None
+                elif stream_response:
+                    result = response
+                else:
+                    body = await response.read()
+                    exchange['response_bytes'] = len(body)
+                    if not body:
+                        result = None
+                    else:
+                        try:
+                            result = get_json_codec(self).loads(body)
+                        except ValueError:
+                            result = response
+                return DetailedResponse(response=result, headers=response.headers, status_code=response.status)
+            body = await response.read()
+            exchange['response_bytes'] = len(body)
+            message = _get_error_message(response.status, body, get_json_codec(self))
+            raise ApiException(response.status, message=message, http_response=response)
+        except ApiException as err:
+            logging.exception(err.message)
+            raise
+        except:
+            logging.exception('Error in service call')
+            raise
+
+    def set_response_cache(self, cache: Any) -> None:
+        """Not supported, the responses of AsyncCloudantV1 are not cached.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError('AsyncCloudantV1 does not support a response cache')
+
+    def set_connection_pool(self, pool: Any) -> None:
+        """Not supported, the connection pool of AsyncCloudantV1 is sized
+        with the max_connections and max_connections_per_host arguments.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError('AsyncCloudantV1 does not support set_connection_pool, '
+                                  'use its max_connections arguments')
+
+    async def _refresh_token(self) -> None:
+        """Fetch a missing or stale token without blocking the event loop."""
+        token_manager = getattr(self.authenticator, 'token_manager', None)
+        if token_manager is None or not _token_is_stale(token_manager):
+            return
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if _token_is_stale(token_manager):
+                await asyncio.get_event_loop().run_in_executor(None, token_manager.get_token)
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections_per_host)
+            # Cookies are sent from the jar shared with the authenticator.
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    def _request_options(self, url: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate the requests options of http_config for aiohttp."""
+        timeout = kwargs.get('timeout')
+        if isinstance(timeout, tuple):
+            (connect_timeout, read_timeout) = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+        options = {
+            'timeout': aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout),
+            'allow_redirects': kwargs.get('allow_redirects', True),
+        }
+        if self.disable_ssl_verification or kwargs.get('verify') is False:
+            options['ssl'] = False
+        proxies = kwargs.get('proxies')
+        if proxies:
+            options['proxy'] = proxies.get(url.split(':', 1)[0])
+        return options
+
+
+def _async_body(data: Any) -> Any:
+    """Return a streamed body as an async generator, which aiohttp sends
+    with chunked transfer encoding."""
+    if not isinstance(data, StreamedBody):
+        return data
+
+    async def chunks():
+        for chunk in data:
+            yield chunk
+    return chunks()
+
+
+def _record(request: dict, exchange: dict, status_code: Optional[int], start: float) -> RequestRecord:
+    response = exchange.get('response')
+    if response is not None:
+        # the status on the wire
+        status_code = response.status
+    return request_record(request, status_code, time.perf_counter() - start,
+                          headers=response.headers if response is not None else None,
+                          time_to_first_byte=exchange.get('time_to_first_byte'),
+                          response_bytes=exchange.get('response_bytes'))
+
+
+def _token_is_stale(token_manager) -> bool:
+    # pylint: disable=protected-access
+    now = token_manager._get_current_time()
+    return token_manager.access_token is None or token_manager.expire_time < now or token_manager.refresh_time < now
+
+
+def _get_error_message(status: int, body: bytes, codec: JsonCodec) -> str:
+    """Extract the error message of a response as ApiException does.
+
+    A message is always returned, as ApiException would otherwise read the
+    body with the coroutine json method of the aiohttp response.
+    """
+    message = None
+    try:
+        error_json = codec.loads(body)
+    except Exception:  # pylint: disable=broad-except
+        message = body.decode('utf-8', 'replace')
+    else:
+        if isinstance(error_json, dict):
+            errors = error_json.get('errors')
+            if isinstance(errors, list):
+                if errors and isinstance(errors[0], dict):
+                    message = errors[0].get('message')
+            else:
+                message = next((error_json[key] for key in ('error', 'message', 'errorMessage')
+                                if key in error_json), None)
+    if message:
+        return str(message)
+    if status == 401:
+        return 'Unauthorized: Access is denied due to invalid credentials'
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return 'Unknown error'
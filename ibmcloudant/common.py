@@ -17,6 +17,8 @@
 Common module
 """
 import platform
+from functools import lru_cache
+
 from .version import __version__
 
 SDK_ANALYTICS_HEADER = 'X-IBMCloud-SDK-Analytics'
@@ -43,7 +45,28 @@ user_agent = '{0}-{1} {2}'.format(SDK_NAME, __version__, get_system_info())
 
 
 def get_sdk_headers(service_name, service_version, operation_id):  # pylint: disable=missing-docstring
-    headers = {}
-    headers[SDK_ANALYTICS_HEADER] = get_sdk_analytics(service_name, service_version, operation_id)
-    headers[USER_AGENT_HEADER] = get_user_agent()
-    return headers
+    # callers update the returned dict, each gets its own copy of the template
+    return dict(_get_sdk_headers_template(service_name, service_version, operation_id))
+
+
+@lru_cache(maxsize=None)
+def _get_sdk_headers_template(service_name, service_version, operation_id):
+    return {
+        SDK_ANALYTICS_HEADER: get_sdk_analytics(service_name, service_version, operation_id),
+        USER_AGENT_HEADER: get_user_agent(),
+    }
+
+
+def get_operation_id(headers):  # pylint: disable=missing-docstring
+    analytics = headers.get(SDK_ANALYTICS_HEADER) if headers else None
+    if analytics is None:
+        return None
+    return analytics.rpartition('operation_id=')[2] or None
+
+
+def add_response_hook(kwargs, hook, first=False):  # pylint: disable=missing-docstring
+    hooks = dict(kwargs.get('hooks') or {})
+    existing = hooks.get('response') or []
+    existing = [existing] if callable(existing) else list(existing)
+    hooks['response'] = [hook] + existing if first else existing + [hook]
+    return dict(kwargs, hooks=hooks)
@@ -0,0 +1,326 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for compact variants of the result row models
+
+The classes have the attributes, constructor and methods of the model of the
+same name without the Compact prefix in cloudant_v1, but keep their
+attributes in __slots__ instead of a per instance __dict__ and decode with a
+single lookup per member. Use them for large results, e.g. as the row_model of
+a ResultStream or pager. Nested documents are cloudant_v1 Document objects.
+"""
+import json
+from typing import Dict, List
+
+from .cloudant_v1 import Document
+
+
+def _missing(model: str, err: KeyError) -> ValueError:
+    return ValueError('Required property {0} not present in {1} JSON'.format(err, model))
+
+
+class _CompactModel:
+    """Base class of the compact models, comparing and printing them by
+    their slots."""
+
+    __slots__ = ()
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def _from_dict(cls, _dict):
+        """Initialize an object from a json dictionary."""
+        return cls.from_dict(_dict)
+
+    def _to_dict(self):
+        """Return a json dictionary representing this model."""
+        return self.to_dict()
+
+    def __str__(self) -> str:
+        """Return a `str` version of this object."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def __eq__(self, other: object) -> bool:
+        """Return `true` when self and other are equal, false otherwise."""
+        if not isinstance(other, self.__class__):
+            return False
+        return self._values() == other._values()
+
+    def __ne__(self, other: object) -> bool:
+        """Return `true` when self and other are not equal, false otherwise."""
+        return not self == other
+
+    def __getstate__(self) -> tuple:
+        return self._values()
+
+    def __setstate__(self, state: tuple) -> None:
+        for (name, value) in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class CompactChange(_CompactModel):
+    """
+    Schema for a document leaf with single field rev.
+
+    :attr str rev: Schema for a document revision identifier.
+    """
+
+    __slots__ = ('rev',)
+
+    def __init__(self, rev: str) -> None:
+        self.rev = rev
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactChange':
+        """Initialize a CompactChange object from a json dictionary."""
+        self = cls.__new__(cls)
+        try:
+            self.rev = _dict['rev']
+        except KeyError as err:
+            raise _missing('Change', err) from err
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        return {'rev': self.rev} if self.rev is not None else {}
+
+
+class CompactChangesResultItem(_CompactModel):
+    """
+    Schema for an item in the changes results array.
+
+    :attr List[CompactChange] changes: List of document's leaves with single
+          field rev.
+    :attr bool deleted: (optional) if `true` then the document is deleted.
+    :attr Document doc: (optional) Schema for a document.
+    :attr str id: Schema for a document ID.
+    :attr str seq: Update sequence.
+    """
+
+    __slots__ = ('changes', 'deleted', 'doc', 'id', 'seq')
+
+    def __init__(self,
+                 changes: List[CompactChange],
+                 id: str,  # pylint: disable=redefined-builtin
+                 seq: str,
+                 *,
+                 deleted: bool = None,
+                 doc: Document = None) -> None:
+        self.changes = changes
+        self.deleted = deleted
+        self.doc = doc
+        self.id = id
+        self.seq = seq
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactChangesResultItem':
+        """Initialize a CompactChangesResultItem object from a json dictionary."""
+        self = cls.__new__(cls)
+        try:
+            self.changes = [CompactChange.from_dict(x) for x in _dict['changes']]
+            self.id = _dict['id']
+            self.seq = _dict['seq']
+        except KeyError as err:
+            raise _missing('ChangesResultItem', err) from err
+        self.deleted = _dict.get('deleted')
+        doc = _dict.get('doc')
+        self.doc = Document.from_dict(doc) if doc is not None else None
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.changes is not None:
+            _dict['changes'] = [x.to_dict() for x in self.changes]
+        if self.deleted is not None:
+            _dict['deleted'] = self.deleted
+        if self.doc is not None:
+            _dict['doc'] = self.doc.to_dict()
+        if self.id is not None:
+            _dict['id'] = self.id
+        if self.seq is not None:
+            _dict['seq'] = self.seq
+        return _dict
+
+
+class CompactDocsResultRowValue(_CompactModel):
+    """
+    Value of built-in `/_all_docs` style view.
+
+    :attr str rev: Schema for a document revision identifier.
+    """
+
+    __slots__ = ('rev',)
+
+    def __init__(self, rev: str) -> None:
+        self.rev = rev
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactDocsResultRowValue':
+        """Initialize a CompactDocsResultRowValue object from a json dictionary."""
+        self = cls.__new__(cls)
+        try:
+            self.rev = _dict['rev']
+        except KeyError as err:
+            raise _missing('DocsResultRowValue', err) from err
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        return {'rev': self.rev} if self.rev is not None else {}
+
+
+class CompactDocsResultRow(_CompactModel):
+    """
+    Schema for a row of document information in a DocsResult.
+
+    :attr str caused_by: (optional) The cause of the error (if available).
+    :attr str error: (optional) The name of the error.
+    :attr str reason: (optional) The reason the error occurred (if available).
+    :attr Document doc: (optional) Schema for a document.
+    :attr str id: (optional) id.
+    :attr str key: Document ID.
+    :attr CompactDocsResultRowValue value: (optional) Value of built-in
+          `/_all_docs` style view.
+    """
+
+    __slots__ = ('caused_by', 'error', 'reason', 'doc', 'id', 'key', 'value')
+
+    def __init__(self,
+                 key: str,
+                 *,
+                 caused_by: str = None,
+                 error: str = None,
+                 reason: str = None,
+                 doc: Document = None,
+                 id: str = None,  # pylint: disable=redefined-builtin
+                 value: CompactDocsResultRowValue = None) -> None:
+        self.caused_by = caused_by
+        self.error = error
+        self.reason = reason
+        self.doc = doc
+        self.id = id
+        self.key = key
+        self.value = value
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactDocsResultRow':
+        """Initialize a CompactDocsResultRow object from a json dictionary."""
+        self = cls.__new__(cls)
+        try:
+            self.key = _dict['key']
+        except KeyError as err:
+            raise _missing('DocsResultRow', err) from err
+        get = _dict.get
+        self.id = get('id')
+        value = get('value')
+        self.value = CompactDocsResultRowValue.from_dict(value) if value is not None else None
+        doc = get('doc')
+        self.doc = Document.from_dict(doc) if doc is not None else None
+        self.caused_by = get('caused_by')
+        self.error = get('error')
+        self.reason = get('reason')
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.caused_by is not None:
+            _dict['caused_by'] = self.caused_by
+        if self.error is not None:
+            _dict['error'] = self.error
+        if self.reason is not None:
+            _dict['reason'] = self.reason
+        if self.doc is not None:
+            _dict['doc'] = self.doc.to_dict()
+        if self.id is not None:
+            _dict['id'] = self.id
+        if self.key is not None:
+            _dict['key'] = self.key
+        if self.value is not None:
+            _dict['value'] = self.value.to_dict()
+        return _dict
+
+
+class CompactViewResultRow(_CompactModel):
+    """
+    Schema for a row of a view result.
+
+    :attr str caused_by: (optional) The cause of the error (if available).
+    :attr str error: (optional) The name of the error.
+    :attr str reason: (optional) The reason the error occurred (if available).
+    :attr Document doc: (optional) Schema for a document.
+    :attr str id: (optional) Schema for a document ID.
+    :attr object key: Schema for any JSON type.
+    :attr object value: Schema for any JSON type.
+    """
+
+    __slots__ = ('caused_by', 'error', 'reason', 'doc', 'id', 'key', 'value')
+
+    def __init__(self,
+                 key: object,
+                 value: object,
+                 *,
+                 caused_by: str = None,
+                 error: str = None,
+                 reason: str = None,
+                 doc: Document = None,
+                 id: str = None) -> None:  # pylint: disable=redefined-builtin
+        self.caused_by = caused_by
+        self.error = error
+        self.reason = reason
+        self.doc = doc
+        self.id = id
+        self.key = key
+        self.value = value
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactViewResultRow':
+        """Initialize a CompactViewResultRow object from a json dictionary."""
+        self = cls.__new__(cls)
+        try:
+            self.key = _dict['key']
+            self.value = _dict['value']
+        except KeyError as err:
+            raise _missing('ViewResultRow', err) from err
+        get = _dict.get
+        self.id = get('id')
+        doc = get('doc')
+        self.doc = Document.from_dict(doc) if doc is not None else None
+        self.caused_by = get('caused_by')
+        self.error = get('error')
+        self.reason = get('reason')
+        return self
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.caused_by is not None:
+            _dict['caused_by'] = self.caused_by
+        if self.error is not None:
+            _dict['error'] = self.error
+        if self.reason is not None:
+            _dict['reason'] = self.reason
+        if self.doc is not None:
+            _dict['doc'] = self.doc.to_dict()
+        if self.id is not None:
+            _dict['id'] = self.id
+        if self.key is not None:
+            _dict['key'] = self.key
+        if self.value is not None:
+            _dict['value'] = self.value
+        return _dict
@@ -0,0 +1,248 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for the HTTP connection pool of the service client
+"""
+import functools
+import logging
+import threading
+import time
+import weakref
+
+from requests import Request
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(HTTPAdapter):
+    """The transport adapter pooling the HTTP connections of a service
+    client, set with set_connection_pool.
+
+    By default requests keeps up to 10 connections per host, so with more
+    concurrent threads the connections opened beyond those are closed after
+    a single request, or, with ``block=True``, threads wait for a free
+    connection. Size ``max_connections_per_host`` to the number of threads
+    sharing the client, and check with snapshot() that connections are not
+    discarded or waited for.
+
+    Typical usage::
+
+        service.set_service_url('https://~replace-with-cloudant-host~.cloudantnosqldb.appdomain.cloud')
+        service.set_connection_pool(ConnectionPool(max_connections_per_host=64, prewarm=8))
+
+    Note that the pools of requests sent through a proxy are not monitored.
+
+    Keyword Args:
+        max_connections_per_host: The maximum number of connections kept
+            open to each host. Defaults to 10.
+        max_hosts: The maximum number of hosts connections are kept open
+            to. Defaults to 10.
+        block: True to wait for a free connection when
+            max_connections_per_host are in use, instead of opening a
+            connection that is closed after its request. Defaults to False.
+        idle_timeout: (optional) The number of seconds after which an idle
+            connection is closed instead of reused. Set it below the idle
+            timeout of the server or load balancer, so that requests are not
+            sent on connections the server is closing.
+        tcp_nodelay: False to send requests with Nagle's algorithm.
+            Defaults to True.
+        prewarm: The number of connections opened to the service URL when
+            the pool is set on a client. Defaults to 0.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['idle_timeout', 'tcp_nodelay', 'prewarm']
+
+    def __init__(self,
+                 *,
+                 max_connections_per_host: int = 10,
+                 max_hosts: int = 10,
+                 block: bool = False,
+                 idle_timeout: float = None,
+                 tcp_nodelay: bool = True,
+                 prewarm: int = 0) -> None:
+        self.idle_timeout = idle_timeout
+        self.tcp_nodelay = tcp_nodelay
+        self.prewarm = prewarm
+        self._pools = weakref.WeakSet()
+        self._pools_lock = threading.Lock()
+        super().__init__(pool_connections=max_hosts, pool_maxsize=max_connections_per_host, pool_block=block)
+
+    def __setstate__(self, state):
+        self._pools = weakref.WeakSet()
+        self._pools_lock = threading.Lock()
+        super().__setstate__(state)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        # the default socket options of urllib3 only set TCP_NODELAY
+        pool_kwargs.setdefault('socket_options', HTTPConnection.default_socket_options if self.tcp_nodelay else [])
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': functools.partial(self._new_pool, _MonitoredHTTPConnectionPool),
+            'https': functools.partial(self._new_pool, _MonitoredHTTPSConnectionPool),
+        }
+
+    def _new_pool(self, pool_class, host, port, **kwargs):
+        pool = pool_class(host, port, **kwargs)
+        pool.idle_timeout = self.idle_timeout
+        with self._pools_lock:
+            self._pools.add(pool)
+        return pool
+
+    def warm(self, url: str, count: int, *, verify=True, cert=None, proxies: dict = None) -> int:
+        """Open connections to the host of url ahead of the requests, at most
+        max_connections_per_host. Connection errors are logged.
+
+        Args:
+            url: The URL of the host.
+            count: The number of connections to keep open.
+
+        Keyword Args:
+            verify: The TLS verification of the requests, see requests.
+            cert: (optional) The TLS client certificate of the requests.
+            proxies: (optional) The proxies of the requests.
+
+        Returns:
+            The number of connections opened.
+        """
+        request = Request('GET', url).prepare()
+        if hasattr(self, 'get_connection_with_tls_context'):
+            pool = self.get_connection_with_tls_context(request, verify, proxies, cert)
+        else:
+            pool = self.get_connection(url, proxies)
+            self.cert_verify(pool, url, verify, cert)
+        connections = []
+        opened = 0
+        try:
+            for _ in range(min(count, self._pool_maxsize)):
+                connection = pool._get_conn()  # pylint: disable=protected-access
+                connections.append(connection)
+                if connection.sock is None:
+                    connection.connect()
+                    opened += 1
+        except OSError as err:
+            logger.warning('Opening connections to %s failed: %s', pool.host, err)
+        finally:
+            for connection in connections:
+                pool._put_conn(connection)  # pylint: disable=protected-access
+        return opened
+
+    def snapshot(self) -> dict:
+        """Return the statistics of the connections of each host, by
+        scheme://host:port:
+
+        - max_connections: The maximum number of connections kept open.
+        - in_use: The number of connections sending a request.
+        - max_in_use: The highest in_use.
+        - idle: The number of open connections waiting for a request.
+        - requests: The number of connections taken from the pool.
+        - opened: The number of connections opened, including reopened
+          after they were closed.
+        - discarded: The number of connections closed after a request as
+          max_connections were kept open.
+        - expired: The number of connections closed after idle_timeout.
+        - wait_seconds: The total time spent waiting for a free connection.
+        """
+        snapshot = {}
+        with self._pools_lock:
+            pools = list(self._pools)
+        for pool in pools:
+            key = '{0}://{1}:{2}'.format(pool.scheme, pool.host, pool.port)
+            stats = pool.snapshot()
+            if key in snapshot:
+                # pools of the same host with different TLS settings
+                stats = {name: max(value, snapshot[key][name]) if name == 'max_in_use' else value + snapshot[key][name]
+                         for (name, value) in stats.items()}
+            snapshot[key] = stats
+        return snapshot
+
+
+class _MonitoredPool:
+    """Counts the use of the connections of a urllib3 pool and closes the
+    connections idle for longer than idle_timeout."""
+
+    idle_timeout = None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._in_use = 0
+        self._max_in_use = 0
+        self._requests = 0
+        self._opened = 0
+        self._discarded = 0
+        self._expired = 0
+        self._wait_seconds = 0.0
+
+    def _get_conn(self, timeout=None):
+        start = time.monotonic()
+        connection = super()._get_conn(timeout)
+        now = time.monotonic()
+        idle_since = getattr(connection, 'idle_since', None)
+        expired = (self.idle_timeout is not None and idle_since is not None and connection.sock is not None
+                   and now - idle_since > self.idle_timeout)
+        if expired:
+            connection.close()
+        with self._stats_lock:
+            self._in_use += 1
+            self._max_in_use = max(self._max_in_use, self._in_use)
+            self._requests += 1
+            # a connection without socket is opened by the request
+            self._opened += connection.sock is None
+            self._expired += expired
+            if self.block:
+                self._wait_seconds += now - start
+        return connection
+
+    def _put_conn(self, conn) -> None:
+        pool = self.pool
+        discarded = conn is not None and pool is not None and pool.full()
+        if conn is not None:
+            conn.idle_since = time.monotonic()
+        with self._stats_lock:
+            self._in_use -= 1
+            self._discarded += discarded
+        super()._put_conn(conn)
+
+    def snapshot(self) -> dict:
+        """Return the statistics of the pool."""
+        pool = self.pool
+        idle = 0
+        if pool is not None:
+            with pool.mutex:
+                idle = sum(1 for connection in pool.queue if connection is not None and connection.sock is not None)
+        with self._stats_lock:
+            return {
+                'max_connections': pool.maxsize if pool is not None else 0,
+                'in_use': self._in_use,
+                'max_in_use': self._max_in_use,
+                'idle': idle,
+                'requests': self._requests,
+                'opened': self._opened,
+                'discarded': self._discarded,
+                'expired': self._expired,
+                'wait_seconds': self._wait_seconds,
+            }
+
+
+class _MonitoredHTTPConnectionPool(_MonitoredPool, HTTPConnectionPool):
+    pass
+
+
+class _MonitoredHTTPSConnectionPool(_MonitoredPool, HTTPSConnectionPool):
+    pass
@@ -0,0 +1,47 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for a tunable connection pool
+"""
+from collections import OrderedDict
+
+from .connection_pool import ConnectionPool
+
+
+def set_connection_pool(self, pool: ConnectionPool) -> None:
+    """Send the requests of the client over a ConnectionPool, opening its
+    prewarm connections to the service URL if it is set.
+
+    Note that set_http_client replaces the session the pool is mounted on.
+
+    Args:
+        pool: The ConnectionPool to use.
+    """
+    with self._config_lock:
+        # Session.mount briefly removes the shorter prefixes while requests
+        # from other threads look up their adapter, so the adapters are
+        # replaced at once, ordered as mount does by descending prefix length.
+        adapters = OrderedDict(self.http_client.adapters)
+        adapters['https://'] = adapters['http://'] = pool
+        self.http_client.adapters = OrderedDict(sorted(adapters.items(), key=lambda item: len(item[0]), reverse=True))
+        self.connection_pool = pool
+    if pool.prewarm and self.service_url:
+        # the settings send uses, as the connections are pooled by them
+        verify = False if self.disable_ssl_verification else self.http_config.get('verify')
+        settings = self.http_client.merge_environment_settings(
+            self.service_url, self.http_config.get('proxies') or {}, None, verify, self.http_config.get('cert'))
+        pool.warm(self.service_url, pool.prewarm, verify=settings['verify'], cert=settings['cert'],
+                  proxies=settings['proxies'])
@@ -29,6 +29,8 @@ class CouchDbSessionAuthenticator(Authenticator):
     Args:
         username: The CouchDB username
         password: The CouchDB password
+        token_store: (optional) A SessionTokenStore sharing the session with other clients, e.g. a
+            FileSessionTokenStore shared by the worker processes of a host.
 
     Attributes: token_manager (ibmcloudantsdk.couchdb_session_token_manager.CouchDbSessionTokenManager): Retrieves
     and manages CouchDB session tokens.
@@ -37,10 +39,12 @@ class CouchDbSessionAuthenticator(Authenticator):
         ValueError: The supplied username, and/or password are not valid.
     """
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, token_store: 'SessionTokenStore' = None):
         self.jar = None
+        # The session cookies last merged into the jar
+        self._token = None
 
-        self.token_manager = CouchDbSessionTokenManager(username, password)
+        self.token_manager = CouchDbSessionTokenManager(username, password, token_store=token_store)
         self.validate()
 
     def set_jar(self, jar):
@@ -48,6 +52,7 @@ class CouchDbSessionAuthenticator(Authenticator):
         This is an internal method called by BaseService. Not to be called directly.
         """
         self.jar = jar
+        self._token = None
 
     def validate(self):
         """Validates the username, and password for session token requests.
@@ -65,13 +70,19 @@ class CouchDbSessionAuthenticator(Authenticator):
     def authenticate(self, req: Request):
         """Adds session authentication information to the request.
 
-        The session token will be added as an update to the BaseService cookie jar.
+        The session token will be added as an update to the BaseService cookie jar
+        when it has changed since the last request.
 
         Args:
             req: Ignored. BaseService uses the cookie jar for every request
         """
         jar = self.token_manager.get_token()
-        # Requests seem to save cookies only for Sessions. BaseService is
-        # hard-coded to work with "regular" requests requests so updating
-        # the jar manually is necessary
-        self.jar.update(jar)
+        # Each session request returns a new jar, so the jar identifies the
+        # generation of the session and the shared jar is only updated, and
+        # its lock taken, when the session rotates.
+        if jar is not self._token:
+            # Requests seem to save cookies only for Sessions. BaseService is
+            # hard-coded to work with "regular" requests requests so updating
+            # the jar manually is necessary
+            self.jar.update(jar)
+            self._token = jar
@@ -16,6 +16,7 @@
 """
 Module to patch sdk core base service for session authentication
 """
+import threading
 from typing import Dict
 
 from requests.cookies import RequestsCookieJar
@@ -28,11 +29,26 @@ from .couchdb_session_authenticator import CouchDbSessionAuthenticator
 old_init = CloudantV1.__init__
 
 
+class _SynchronizedCookieJar(RequestsCookieJar):
+    """A cookie jar that can be iterated, e.g. by requests merging it into
+    the cookies of a request, while the authenticator updates it. Before
+    Python 3.11 the iteration of CookieJar can yield None for a cookie
+    removed meanwhile."""
+
+    def __iter__(self):
+        with self._cookies_lock:
+            return iter(list(super().__iter__()))
+
+
 def new_init(self, authenticator: Authenticator = None):  # pylint: disable=missing-docstring
+    # The setters replace the configuration with copies under this lock,
+    # so that requests sent meanwhile from other threads see either the
+    # previous or the new configuration.
+    self._config_lock = threading.RLock()
     old_init(self, authenticator)
     if isinstance(authenticator, CouchDbSessionAuthenticator):
         # Replacing BaseService's http.cookiejar.CookieJar as RequestsCookieJar supports update(CookieJar)
-        self.jar = RequestsCookieJar(self.jar)
+        self.jar = _SynchronizedCookieJar(self.jar)
         self.authenticator.set_jar(self.jar)  # Authenticators don't have access to cookie jars by default
 
 
@@ -40,28 +56,38 @@ old_set_service_url = CloudantV1.set_service_url
 
 
 def new_set_service_url(self, service_url: str):  # pylint: disable=missing-docstring
-    old_set_service_url(self, service_url)
-    try:
-        if isinstance(self.authenticator, CouchDbSessionAuthenticator):
-            self.authenticator.token_manager.set_service_url(service_url)
-    except AttributeError:
-        pass  # in case no authenticator is configured yet, pass
+    with self._config_lock:
+        old_set_service_url(self, service_url)
+        try:
+            if isinstance(self.authenticator, CouchDbSessionAuthenticator):
+                self.authenticator.token_manager.set_service_url(service_url)
+        except AttributeError:
+            pass  # in case no authenticator is configured yet, pass
+
+
+old_set_http_config = CloudantV1.set_http_config
+
+
+def new_set_http_config(self, http_config: dict) -> None:  # pylint: disable=missing-docstring
+    with self._config_lock:
+        old_set_http_config(self, dict(http_config) if isinstance(http_config, dict) else http_config)
 
 
 old_set_default_headers = CloudantV1.set_default_headers
 
 
 def new_set_default_headers(self, headers: Dict[str, str]):  # pylint: disable=missing-docstring
-    old_set_default_headers(self, headers)
-    if isinstance(self.authenticator, CouchDbSessionAuthenticator):
-        combined_headers = {}
-        combined_headers.update(headers)
-        combined_headers.update(get_sdk_headers(
-            service_name=self.DEFAULT_SERVICE_NAME,
-            service_version='V1',
-            operation_id='authenticator_post_session')
-        )
-        self.authenticator.token_manager.set_default_headers(combined_headers)
+    with self._config_lock:
+        old_set_default_headers(self, dict(headers) if isinstance(headers, dict) else headers)
+        if isinstance(self.authenticator, CouchDbSessionAuthenticator):
+            combined_headers = {}
+            combined_headers.update(headers)
+            combined_headers.update(get_sdk_headers(
+                service_name=self.DEFAULT_SERVICE_NAME,
+                service_version='V1',
+                operation_id='authenticator_post_session')
+            )
+            self.authenticator.token_manager.set_default_headers(combined_headers)
 
 
 old_set_disable_ssl_verification = CloudantV1.set_disable_ssl_verification
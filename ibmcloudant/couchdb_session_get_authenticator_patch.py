@@ -25,8 +25,13 @@ old_construct_authenticator = get_authenticator.__construct_authenticator
 def new_construct_authenticator(config):  # pylint: disable=missing-docstring
     auth_type = config.get('AUTH_TYPE').upper() if config.get('AUTH_TYPE') else ''
     if auth_type == 'COUCHDB_SESSION':
+        token_store = None
+        if config.get('SESSION_TOKEN_FILE'):
+            from .session_token_store import FileSessionTokenStore
+            token_store = FileSessionTokenStore(config.get('SESSION_TOKEN_FILE'))
         return CouchDbSessionAuthenticator(
             username=config.get('USERNAME'),
-            password=config.get('PASSWORD')
+            password=config.get('PASSWORD'),
+            token_store=token_store
         )
     return old_construct_authenticator(config)
@@ -16,8 +16,21 @@
 """
 Module for managing session authentication token
 """
+import logging
+import threading
+import weakref
+from http.cookiejar import Cookie
+from typing import Dict
+
+from requests.cookies import RequestsCookieJar
+
 from ibm_cloud_sdk_core.token_manager import TokenManager
 
+# The attributes of the stored session cookies
+_COOKIE_FIELDS = ('version', 'name', 'value', 'port', 'port_specified', 'domain', 'domain_specified',
+                  'domain_initial_dot', 'path', 'path_specified', 'secure', 'expires', 'discard', 'comment',
+                  'comment_url')
+
 
 class CouchDbSessionTokenManager(TokenManager):
     """The SessionTokenManager takes a username and password and performs the necessary interactions with
@@ -25,6 +38,16 @@ class CouchDbSessionTokenManager(TokenManager):
 
     If the current stored session token has expired a new session token will be retrieved.
 
+    Session tokens are renewed in a background thread once their refresh
+    time has passed, by a timer or by the first caller of get_token after
+    it, while callers go on using the current token. Only callers finding
+    the token expired wait for a new one, and concurrent callers share a
+    single session request.
+
+    With a token_store the session is shared with the other managers using
+    the store, e.g. in the other worker processes of a host, and only one of
+    them requests each new session.
+
     This class is used by CouchDbSessionAuthenticator and is internal.
 
     Attributes:
@@ -33,24 +56,118 @@ class CouchDbSessionTokenManager(TokenManager):
         password (str): The CouchDB password to obtain the session token for
         http_config (dict): A dictionary containing values that control the timeout, proxies, and etc of HTTP requests.
         headers (dict): A dictionary containing values that specify custom headers used for HTTP requests.
+        token_store (SessionTokenStore): The store sharing the session, or None.
 
     Args:
         username: The CouchDB username to obtain the session token for
         password: The CouchDB password to obtain the session token for
+        url: The CouchDB service URL for token requests.
+        token_store: (optional) The SessionTokenStore to share the session with.
     """
 
     def __init__(self, username: str, password: str,
                  url: str = None,
+                 token_store: 'SessionTokenStore' = None,
                  ):
         super().__init__(url)
         self.username = username
         self.password = password
+        self.token_store = token_store
 
         self.token = None
 
         self.http_config = {}
         self.headers = None
 
+        self._refresh = None
+        self._refresh_lock = threading.Lock()
+        self._timer = None
+
+    def get_token(self):
+        """Return the session cookies, requesting them if they have expired
+        and renewing them in the background if their refresh time has
+        passed.
+
+        Returns:
+            A CookieJar of Cookies the server sent back.
+        """
+        if self._is_token_expired():
+            self._refresh_token().wait()
+            if self._is_token_expired():
+                # set_service_url discarded the session requested meanwhile
+                self._refresh_token().wait()
+            return self.access_token
+        token = self.access_token
+        if self._token_needs_refresh():
+            self._refresh_token(background=True)
+        return token
+
+    def wait_for_refresh(self, timeout: float = None) -> None:
+        """Wait for a session request in progress, if any, to complete.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+        """
+        refresh = self._refresh
+        if refresh is not None:
+            refresh.done.wait(timeout)
+
+    def _refresh_token(self, background: bool = False) -> '_Refresh':
+        """Request new session cookies unless a request is already in
+        progress, returning the request in progress."""
+        with self._refresh_lock:
+            refresh = self._refresh
+            if refresh is not None:
+                return refresh
+            refresh = self._refresh = _Refresh()
+        if background:
+            threading.Thread(target=self._request_and_save, args=(refresh,), name='CouchDbSessionRefresh',
+                             daemon=True).start()
+        else:
+            self._request_and_save(refresh)
+        return refresh
+
+    def _request_and_save(self, refresh: '_Refresh') -> None:
+        try:
+            self._renew_token(refresh)
+        except Exception as err:  # pylint: disable=broad-except
+            refresh.error = err
+            if not self._is_token_expired():
+                # the current token is still valid, the refresh is retried
+                # after the minute _token_needs_refresh waits for
+                logging.warning('Renewing the session failed: %s', err)
+        with self._refresh_lock:
+            if self._refresh is refresh:
+                self._refresh = None
+        refresh.done.set()
+
+    def _renew_token(self, refresh: '_Refresh') -> None:
+        # The session is only saved if set_service_url did not replace the
+        # refresh meanwhile, so that no session of a previous URL is used.
+        store = self.token_store
+        if store is None:
+            token_response = self.request_token()
+            with self._refresh_lock:
+                if self._refresh is refresh:
+                    self._save_token_info(token_response)
+            return
+        key = '{0}@{1}'.format(self.username, self.url)
+        with store.lock(key):
+            stored = store.load(key)
+            if stored is not None and stored['refresh_time'] > self._get_current_time():
+                # another client renewed the session
+                with self._refresh_lock:
+                    if self._refresh is refresh:
+                        self._load_token_info(stored)
+                return
+            token_response = self.request_token()
+            with self._refresh_lock:
+                if self._refresh is not refresh:
+                    return
+                self._save_token_info(token_response)
+                token = self._dump_token_info()
+            store.save(key, token)
+
     def request_token(self):
         """Request a CouchDB session token given an username and password.
 
@@ -91,10 +208,68 @@ class CouchDbSessionTokenManager(TokenManager):
         ttl = exp - iat
         buffer = ttl * 0.2
         self.refresh_time = self.expire_time - buffer
+        self._schedule_refresh(self.refresh_time - iat)
+
+    def _dump_token_info(self) -> Dict:
+        """Return the session as a dict of JSON values for a token store."""
+        cookies = []
+        for cookie in self.access_token:
+            fields = {field: getattr(cookie, field) for field in _COOKIE_FIELDS}
+            fields['rest'] = cookie._rest  # pylint: disable=protected-access
+            cookies.append(fields)
+        return {'cookies': cookies, 'expire_time': self.expire_time, 'refresh_time': self.refresh_time}
+
+    def _load_token_info(self, token: Dict) -> None:
+        """Use a session from a token store."""
+        jar = RequestsCookieJar()
+        for fields in token['cookies']:
+            jar.set_cookie(Cookie(**fields))
+        self.access_token = jar
+        self.expire_time = token['expire_time']
+        self.refresh_time = token['refresh_time']
+        self._schedule_refresh(self.refresh_time - self._get_current_time())
+
+    def _schedule_refresh(self, delay: float) -> None:
+        """Renew the session after delay seconds even if no request is made
+        meanwhile, with a timer that does not keep this manager alive. Called
+        with the refresh lock held."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if delay <= 0:
+            return
+        self._timer = threading.Timer(delay, _refresh_ahead, args=(weakref.ref(self),))
+        self._timer.daemon = True
+        self._timer.start()
 
     def set_service_url(self, service_url):
-        self.url = service_url
-        self.expire_time = 0
+        with self._refresh_lock:
+            self.url = service_url
+            self.expire_time = 0
+            # a session requested from the previous URL is discarded
+            self._refresh = None
+            self._schedule_refresh(0)
 
     def set_default_headers(self, headers):
         self.headers = headers
+
+
+def _refresh_ahead(manager_ref: 'weakref.ref[CouchDbSessionTokenManager]') -> None:
+    manager = manager_ref()
+    if manager is not None and not manager._is_token_expired() and manager._token_needs_refresh():
+        # pylint: disable=protected-access
+        manager._refresh_token().done.wait()
+
+
+class _Refresh:
+    """A session request in progress, shared by its concurrent callers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error = None
+
+    def wait(self) -> None:
+        """Wait for the request, raising its error if it failed."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
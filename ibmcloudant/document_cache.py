@@ -0,0 +1,214 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for caching documents kept up to date by the changes feed
+"""
+import logging
+import threading
+import time
+from typing import Dict, Set
+
+from .changes_follower import ChangesFollower
+from .cloudant_v1 import CloudantV1
+from .json_codec import get_json_codec
+from .response_cache import CachedResponse, ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentCache:
+    """A read-through cache of the documents of a database, kept coherent by
+    following the database's changes feed.
+
+    get_document() returns a cached document without contacting the server
+    while the changes feed is connected. Every change that arrives removes
+    the document from the cache or, with ``refresh=True``, replaces it with
+    the new revision if it is cached. Documents are only returned from the
+    cache while the server was heard from, by a change or a heartbeat,
+    within the last ``max_staleness`` seconds; otherwise, e.g. while the
+    feed reconnects after a network error, reads go to the server. A cached
+    document is therefore at most about ``max_staleness`` seconds behind the
+    server.
+
+    Typical usage::
+
+        with DocumentCache(service, 'db') as cache:
+            config = cache.get_document('config')
+
+    Args:
+        service: The service client to read the documents and changes with.
+        db: The name of the database to cache documents of.
+
+    Keyword Args:
+        max_entries: The maximum number of documents to keep.
+            Defaults to 1000.
+        max_bytes: (optional) The maximum total size of the encoded
+            documents kept.
+        max_staleness: The maximum number of seconds without contact with
+            the changes feed for which cached documents are returned.
+            Defaults to 30.
+        heartbeat: Milliseconds between heartbeats of the changes feed, must
+            be well below max_staleness. Defaults to 5000.
+        refresh: True to replace cached documents with the revision included
+            in the change instead of removing them. Defaults to False.
+
+    Attributes:
+        invalidations (int): The number of documents removed or replaced
+            because they changed.
+    """
+
+    def __init__(self,
+                 service: CloudantV1,
+                 db: str,
+                 *,
+                 max_entries: int = 1000,
+                 max_bytes: int = None,
+                 max_staleness: float = 30.0,
+                 heartbeat: int = 5000,
+                 refresh: bool = False) -> None:
+        if heartbeat >= max_staleness * 1000:
+            raise ValueError('heartbeat must be shorter than max_staleness')
+        self.service = service
+        self.db = db
+        self.max_staleness = max_staleness
+        self.refresh = refresh
+        self.invalidations = 0
+        self._cache = ResponseCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        # document ids being read from the server, and those of them that
+        # changed while the read was in flight
+        self._loading = {}  # type: Dict[str, int]
+        self._changed_while_loading = set()  # type: Set[str]
+        self._failed = False
+        changes_params = {'include_docs': True} if refresh else {}
+        self._follower = ChangesFollower(service, db, since='now', heartbeat=heartbeat, batch_wait=0,
+                                         **changes_params)
+        self._consumer = threading.Thread(target=self._consume,
+                                          name='DocumentCache-{0}'.format(db),
+                                          daemon=True)
+        self._consumer.start()
+
+    def __enter__(self) -> 'DocumentCache':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        """The number of documents returned from the cache."""
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        """The number of documents read from the server."""
+        return self._cache.misses
+
+    @property
+    def evictions(self) -> int:
+        """The number of documents removed to make room for others."""
+        return self._cache.evictions
+
+    @property
+    def fresh(self) -> bool:
+        """True while cached documents are returned, i.e. the changes feed
+        was heard from within max_staleness seconds."""
+        last_contact = self._follower.last_contact
+        return (not self._failed and last_contact is not None
+                and time.monotonic() - last_contact <= self.max_staleness)
+
+    def get_document(self, doc_id: str) -> dict:
+        """Return the winning revision of a document.
+
+        Args:
+            doc_id: The ID of the document.
+
+        Returns:
+            The document as a dict, as get_document would return it.
+
+        Raises:
+            ApiException: The document could not be read, e.g. a 404 when it
+                does not exist.
+        """
+        fresh = self.fresh
+        if fresh:
+            entry = self._cache.get(doc_id)
+            if entry is not None:
+                self._cache.record(True)
+                return get_json_codec(self.service).loads(entry.body)
+        self._cache.record(False)
+        with self._lock:
+            self._loading[doc_id] = self._loading.get(doc_id, 0) + 1
+        loaded = False
+        try:
+            document = self.service.get_document(self.db, doc_id).get_result()
+            loaded = True
+        finally:
+            with self._lock:
+                # only cache reads that the changes feed is known to cover
+                if loaded and fresh and doc_id not in self._changed_while_loading:
+                    self._store(doc_id, document)
+                self._loading[doc_id] -= 1
+                if not self._loading[doc_id]:
+                    del self._loading[doc_id]
+                    self._changed_while_loading.discard(doc_id)
+        return document
+
+    def invalidate(self, doc_id: str = None) -> None:
+        """Remove a document, or all documents, from the cache.
+
+        Args:
+            doc_id: (optional) The ID of the document, all documents when
+                omitted.
+        """
+        if doc_id is None:
+            self._cache.clear()
+        else:
+            self._cache.discard(doc_id)
+
+    def close(self) -> None:
+        """Stop following the changes feed and empty the cache."""
+        self._follower.stop()
+        self._follower.join()
+        self._consumer.join()
+        self._cache.clear()
+
+    def _store(self, doc_id: str, document: dict) -> None:
+        body = get_json_codec(self.service).dumps_bytes(document)
+        self._cache.put(doc_id, CachedResponse(document.get('_rev'), {}, body))
+
+    def _consume(self) -> None:
+        try:
+            for change in self._follower:
+                self._apply(change)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Changes feed for %s failed, the document cache is disabled', self.db)
+            self._failed = True
+            self._cache.clear()
+
+    def _apply(self, change) -> None:
+        with self._lock:
+            if change.id in self._loading:
+                self._changed_while_loading.add(change.id)
+            doc = change.doc
+            if self.refresh and doc is not None and not change.deleted and self._cache.get(change.id) is not None:
+                self._store(change.id, doc.to_dict())
+                self.invalidations += 1
+            elif self._cache.discard(change.id):
+                self.invalidations += 1
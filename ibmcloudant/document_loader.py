@@ -0,0 +1,221 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for coalescing single document reads into bulk get requests
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from ibm_cloud_sdk_core import ApiException
+from .cloudant_v1 import BulkGetQueryDocument, BulkGetResultItem, CloudantV1
+
+# Status codes for the errors reported per document by _bulk_get
+_ERROR_CODES = {
+    'bad_request': 400,
+    'unauthorized': 401,
+    'forbidden': 403,
+    'not_found': 404,
+}
+
+
+class DocumentLoader:
+    """Coalesces document reads issued around the same time into a single
+    post_bulk_get request.
+
+    The first read starts a window of ``window`` seconds; all reads that
+    arrive before it closes, up to ``max_batch_size`` distinct documents,
+    are fetched together. Reads of an id and rev pair that is already
+    waiting or being fetched share the same result.
+
+    Typical usage, with the loader shared by all request threads::
+
+        loader = DocumentLoader(service, 'db')
+        doc = loader.get_document('doc1')
+
+    Args:
+        service: The service client to read the documents with.
+        db: The name of the database to read from.
+
+    Keyword Args:
+        window: The number of seconds to collect reads for. Defaults to 0.005.
+        max_batch_size: The maximum number of documents in a request.
+            Defaults to 100.
+        concurrency: The number of requests sent concurrently. Defaults to 4.
+        **bulk_get_params: Any other post_bulk_get parameters, e.g. latest or
+            attachments, applied to every request.
+    """
+
+    def __init__(self,
+                 service: CloudantV1,
+                 db: str,
+                 *,
+                 window: float = 0.005,
+                 max_batch_size: int = 100,
+                 concurrency: int = 4,
+                 **bulk_get_params) -> None:
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.service = service
+        self.db = db
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.bulk_get_params = bulk_get_params
+        self._lock = threading.Condition()
+        self._pending = {}
+        self._pending_since = None
+        self._in_flight = {}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='DocumentLoader')
+        self._dispatcher = None
+        self._closed = False
+
+    def __enter__(self) -> 'DocumentLoader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def load(self, doc_id: str, rev: str = None) -> 'Future[BulkGetResultItem]':
+        """Queue a document read.
+
+        Args:
+            doc_id: The ID of the document.
+            rev: (optional) The revision to read, the winning revision when
+                omitted.
+
+        Returns:
+            A Future resolving to the BulkGetResultItem for the document.
+
+        Raises:
+            ValueError: The loader has been closed.
+        """
+        key = (doc_id, rev)
+        with self._lock:
+            if self._closed:
+                raise ValueError('The DocumentLoader is closed')
+            future = self._pending.get(key) or self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+                self._start_dispatcher()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            else:
+                self._lock.notify_all()
+        return future
+
+    def get_document(self, doc_id: str, rev: str = None, timeout: float = None) -> dict:
+        """Read a document, waiting for the result.
+
+        Args:
+            doc_id: The ID of the document.
+            rev: (optional) The revision to read.
+            timeout: (optional) The maximum number of seconds to wait.
+
+        Returns:
+            The document as a dict, as get_document would return it.
+
+        Raises:
+            ApiException: The document could not be read, e.g. a 404 when it
+                does not exist.
+        """
+        item = self.load(doc_id, rev).result(timeout)
+        result = item.docs[0] if item.docs else None
+        if result is None or result.ok is None:
+            error = result.error if result is not None else None
+            code = _ERROR_CODES.get(error.error, 500) if error is not None else 500
+            message = error.reason or error.error if error is not None else 'No result'
+            raise ApiException(code, message=message)
+        return result.ok.to_dict()
+
+    def close(self) -> None:
+        """Fetch any queued reads and release the worker threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._pending:
+                self._dispatch()
+            self._lock.notify_all()
+        self._executor.shutdown(wait=True)
+
+    def _start_dispatcher(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_periodically,
+                                                name='DocumentLoader-dispatcher',
+                                                daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch_periodically(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._pending:
+                    self._lock.wait()
+                    continue
+                remaining = self._pending_since + self.window - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+                self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand the queued reads to the executor. Called holding the lock."""
+        batch = self._pending
+        self._pending = {}
+        self._pending_since = None
+        self._in_flight.update(batch)
+        self._executor.submit(self._fetch, list(batch.items()))
+
+    def _fetch(self, batch: List[Tuple[Tuple[str, str], Future]]) -> None:
+        try:
+            docs = [BulkGetQueryDocument(id=doc_id, rev=rev) for ((doc_id, rev), _) in batch]
+            results = self.service.post_bulk_get(self.db, docs, **self.bulk_get_params).get_result()['results']
+            items = self._match(batch, results)
+            for (key, future) in batch:
+                if key in items:
+                    future.set_result(items[key])
+                else:
+                    future.set_exception(ValueError('No result was returned for document {0}'.format(key[0])))
+        except Exception as err:  # pylint: disable=broad-except
+            for (_, future) in batch:
+                if not future.done():
+                    future.set_exception(err)
+        finally:
+            with self._lock:
+                for (key, _) in batch:
+                    self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _match(batch: List[Tuple[Tuple[str, str], Future]],
+               results: List[dict]) -> Dict[Tuple[str, str], BulkGetResultItem]:
+        """Pair up the requested documents with the result items, which the
+        server returns in the order of the request."""
+        items = {}
+        if len(results) == len(batch) and all(r.get('id') == key[0] for ((key, _), r) in zip(batch, results)):
+            for ((key, _), result) in zip(batch, results):
+                items[key] = BulkGetResultItem.from_dict(result)
+            return items
+        by_id = {}
+        for result in results:
+            by_id.setdefault(result.get('id'), []).append(result)
+        for (key, _) in batch:
+            if by_id.get(key[0]):
+                items[key] = BulkGetResultItem.from_dict(by_id[key[0]].pop(0))
+        return items
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for the JSON encoding and decoding of request and response bodies
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """Encodes request bodies and decodes response bodies with the json
+    module of the standard library.
+
+    Subclasses set on a service client with set_json_codec replace the
+    encoding of the bodies of all operations and the decoding of all JSON
+    responses, including error responses.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        """Return the JSON encoding of obj as str or UTF-8 bytes."""
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Return the JSON encoding of obj as UTF-8 bytes."""
+        encoded = self.dumps(obj)
+        return encoded.encode('utf-8') if isinstance(encoded, str) else encoded
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Return the value of a JSON document.
+
+        Raises:
+            ValueError: The data is not valid JSON.
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Encodes and decodes with orjson, several times faster than the
+    standard library for large bodies such as bulk document batches.
+
+    Values orjson does not support, e.g. integers above 64 bits or dicts
+    with non-str keys, are encoded by the standard library instead. Note
+    that orjson decodes integers above 64 bits as floats.
+
+    Raises:
+        ImportError: The orjson package is not installed.
+    """
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError('OrjsonCodec requires the orjson package')
+
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return json.dumps(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # the standard library also accepts NaN and Infinity
+            return json.loads(data)
+
+
+DEFAULT_JSON_CODEC = JsonCodec()
+
+
+def get_fastest_json_codec() -> JsonCodec:
+    """Return an OrjsonCodec if orjson is installed, otherwise a JsonCodec."""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
+
+
+def get_json_codec(service: Any) -> JsonCodec:
+    """Return the codec set on a service client or the default JsonCodec."""
+    return getattr(service, 'json_codec', None) or DEFAULT_JSON_CODEC
+
+
+class JsonBody:
+    """A request body to be encoded by the codec of the client sending it."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class DeferredJsonModule:
+    """Stands in for the json module of cloudant_v1, so that the request
+    bodies the operations serialize with json.dumps are encoded by
+    prepare_request with the codec of the client instead.
+
+    Calls with keyword arguments, e.g. the indent of the __str__ of the
+    models, and all other json functions use the json module directly.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> Any:  # pylint: disable=missing-docstring
+        if kwargs:
+            return json.dumps(obj, **kwargs)
+        return JsonBody(obj)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(json, name)
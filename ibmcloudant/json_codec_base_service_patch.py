@@ -0,0 +1,46 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for a pluggable JSON codec
+"""
+from ibm_cloud_sdk_core import DetailedResponse
+from .cloudant_v1 import CloudantV1
+from .common import add_response_hook
+from .json_codec import JsonCodec
+
+old_send = CloudantV1.send
+
+
+def set_json_codec(self, codec: JsonCodec) -> None:
+    """Set the codec encoding the request bodies and decoding the JSON
+    responses, or None for the json module of the standard library.
+
+    Args:
+        codec: The JsonCodec to use, e.g. an OrjsonCodec.
+    """
+    self.json_codec = codec
+
+
+def new_send(self, request, **kwargs) -> DetailedResponse:  # pylint: disable=missing-docstring
+    codec = getattr(self, 'json_codec', None)
+    if codec is None:
+        return old_send(self, request, **kwargs)
+
+    def on_response(response, *args, **kwargs):  # pylint: disable=unused-argument
+        # sdk core and ApiException decode the body with response.json()
+        response.json = lambda **_: codec.loads(response.content)
+
+    return old_send(self, request, **add_response_hook(kwargs, on_response))
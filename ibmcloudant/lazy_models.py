@@ -0,0 +1,215 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for result models decoding their rows on access
+"""
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterator, List
+
+from .cloudant_v1 import AllDocsResult, DocsResultRow, Document, ExecutionStats, FindResult, ViewResult, ViewResultRow
+
+
+class LazyModelList(MutableSequence):
+    """A list of models holding the decoded JSON of its items, converting
+    each item with the from_dict method of the model when it is first
+    accessed.
+
+    Converted items are kept, so an item is converted at most once and
+    changes to it are retained. The list can be modified like a list.
+
+    Args:
+        items: The decoded JSON of the items.
+        model: The model class to convert the items into.
+    """
+
+    __slots__ = ('_raw', '_items', '_model')
+
+    def __init__(self, items: List[Any], model: Any) -> None:
+        self._raw = items
+        self._items = [None] * len(items)
+        self._model = model
+
+    def _get(self, index: int) -> Any:
+        item = self._items[index]
+        if item is None:
+            raw = self._raw[index]
+            if raw is not None:
+                item = self._items[index] = self._model.from_dict(raw)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self._items)):
+            yield self._get(index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            self._raw[index] = [None] * len(value)
+        else:
+            self._raw[index] = None
+        self._items[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._raw[index]
+        del self._items[index]
+
+    def insert(self, index: int, value: Any) -> None:
+        self._raw.insert(index, None)
+        self._items.insert(index, value)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, LazyModelList)) or len(self) != len(other):
+            return False
+        return all(a == b for (a, b) in zip(self, other))
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return 'LazyModelList({0}, {1} items, {2} decoded)'.format(
+            self._model.__name__, len(self._items), sum(item is not None for item in self._items))
+
+    def to_dicts(self) -> List[Dict]:
+        """Return the JSON dictionaries of the items, without keeping the
+        conversions of the items not accessed yet."""
+        from_dict = self._model.from_dict
+        return [(from_dict(raw) if item is None else item).to_dict() for (raw, item) in zip(self._raw, self._items)]
+
+
+class _LazyResult:
+    """Mixin comparing a lazy result equal to the generated result of the
+    same content."""
+
+    _result_model = None
+
+    def __eq__(self, other: object) -> bool:
+        """Return `true` when self and other are equal, false otherwise."""
+        if not isinstance(other, self._result_model):
+            return False
+        return self.__dict__ == other.__dict__
+
+    def __ne__(self, other: object) -> bool:
+        """Return `true` when self and other are not equal, false otherwise."""
+        return not self == other
+
+
+class LazyAllDocsResult(_LazyResult, AllDocsResult):
+    """An AllDocsResult whose rows are converted into DocsResultRow objects
+    only when they are accessed, for callers reading only some rows or
+    only total_rows of large results.
+
+    Typical usage::
+
+        result = LazyAllDocsResult.from_dict(service.post_all_docs(db='db').get_result())
+        first_id = result.rows[0].id
+    """
+
+    _result_model = AllDocsResult
+    _row_model = DocsResultRow
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'LazyAllDocsResult':
+        """Initialize a LazyAllDocsResult object from a json dictionary."""
+        if 'total_rows' not in _dict:
+            raise ValueError('Required property \'total_rows\' not present in AllDocsResult JSON')
+        if 'rows' not in _dict:
+            raise ValueError('Required property \'rows\' not present in AllDocsResult JSON')
+        return cls(_dict['total_rows'], LazyModelList(list(_dict['rows']), cls._row_model),
+                   update_seq=_dict.get('update_seq'))
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.total_rows is not None:
+            _dict['total_rows'] = self.total_rows
+        if self.rows is not None:
+            _dict['rows'] = _to_dicts(self.rows)
+        if self.update_seq is not None:
+            _dict['update_seq'] = self.update_seq
+        return _dict
+
+
+class LazyViewResult(_LazyResult, ViewResult):
+    """A ViewResult whose rows are converted into ViewResultRow objects only
+    when they are accessed."""
+
+    _result_model = ViewResult
+    _row_model = ViewResultRow
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'LazyViewResult':
+        """Initialize a LazyViewResult object from a json dictionary."""
+        if 'rows' not in _dict:
+            raise ValueError('Required property \'rows\' not present in ViewResult JSON')
+        return cls(LazyModelList(list(_dict['rows']), cls._row_model),
+                   total_rows=_dict.get('total_rows'), update_seq=_dict.get('update_seq'))
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.total_rows is not None:
+            _dict['total_rows'] = self.total_rows
+        if self.update_seq is not None:
+            _dict['update_seq'] = self.update_seq
+        if self.rows is not None:
+            _dict['rows'] = _to_dicts(self.rows)
+        return _dict
+
+
+class LazyFindResult(_LazyResult, FindResult):
+    """A FindResult whose documents are converted into Document objects only
+    when they are accessed."""
+
+    _result_model = FindResult
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'LazyFindResult':
+        """Initialize a LazyFindResult object from a json dictionary."""
+        if 'bookmark' not in _dict:
+            raise ValueError('Required property \'bookmark\' not present in FindResult JSON')
+        if 'docs' not in _dict:
+            raise ValueError('Required property \'docs\' not present in FindResult JSON')
+        execution_stats = _dict.get('execution_stats')
+        return cls(_dict['bookmark'], LazyModelList(list(_dict['docs']), Document),
+                   execution_stats=ExecutionStats.from_dict(execution_stats) if execution_stats else None,
+                   warning=_dict.get('warning'))
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.bookmark is not None:
+            _dict['bookmark'] = self.bookmark
+        if self.docs is not None:
+            _dict['docs'] = _to_dicts(self.docs)
+        if self.execution_stats is not None:
+            _dict['execution_stats'] = self.execution_stats.to_dict()
+        if self.warning is not None:
+            _dict['warning'] = self.warning
+        return _dict
+
+
+def _to_dicts(items: List[Any]) -> List[Dict]:
+    if isinstance(items, LazyModelList):
+        return items.to_dicts()
+    return [x.to_dict() for x in items]
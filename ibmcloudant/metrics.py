@@ -0,0 +1,245 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for collecting per operation request metrics
+"""
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Each power of two range of a histogram is divided into this many buckets,
+# which bounds the relative error of the recorded values to 1/32.
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class RequestRecord(NamedTuple):
+    """The measurements of a request.
+
+    Attributes:
+        operation_id (str): The operation of the request.
+        method (str): The HTTP method.
+        status_code (int): The HTTP status code, None if no response arrived.
+        request_bytes (int): The size of the request body as sent.
+        response_bytes (int): The size of the response body as received,
+            None if unknown, e.g. for an unread stream.
+        time_to_first_byte (float): Seconds until the response headers
+            arrived, None if no response arrived.
+        latency (float): Seconds until the response was read or failed.
+        request_id (str): The X-Couch-Request-ID of the response.
+        body_time (float): Seconds the server spent processing the request
+            body, from the X-CouchDB-Body-Time header of the response.
+    """
+    operation_id: str
+    method: str
+    status_code: Optional[int]
+    request_bytes: int
+    response_bytes: Optional[int]
+    time_to_first_byte: Optional[float]
+    latency: float
+    request_id: Optional[str]
+    body_time: Optional[float]
+
+
+class Histogram:
+    """A histogram of non-negative integers with logarithmic buckets, as in
+    HdrHistogram, so that memory use and recording cost are constant while
+    any quantile is reported within about 3% of its true value.
+
+    This class is used by MetricsCollector and is not thread safe.
+    """
+
+    def __init__(self) -> None:
+        self.counts = {}  # type: Dict[int, int]
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < 2 * _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+        return (shift + 1) * _SUB_BUCKETS + (value >> shift) - _SUB_BUCKETS
+
+    @staticmethod
+    def _upper_bound(index: int) -> int:
+        if index < 2 * _SUB_BUCKETS:
+            return index
+        shift = index // _SUB_BUCKETS - 1
+        top = index % _SUB_BUCKETS + _SUB_BUCKETS
+        return ((top + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Record a value."""
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, quantile: float) -> Optional[int]:
+        """Return the value below which the quantile of the values fall."""
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def snapshot(self, scale: float = 1.0) -> dict:
+        """Return the count, sum, mean, min, max and quantiles, with values
+        multiplied by scale."""
+        if not self.count:
+            return {'count': 0}
+        snapshot = {
+            'count': self.count,
+            'sum': self.total * scale,
+            'mean': self.total * scale / self.count,
+            'min': self.min * scale,
+            'max': self.max * scale,
+        }
+        for quantile in QUANTILES:
+            snapshot['p{0:g}'.format(quantile * 100)] = self.quantile(quantile) * scale
+        return snapshot
+
+
+class _OperationMetrics:
+    """The histograms and status counts of an operation."""
+
+    # name, RequestRecord field, the resolution the histogram counts in
+    HISTOGRAMS = (
+        ('latency_seconds', 'latency', 1e-6),
+        ('time_to_first_byte_seconds', 'time_to_first_byte', 1e-6),
+        ('body_time_seconds', 'body_time', 1e-6),
+        ('request_bytes', 'request_bytes', 1),
+        ('response_bytes', 'response_bytes', 1),
+    )
+
+    def __init__(self) -> None:
+        self.histograms = {name: Histogram() for (name, _, _) in self.HISTOGRAMS}
+        self.statuses = {}  # type: Dict[Optional[int], int]
+        self.lock = threading.Lock()
+
+    def record(self, record: RequestRecord) -> None:
+        with self.lock:
+            self.statuses[record.status_code] = self.statuses.get(record.status_code, 0) + 1
+            for (name, field, resolution) in self.HISTOGRAMS:
+                value = getattr(record, field)
+                if value is not None:
+                    self.histograms[name].record(round(value / resolution))
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            snapshot = {'statuses': dict(self.statuses)}
+            for (name, _, resolution) in self.HISTOGRAMS:
+                snapshot[name] = self.histograms[name].snapshot(resolution)
+            return snapshot
+
+
+class MetricsCollector:
+    """Aggregates the measurements of the requests of service clients by
+    operation_id.
+
+    Set on a service client with set_metrics, every request is measured:
+    the size of the request and response bodies, the time to the first byte
+    of the response, the total latency including reading the body, the HTTP
+    status and the X-Couch-Request-ID and X-CouchDB-Body-Time headers.
+    Timings and sizes are aggregated into histograms that report quantiles
+    within about 3%.
+
+    Typical usage::
+
+        metrics = MetricsCollector()
+        service.set_metrics(metrics)
+        ...
+        print(metrics.snapshot()['get_document']['latency_seconds']['p99'])
+
+    Args:
+        prefix: The prefix of the metric names in the Prometheus export.
+            Defaults to 'cloudant'.
+
+    Attributes:
+        listeners (list): Functions called with the RequestRecord of every
+            request, e.g. to log slow requests with their request ID.
+    """
+
+    def __init__(self, prefix: str = 'cloudant') -> None:
+        self.prefix = prefix
+        self.listeners = []  # type: List[Callable[[RequestRecord], None]]
+        self._operations = {}  # type: Dict[str, _OperationMetrics]
+        self._lock = threading.Lock()
+
+    def record(self, record: RequestRecord) -> None:
+        """Add the measurements of a request."""
+        operation = self._operations.get(record.operation_id)
+        if operation is None:
+            with self._lock:
+                operation = self._operations.setdefault(record.operation_id, _OperationMetrics())
+        operation.record(record)
+        for listener in self.listeners:
+            listener(record)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return the current aggregates of each operation.
+
+        Returns:
+            A dict of operation_id to a dict with the status code counts and
+            the count, sum, mean, min, max and quantiles of each histogram,
+            with times in seconds and sizes in bytes.
+        """
+        with self._lock:
+            operations = dict(self._operations)
+        return {operation_id: operation.snapshot() for (operation_id, operation) in sorted(operations.items())}
+
+    def reset(self) -> None:
+        """Discard all measurements."""
+        with self._lock:
+            self._operations = {}
+
+    def to_prometheus(self) -> str:
+        """Return the aggregates in the Prometheus text exposition format,
+        with histograms as summaries."""
+        lines = []
+        snapshot = self.snapshot()
+        name = '{0}_requests_total'.format(self.prefix)
+        lines.append('# TYPE {0} counter'.format(name))
+        for (operation_id, operation) in snapshot.items():
+            for (status, count) in sorted(operation['statuses'].items(), key=lambda s: s[0] or 0):
+                lines.append('{0}{{operation_id="{1}",status="{2}"}} {3}'.format(
+                    name, operation_id, status if status is not None else 'error', count))
+        for (histogram, _, _) in _OperationMetrics.HISTOGRAMS:
+            name = '{0}_request_{1}'.format(self.prefix, histogram)
+            lines.append('# TYPE {0} summary'.format(name))
+            for (operation_id, operation) in snapshot.items():
+                values = operation[histogram]
+                if not values['count']:
+                    continue
+                for quantile in QUANTILES:
+                    lines.append('{0}{{operation_id="{1}",quantile="{2:g}"}} {3:g}'.format(
+                        name, operation_id, quantile, values['p{0:g}'.format(quantile * 100)]))
+                lines.append('{0}_sum{{operation_id="{1}"}} {2:g}'.format(name, operation_id, values['sum']))
+                lines.append('{0}_count{{operation_id="{1}"}} {2}'.format(name, operation_id, values['count']))
+        return '\n'.join(lines) + '\n'
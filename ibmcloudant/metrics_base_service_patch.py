@@ -0,0 +1,116 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for request metrics
+"""
+import time
+from typing import Mapping, Optional
+
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+from .common import add_response_hook, get_operation_id
+from .json_codec_base_service_patch import new_send as old_send
+from .metrics import MetricsCollector, RequestRecord
+from .streamed_body import StreamedBody
+
+
+def set_metrics(self, collector: MetricsCollector) -> None:
+    """Set the collector of the request metrics, or None to stop collecting.
+
+    Args:
+        collector: The MetricsCollector to use.
+    """
+    self.metrics = collector
+
+
+def new_send(self, request, **kwargs) -> DetailedResponse:  # pylint: disable=missing-docstring
+    collector = getattr(self, 'metrics', None)
+    if collector is None:
+        return old_send(self, request, **kwargs)
+    responses = []
+
+    def on_response(response, *args, **kwargs):  # pylint: disable=unused-argument
+        # the first hook, sees the response as it came off the wire
+        responses.append(response)
+
+    start = time.perf_counter()
+    status_code = None
+    try:
+        result = old_send(self, request, **add_response_hook(kwargs, on_response, first=True))
+        status_code = result.get_status_code()
+        return result
+    except ApiException as err:
+        status_code = err.code
+        raise
+    finally:
+        latency = time.perf_counter() - start
+        response = responses[-1] if responses else None
+        collector.record(_record(request, response, status_code, latency, kwargs.get('stream')))
+
+
+def _record(request, response, status_code, latency, stream) -> RequestRecord:
+    if response is None:
+        return request_record(request, status_code, latency)
+    response_bytes = None
+    if 'Content-Length' not in response.headers and (
+            not stream or response._content_consumed):  # pylint: disable=protected-access
+        response_bytes = len(response.content or b'')
+    # the status on the wire, e.g. a 304 that a response cache replays
+    return request_record(request, response.status_code, latency,
+                          headers=response.headers,
+                          time_to_first_byte=response.elapsed.total_seconds(),
+                          response_bytes=response_bytes)
+
+
+def request_record(request: dict,
+                   status_code: Optional[int],
+                   latency: float,
+                   *,
+                   headers: Mapping[str, str] = None,
+                   time_to_first_byte: float = None,
+                   response_bytes: int = None) -> RequestRecord:
+    """Build the RequestRecord of a request, shared with AsyncCloudantV1.
+
+    Args:
+        request: The request returned by prepare_request.
+        status_code: The status code of the response, None if no response
+            arrived.
+        latency: Seconds until the response was read or failed.
+
+    Keyword Args:
+        headers: (optional) The headers of the response.
+        time_to_first_byte: (optional) Seconds until the response headers
+            arrived.
+        response_bytes: (optional) The size of the response body, used when
+            the response has no Content-Length.
+    """
+    data = request.get('data')
+    if isinstance(data, StreamedBody):
+        request_bytes = data.size
+    else:
+        request_bytes = len(data) if isinstance(data, (bytes, str)) else 0
+    request_id = None
+    body_time = None
+    if headers is not None:
+        request_id = headers.get('X-Couch-Request-ID')
+        length = headers.get('Content-Length')
+        if length is not None and length.isdigit():
+            response_bytes = int(length)
+        try:
+            body_time = int(headers['X-CouchDB-Body-Time']) / 1000
+        except (KeyError, ValueError):
+            pass
+    return RequestRecord(get_operation_id(request['headers']), request['method'], status_code, request_bytes,
+                         response_bytes, time_to_first_byte, latency, request_id, body_time)
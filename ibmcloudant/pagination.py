@@ -0,0 +1,272 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for paging through the results of queries
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .cloudant_v1 import CloudantV1, DocsResultRow, Document, SearchResultRow, ViewResultRow
+
+
+class _Pager:
+    """Base class fetching pages of a query, the next one in the background
+    while the caller processes the current one.
+
+    Subclasses define the operation to call, the member and model of the
+    rows and how the parameters of the next page are derived.
+    """
+
+    _operation = None
+    _rows_key = None
+    _row_model = None
+    _reserved_params = frozenset(['limit', 'skip'])
+    _max_page_size = None
+
+    def __init__(self, service: CloudantV1, page_size: int, prefetch: bool, params: dict,
+                 row_model: Any = None) -> None:
+        reserved = self._reserved_params.intersection(params)
+        if reserved:
+            raise ValueError('The {0} parameter(s) cannot be set for a {1}'.format(
+                ', '.join(sorted(reserved)), type(self).__name__))
+        if page_size < 1 or (self._max_page_size is not None and page_size > self._max_page_size):
+            raise ValueError('page_size must be between 1 and {0}'.format(self._max_page_size or 'unlimited'))
+        self.service = service
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.params = params
+        if row_model is not None:
+            self._row_model = row_model
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return self.pages()
+
+    def pages(self) -> Iterator[List[Any]]:
+        """Return the pages of the result, each a list of up to page_size
+        rows converted to the row model.
+
+        When prefetch is enabled the next page is requested as soon as a page
+        is returned, so its network latency overlaps with the processing of
+        the current page.
+        """
+        params = dict(self.params)
+        pending = None
+        executor = None
+        if self.prefetch:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=type(self).__name__)
+        try:
+            while params is not None:
+                if pending is not None:
+                    (rows, params) = pending.result()
+                else:
+                    (rows, params) = self._fetch(params)
+                pending = executor.submit(self._fetch, params) if executor is not None and params else None
+                if rows:
+                    yield [self._row_model.from_dict(row) for row in rows]
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def rows(self) -> Iterator[Any]:
+        """Return the rows of all pages one at a time."""
+        for page in self.pages():
+            yield from page
+
+    def _fetch(self, params: dict) -> Tuple[List[dict], Optional[dict]]:
+        """Fetch a page, returning its rows and the parameters of the next
+        page or None if it is the last."""
+        raise NotImplementedError
+
+
+class _KeyPager(_Pager):
+    """Pages through view-like results by starting each page at the key of
+    the first row that did not fit on the previous one."""
+
+    _reserved_params = frozenset(['keys', 'limit', 'skip', 'startkey_docid'])
+
+    def _fetch(self, params: dict) -> Tuple[List[dict], Optional[dict]]:
+        result = self._operation(**params, limit=self.page_size + 1).get_result()
+        rows = result[self._rows_key]
+        if len(rows) <= self.page_size:
+            return (rows, None)
+        return (rows[:self.page_size], self._next_params(params, rows[self.page_size]))
+
+    def _next_params(self, params: dict, next_row: dict) -> dict:
+        return dict(params, startkey=next_row['key'])
+
+
+class AllDocsPager(_KeyPager):
+    """Pages through the rows of post_all_docs.
+
+    Each page requests one row more than ``page_size`` and the next page
+    starts at the ID of that row, so pages are never computed with ``skip``,
+    whose cost grows with the position in the index.
+
+    Typical usage::
+
+        for page in AllDocsPager(service, 'db', page_size=500, include_docs=True):
+            for row in page:
+                process(row.doc)
+
+    Args:
+        service: The service client to query with.
+        db: The name of the database.
+
+    Keyword Args:
+        page_size: The number of rows per page. Defaults to 200.
+        prefetch: False to request a page only once the previous one has
+            been processed. Defaults to True.
+        row_model: The model class to convert the rows into, e.g.
+            CompactDocsResultRow. Defaults to DocsResultRow.
+        **params: Any other post_all_docs parameters, e.g. include_docs,
+            startkey or endkey.
+
+    Raises:
+        ValueError: keys, limit or skip was supplied.
+    """
+
+    _row_model = DocsResultRow
+    _rows_key = 'rows'
+
+    def __init__(self, service: CloudantV1, db: str, *, page_size: int = 200, prefetch: bool = True,
+                 row_model: Any = None, **params) -> None:
+        super().__init__(service, page_size, prefetch, dict(params, db=db), row_model)
+        self._operation = service.post_all_docs
+
+
+class ViewPager(_KeyPager):
+    """Pages through the rows of post_view.
+
+    Each page requests one row more than ``page_size`` and the next page
+    starts at the key and document ID of that row, so pages are never
+    computed with ``skip`` and rows sharing a key are neither repeated nor
+    missed.
+
+    Args:
+        service: The service client to query with.
+        db: The name of the database.
+        ddoc: The name of the design document.
+        view: The name of the view.
+
+    Keyword Args:
+        page_size: The number of rows per page. Defaults to 200.
+        prefetch: False to request a page only once the previous one has
+            been processed. Defaults to True.
+        row_model: The model class to convert the rows into, e.g.
+            CompactViewResultRow. Defaults to ViewResultRow.
+        **params: Any other post_view parameters, e.g. include_docs,
+            startkey or reduce.
+
+    Raises:
+        ValueError: keys, limit, skip or startkey_docid was supplied.
+    """
+
+    _row_model = ViewResultRow
+    _rows_key = 'rows'
+
+    def __init__(self, service: CloudantV1, db: str, ddoc: str, view: str, *, page_size: int = 200,
+                 prefetch: bool = True, row_model: Any = None, **params) -> None:
+        super().__init__(service, page_size, prefetch, dict(params, db=db, ddoc=ddoc, view=view), row_model)
+        self._operation = service.post_view
+
+    def _next_params(self, params: dict, next_row: dict) -> dict:
+        params = dict(params, startkey=next_row['key'])
+        # reduced rows have no ID, their keys are unique
+        if next_row.get('id') is not None:
+            params['startkey_docid'] = next_row['id']
+        return params
+
+
+class _BookmarkPager(_Pager):
+    """Pages through query results by passing the bookmark of each page to
+    the next request."""
+
+    _reserved_params = frozenset(['bookmark', 'limit', 'skip'])
+
+    def _fetch(self, params: dict) -> Tuple[List[dict], Optional[dict]]:
+        result = self._operation(**params, limit=self.page_size).get_result()
+        rows = result[self._rows_key]
+        if len(rows) < self.page_size or not result.get('bookmark'):
+            return (rows, None)
+        return (rows, dict(params, bookmark=result['bookmark']))
+
+
+class FindPager(_BookmarkPager):
+    """Pages through the documents of post_find using bookmarks.
+
+    Typical usage::
+
+        for page in FindPager(service, 'db', selector={'type': 'order'}):
+            for document in page:
+                process(document)
+
+    Args:
+        service: The service client to query with.
+        db: The name of the database.
+        selector: The selector of the query.
+
+    Keyword Args:
+        page_size: The number of documents per page. Defaults to 200.
+        prefetch: False to request a page only once the previous one has
+            been processed. Defaults to True.
+        **params: Any other post_find parameters, e.g. fields, sort or
+            use_index.
+
+    Raises:
+        ValueError: bookmark, limit or skip was supplied.
+    """
+
+    _row_model = Document
+    _rows_key = 'docs'
+
+    def __init__(self, service: CloudantV1, db: str, selector: dict, *, page_size: int = 200,
+                 prefetch: bool = True, **params) -> None:
+        super().__init__(service, page_size, prefetch, dict(params, db=db, selector=selector))
+        self._operation = service.post_find
+
+
+class SearchPager(_BookmarkPager):
+    """Pages through the rows of post_search using bookmarks.
+
+    Args:
+        service: The service client to query with.
+        db: The name of the database.
+        ddoc: The name of the design document.
+        index: The name of the search index.
+        query: The Lucene query.
+
+    Keyword Args:
+        page_size: The number of rows per page, at most 200.
+            Defaults to 200.
+        prefetch: False to request a page only once the previous one has
+            been processed. Defaults to True.
+        **params: Any other post_search parameters, e.g. include_docs or
+            sort.
+
+    Raises:
+        ValueError: bookmark, limit, counts, group_field or ranges was
+            supplied.
+    """
+
+    _row_model = SearchResultRow
+    _rows_key = 'rows'
+    _reserved_params = frozenset(['bookmark', 'counts', 'group_field', 'limit', 'ranges'])
+    _max_page_size = 200
+
+    def __init__(self, service: CloudantV1, db: str, ddoc: str, index: str, query: str, *,
+                 page_size: int = 200, prefetch: bool = True, **params) -> None:
+        super().__init__(service, page_size, prefetch, dict(params, db=db, ddoc=ddoc, index=index, query=query))
+        self._operation = service.post_search
@@ -0,0 +1,52 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch post_bulk_docs for streamed request bodies
+"""
+from typing import BinaryIO, Iterable, Union
+
+from ibm_cloud_sdk_core import DetailedResponse
+from .cloudant_v1 import BulkDocs, CloudantV1
+from .json_codec import get_json_codec
+from .streamed_body import StreamedBody, bulk_docs_body
+
+old_post_bulk_docs = CloudantV1.post_bulk_docs
+
+
+def new_post_bulk_docs(self, db: str, bulk_docs: Union[BulkDocs, BinaryIO, Iterable], **kwargs) -> DetailedResponse:
+    """
+    Bulk modify multiple documents in a database.
+
+    In addition to a BulkDocs model or a file-like body, bulk_docs can be any
+    iterable of Document models or dicts, e.g. a generator, or a BulkDocs
+    with such an iterable as docs. The body is then encoded one document at
+    a time while it is sent with chunked transfer encoding, and compressed
+    on the fly when gzip compression is enabled, so that a batch is never
+    held in memory as a whole. Requests with such bodies are not retried.
+
+    :param str db: Path parameter to specify the database name.
+    :param BulkDocs bulk_docs: HTTP request body for postBulkDocs.
+    :param dict headers: A `dict` containing the request headers
+    :return: A `DetailedResponse` containing the result, headers and HTTP status code.
+    :rtype: DetailedResponse with `List[DocumentResult]` result
+    """
+    if isinstance(bulk_docs, BulkDocs):
+        if bulk_docs.docs is not None and not isinstance(bulk_docs.docs, list):
+            bulk_docs = bulk_docs_body(bulk_docs.docs, get_json_codec(self), new_edits=bulk_docs.new_edits)
+    elif not (bulk_docs is None or isinstance(bulk_docs, (dict, str, bytes, StreamedBody))
+              or hasattr(bulk_docs, 'read')):
+        bulk_docs = bulk_docs_body(bulk_docs, get_json_codec(self))
+    return old_post_bulk_docs(self, db, bulk_docs, **kwargs)
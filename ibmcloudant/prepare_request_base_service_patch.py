@@ -0,0 +1,161 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for a leaner request preparation
+"""
+import gzip
+from functools import lru_cache
+from typing import Any, List
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import quote, super_len
+
+from ibm_cloud_sdk_core.utils import strip_extra_slashes
+from .cloudant_v1 import CloudantV1
+from .json_codec import JsonBody, get_json_codec
+from .streamed_body import StreamedBody
+
+old_prepare_request = CloudantV1.prepare_request
+
+# zlib's default, much cheaper than the level 9 of gzip.compress for
+# nearly the same size of JSON bodies
+DEFAULT_GZIP_COMPRESSION_LEVEL = 6
+
+# Bodies from this size on are compressed while they are sent instead of
+# being held in memory both uncompressed and compressed
+STREAMED_GZIP_SIZE = 1024 * 1024
+
+
+def set_gzip_compression_level(self, level: int) -> None:
+    """Set the gzip compression level of request bodies.
+
+    Args:
+        level: From 1, the fastest, to 9, the smallest. Defaults to 6.
+            Use set_enable_gzip_compression(False) to send bodies
+            uncompressed.
+
+    Raises:
+        ValueError: The level is not between 1 and 9.
+    """
+    if not 1 <= level <= 9:
+        raise ValueError('level must be between 1 and 9')
+    self.gzip_compression_level = level
+
+
+def set_gzip_compression_threshold(self, threshold: int) -> None:
+    """Set the size in bytes below which request bodies are sent
+    uncompressed, as compressing small bodies costs more time than sending
+    the bytes saved.
+
+    Args:
+        threshold: The minimum size of a compressed body. Defaults to 0,
+            compressing all bodies.
+    """
+    self.gzip_compression_threshold = threshold
+
+
+def new_encode_path_vars(*args: str) -> List[str]:  # pylint: disable=missing-docstring
+    # database names repeat on nearly every request
+    return [_quote_path_var(arg) for arg in args]
+
+
+@lru_cache(maxsize=1024)
+def _quote_path_var(value: str) -> str:
+    return quote(value, safe='')
+
+
+def new_prepare_request(self, method, url, *, headers=None, params=None,  # pylint: disable=missing-docstring
+                        data=None, files=None, **kwargs) -> dict:
+    if isinstance(data, JsonBody):
+        data = get_json_codec(self).dumps(data.value)
+    # The operations only send str or bytes bodies serialized by themselves,
+    # streamed bodies or files, leave dicts and multipart bodies to sdk core.
+    if files is not None or not (data is None or isinstance(data, (str, bytes, StreamedBody))
+                                 or hasattr(data, 'read')):
+        return old_prepare_request(self, method, url, headers=headers, params=params, data=data, files=files,
+                                   **kwargs)
+    # the configuration is read once, as other threads may replace it
+    service_url = self.service_url
+    default_headers = self.default_headers
+    if not service_url:
+        raise ValueError('The service_url is required')
+    # One pass each over headers and params, where sdk core first removes
+    # the None values and then converts the booleans in separate copies.
+    headers = _case_insensitive({
+        name.lower(): (name, ('true' if value else 'false') if isinstance(value, bool) else value)
+        for (name, value) in headers.items() if value is not None
+    } if headers else {})
+    if default_headers is not None:
+        _update(headers, default_headers)
+    if 'user-agent' not in headers:
+        _update(headers, self.user_agent_header)
+    if params is not None:
+        params = {
+            name: (('true' if value else 'false') if isinstance(value, bool) else value)
+            for (name, value) in params.items() if value is not None
+        }
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    request = {
+        'method': method,
+        'url': strip_extra_slashes(service_url + url),
+        'headers': headers,
+        'params': params,
+        'data': data,
+    }
+    self.authenticator.authenticate(request)
+    if data is not None and self.get_enable_gzip_compression() and 'content-encoding' not in headers:
+        request['data'] = _compress(self, data, headers)
+    request['files'] = []
+    return request
+
+
+def _compress(self, data: Any, headers: CaseInsensitiveDict) -> Any:
+    """Return the body compressed with gzip unless it is smaller than the
+    threshold. Large and file bodies are compressed while they are sent,
+    the rest in memory to keep their Content-Length."""
+    level = getattr(self, 'gzip_compression_level', DEFAULT_GZIP_COMPRESSION_LEVEL)
+    threshold = getattr(self, 'gzip_compression_threshold', 0)
+    if isinstance(data, bytes):
+        size = len(data)
+    elif isinstance(data, StreamedBody):
+        size = None
+    else:
+        # the remaining length of a file, 0 if unknown
+        size = super_len(data) or None
+    if size is not None and size < threshold:
+        return data
+    headers['content-encoding'] = 'gzip'
+    if isinstance(data, bytes):
+        if size < STREAMED_GZIP_SIZE:
+            return gzip.compress(data, level)
+        data = StreamedBody.from_bytes(data)
+    elif not isinstance(data, StreamedBody):
+        data = StreamedBody.from_file(data)
+    return data.gzip(level)
+
+
+def _case_insensitive(store: dict) -> CaseInsensitiveDict:
+    """Build a CaseInsensitiveDict from its internal lower case name to
+    (name, value) store, skipping the costly MutableMapping.update."""
+    headers = CaseInsensitiveDict.__new__(CaseInsensitiveDict)
+    headers._store = store  # pylint: disable=protected-access
+    return headers
+
+
+def _update(headers: CaseInsensitiveDict, other: dict) -> None:
+    for (name, value) in other.items():
+        headers[name] = value
@@ -0,0 +1,239 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for limiting the request rate to the provisioned throughput capacity
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+READ = 'read'
+WRITE = 'write'
+GLOBAL_QUERY = 'query'
+
+# Requests per second of a block of provisioned throughput capacity
+BLOCK_CAPACITY = {READ: 100, WRITE: 50, GLOBAL_QUERY: 5}
+
+_READ_OPERATIONS = frozenset([
+    'get_attachment', 'get_design_document', 'get_design_document_information', 'get_document',
+    'get_geo_index_information', 'get_indexes_information', 'get_local_document', 'get_search_info',
+    'head_attachment', 'head_design_document', 'head_document', 'head_local_document', 'post_all_docs',
+    'post_all_docs_queries', 'post_bulk_get', 'post_changes', 'post_design_docs', 'post_design_docs_queries',
+    'post_explain', 'post_local_docs', 'post_local_docs_queries', 'post_missing_revs', 'post_partition_all_docs',
+    'post_partition_find', 'post_partition_search', 'post_partition_view', 'post_revs_diff',
+])
+_WRITE_OPERATIONS = frozenset([
+    'delete_attachment', 'delete_design_document', 'delete_document', 'delete_index', 'delete_local_document',
+    'post_bulk_docs', 'post_document', 'post_index', 'put_attachment', 'put_design_document', 'put_document',
+    'put_local_document',
+])
+_GLOBAL_QUERY_OPERATIONS = frozenset([
+    'get_geo', 'post_find', 'post_search', 'post_view', 'post_view_queries',
+])
+_OPERATION_SUFFIXES = ('_as_stream', '_as_mixed', '_as_related')
+
+
+def classify(operation_id: str) -> Optional[str]:
+    """Return the throughput class, READ, WRITE or GLOBAL_QUERY, of an
+    operation, or None for operations that do not count against the
+    provisioned capacity, e.g. database or server management."""
+    if operation_id is None:
+        return None
+    for suffix in _OPERATION_SUFFIXES:
+        if operation_id.endswith(suffix):
+            operation_id = operation_id[:-len(suffix)]
+            break
+    if operation_id in _READ_OPERATIONS:
+        return READ
+    if operation_id in _WRITE_OPERATIONS:
+        return WRITE
+    if operation_id in _GLOBAL_QUERY_OPERATIONS:
+        return GLOBAL_QUERY
+    return None
+
+
+class TokenBucket:
+    """A token bucket whose rate adapts to throttling by the server.
+
+    Callers take a token per request, waiting for it when the bucket is
+    empty. Waiting callers are queued by reserving future tokens, so each
+    waits exactly until its own token is due.
+
+    The rate is cut by ``decrease`` when the server throttles a request,
+    at most once per ``cooldown`` seconds so that a burst of 429 responses to
+    requests already in flight counts once, and grows back towards the
+    ceiling by ``recovery`` times the ceiling per second.
+
+    Args:
+        rate: The ceiling of the rate in tokens per second.
+
+    Keyword Args:
+        burst: The number of seconds of tokens that can be taken at once.
+            Defaults to 1.
+        decrease: The factor the rate is multiplied by when throttled.
+            Defaults to 0.75.
+        recovery: The fraction of the ceiling the rate grows by per second.
+            Defaults to 0.05.
+        cooldown: The minimum number of seconds between decreases.
+            Defaults to 1.
+
+    Attributes:
+        rate (float): The current rate in tokens per second.
+        throttled (int): The number of throttled requests reported.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 *,
+                 burst: float = 1.0,
+                 decrease: float = 0.75,
+                 recovery: float = 0.05,
+                 cooldown: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.ceiling = rate
+        self.rate = rate
+        self.burst = burst
+        self.decrease = decrease
+        self.recovery = recovery
+        self.cooldown = cooldown
+        self.throttled = 0
+        self._tokens = rate * burst
+        self._updated = time.monotonic()
+        self._last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self) -> float:
+        """Take a token without waiting for it, e.g. to wait with
+        asyncio.sleep instead.
+
+        Returns:
+            The number of seconds until the token is due.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def throttle(self) -> None:
+        """Report that the server throttled a request."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttled += 1
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.ceiling * 0.01, self.rate * self.decrease)
+            # drop the tokens accumulated at the old rate
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate < self.ceiling:
+            self.rate = min(self.ceiling, self.rate + self.ceiling * self.recovery * elapsed)
+        self._tokens = min(self.rate * self.burst, self._tokens + self.rate * elapsed)
+
+
+class RateLimiter:
+    """Limits the requests of a service client to the provisioned throughput
+    capacity of each class of requests of an IBM Cloudant instance: reads,
+    writes and global queries.
+
+    Set on a service client with set_rate_limiter, every request of a
+    limited class waits for a token of its class. When the server responds
+    429 Too Many Requests the rate of the class is reduced, recovering
+    gradually afterwards, so the client settles just below the capacity
+    available to it.
+
+    Typical usage, with the rates read from the instance::
+
+        service.set_rate_limiter(RateLimiter.from_capacity(service))
+
+    Keyword Args:
+        read: The read requests per second, None for no limit.
+        write: The write requests per second, None for no limit.
+        query: The global query requests per second, None for no limit.
+        utilization: The fraction of the capacity to use. Defaults to 1.
+        **bucket_params: Any other TokenBucket parameters.
+
+    Attributes:
+        buckets (dict): The TokenBucket of each limited class.
+    """
+
+    def __init__(self,
+                 *,
+                 read: float = None,
+                 write: float = None,
+                 query: float = None,
+                 utilization: float = 1.0,
+                 **bucket_params) -> None:
+        rates = {READ: read, WRITE: write, GLOBAL_QUERY: query}
+        self.buckets = {
+            throughput_class: TokenBucket(rate * utilization, **bucket_params)
+            for (throughput_class, rate) in rates.items() if rate
+        }  # type: Dict[str, TokenBucket]
+
+    @classmethod
+    def from_capacity(cls, service, **kwargs) -> 'RateLimiter':
+        """Create a limiter from the current provisioned throughput capacity
+        of the instance, as reported by get_capacity_throughput_information.
+
+        Args:
+            service: The service client of the instance.
+            **kwargs: Any other RateLimiter parameters.
+        """
+        throughput = service.get_capacity_throughput_information().get_result()['current']['throughput']
+        blocks = throughput.get('blocks') or 0
+        rates = {throughput_class: throughput.get(throughput_class) or blocks * capacity
+                 for (throughput_class, capacity) in BLOCK_CAPACITY.items()}
+        return cls(**rates, **kwargs)
+
+    def acquire(self, operation_id: str) -> float:
+        """Wait for a token of the class of an operation.
+
+        Returns:
+            The number of seconds waited.
+        """
+        bucket = self.buckets.get(classify(operation_id))
+        return bucket.acquire() if bucket is not None else 0.0
+
+    def reserve(self, operation_id: str) -> float:
+        """Take a token of the class of an operation without waiting for it.
+
+        Returns:
+            The number of seconds until the token is due.
+        """
+        bucket = self.buckets.get(classify(operation_id))
+        return bucket.reserve() if bucket is not None else 0.0
+
+    def throttle(self, operation_id: str) -> None:
+        """Report that the server throttled a request of an operation."""
+        bucket = self.buckets.get(classify(operation_id))
+        if bucket is not None:
+            bucket.throttle()
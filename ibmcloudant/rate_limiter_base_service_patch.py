@@ -0,0 +1,45 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for client side rate limiting
+"""
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+from .common import get_operation_id
+from .rate_limiter import RateLimiter
+from .response_cache_base_service_patch import new_send as old_send
+
+
+def set_rate_limiter(self, limiter: RateLimiter) -> None:
+    """Set the limiter of the request rate, or None to stop limiting.
+
+    Args:
+        limiter: The RateLimiter to use.
+    """
+    self.rate_limiter = limiter
+
+
+def new_send(self, request, **kwargs) -> DetailedResponse:  # pylint: disable=missing-docstring
+    limiter = getattr(self, 'rate_limiter', None)
+    if limiter is None:
+        return old_send(self, request, **kwargs)
+    operation_id = get_operation_id(request['headers'])
+    limiter.acquire(operation_id)
+    try:
+        return old_send(self, request, **kwargs)
+    except ApiException as err:
+        if err.code == 429:
+            limiter.throttle(operation_id)
+        raise
@@ -0,0 +1,117 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for caching document responses validated by their ETag
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    """A response body stored with the ETag that validates it."""
+    etag: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class ResponseCache:
+    """A size bounded, least recently used cache of response bodies.
+
+    Set on a service client with set_response_cache, the cache stores the
+    responses of get_document, get_design_document and get_local_document
+    together with their ETag. Later reads of the same URL and query send the
+    ETag in an If-None-Match header and, when the server replies 304 Not
+    Modified, the cached body is returned as if the server had sent it.
+
+    The cache is safe to share between threads and service clients that use
+    the same credentials.
+
+    Args:
+        max_entries: The maximum number of responses to keep.
+            Defaults to 1000.
+        max_bytes: (optional) The maximum total size of the bodies kept.
+
+    Attributes:
+        hits (int): The number of responses served from the cache.
+        misses (int): The number of responses fetched from the server.
+        evictions (int): The number of responses removed to make room for
+            others.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = None) -> None:
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return the response stored for the key, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> None:
+        """Store a response, evicting the least recently used ones when the
+        cache is full."""
+        if self.max_bytes is not None and len(entry.body) > self.max_bytes:
+            self.discard(key)
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> bool:
+        """Remove the response stored for the key, returning whether there
+        was one."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.body)
+            return entry is not None
+
+    def record(self, hit: bool) -> None:
+        """Count a response served from the cache or from the server."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        """Remove all responses."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
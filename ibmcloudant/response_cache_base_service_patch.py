@@ -0,0 +1,92 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for conditional document requests
+"""
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from ibm_cloud_sdk_core import DetailedResponse
+from .common import add_response_hook, get_operation_id
+from .metrics_base_service_patch import new_send as old_send
+from .response_cache import CachedResponse, ResponseCache
+
+CACHEABLE_OPERATIONS = frozenset(['get_document', 'get_design_document', 'get_local_document'])
+
+
+def set_response_cache(self, cache: ResponseCache) -> None:
+    """Set the cache for the responses of get_document, get_design_document
+    and get_local_document, or None to stop caching.
+
+    Args:
+        cache: The ResponseCache to use.
+    """
+    self.response_cache = cache
+
+
+def new_send(self, request, **kwargs) -> DetailedResponse:  # pylint: disable=missing-docstring
+    cache = getattr(self, 'response_cache', None)
+    if (cache is None or request['method'] != 'GET' or kwargs.get('stream')
+            or get_operation_id(request['headers']) not in CACHEABLE_OPERATIONS
+            or 'If-None-Match' in request['headers']):
+        return old_send(self, request, **kwargs)
+    key = (request['url'], tuple(sorted((request['params'] or {}).items())))
+    entry = cache.get(key)
+    if entry is not None:
+        # A copy, as the header in the caller's request, e.g. a request
+        # retried by the retry policy, means the caller validates itself.
+        headers = request['headers'].copy()
+        headers['If-None-Match'] = entry.etag
+        request = dict(request, headers=headers)
+
+    def on_response(response, *args, **kwargs):  # pylint: disable=unused-argument
+        if response.status_code == 304 and entry is not None:
+            cache.record(True)
+            return _replay(entry, response)
+        cache.record(False)
+        etag = response.headers.get('ETag')
+        if response.status_code == 200 and etag:
+            headers = CaseInsensitiveDict(response.headers)
+            # The cached body is stored decoded
+            headers.pop('Content-Encoding', None)
+            headers.pop('Transfer-Encoding', None)
+            cache.put(key, CachedResponse(etag, dict(headers), response.content))
+        elif response.status_code == 404:
+            cache.discard(key)
+        return response
+
+    return old_send(self, request, **add_response_hook(kwargs, on_response))
+
+
+def _replay(entry: CachedResponse, not_modified: Response) -> Response:
+    """Build a 200 response with the cached body and the current headers,
+    releasing the connection of the 304 response to the pool."""
+    # reading the empty body before closing keeps the connection open
+    not_modified.content  # pylint: disable=pointless-statement
+    not_modified.close()
+    response = Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.headers.update(not_modified.headers)
+    response.headers['Content-Length'] = str(len(entry.body))
+    response.encoding = 'utf-8'
+    response._content = entry.body  # pylint: disable=protected-access
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.elapsed = not_modified.elapsed
+    response.cookies = not_modified.cookies
+    return response
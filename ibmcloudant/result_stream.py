@@ -0,0 +1,477 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for incrementally decoding the results of the *_as_stream operations
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List
+
+from ibm_cloud_sdk_core import DetailedResponse
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_CHARS = re.compile(r'[^"\\]*')
+_SCALAR_END = re.compile(r'[,\]}\s]')
+
+# Parser states
+_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_ROWS = 4
+_ROWS_SEPARATOR = 5
+_AFTER_VALUE = 6
+_DONE = 7
+
+# Consumed text is only trimmed from the buffer once it exceeds this many
+# characters to avoid re-copying the buffer after every row.
+_TRIM_THRESHOLD = 65536
+
+# Returned by _next_value for a value that has not fully arrived, as None is
+# the value of a JSON null
+_INCOMPLETE = object()
+
+
+class IncrementalResultParser:
+    """Push parser that extracts the elements of a result array from JSON text
+    as it arrives, without ever holding the complete response in memory.
+
+    Two layouts are understood:
+      * a single JSON object where one member (``rows_key``) is an array of
+        rows, e.g. ``{"total_rows": 2, "rows": [{...}, {...}]}``. All other
+        members, whether before or after the array, are collected into
+        ``metadata``.
+      * a continuous changes feed, i.e. a sequence of whitespace separated
+        JSON objects. Objects carrying a ``last_seq`` but no ``id`` are
+        treated as metadata, all others are rows.
+
+    This class is used by ResultStream and AsyncResultStream and is internal.
+
+    Args:
+        rows_key: The name of the member holding the array of rows.
+        continuous: True to parse a continuous changes feed.
+
+    Attributes:
+        metadata (dict): The non-row members of the response seen so far.
+    """
+
+    def __init__(self, rows_key: str = 'rows', continuous: bool = False):
+        self.rows_key = rows_key
+        self.continuous = continuous
+        self.metadata = {}
+        self._buf = ''
+        self._pos = 0
+        self._state = _START
+        self._key = None
+        self._decoder = json.JSONDecoder()
+        self._scan_start = None
+        self._scan_pos = 0
+        self._scan_depth = 0
+        self._scan_in_string = False
+
+    def feed(self, text: str) -> List[Any]:
+        """Add text to the parser.
+
+        Args:
+            text: The next piece of the response body.
+
+        Returns:
+            The rows completed by this piece of text, as decoded JSON.
+
+        Raises:
+            ValueError: The text is not a valid result.
+        """
+        if self._pos > _TRIM_THRESHOLD:
+            self._trim()
+        self._buf += text
+        rows = []
+        if self.continuous:
+            self._parse_continuous(rows)
+        else:
+            self._parse_object(rows)
+        return rows
+
+    def close(self) -> None:
+        """Signal the end of the response body.
+
+        Raises:
+            ValueError: The response body ended before the result was complete.
+        """
+        self._skip_whitespace()
+        if self._pos < len(self._buf) or (not self.continuous and self._state != _DONE):
+            raise ValueError('Incomplete or invalid JSON in response stream')
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the result object has been parsed."""
+        return self._state == _DONE
+
+    def _trim(self) -> None:
+        self._buf = self._buf[self._pos:]
+        if self._scan_start is not None:
+            self._scan_start -= self._pos
+            self._scan_pos -= self._pos
+        self._pos = 0
+
+    def _skip_whitespace(self) -> bool:
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        return self._pos < len(self._buf)
+
+    def _expect(self, char: str) -> None:
+        if self._buf[self._pos] != char:
+            raise ValueError('Unexpected character {0!r} at offset {1} in response stream, expected {2!r}'.format(
+                self._buf[self._pos], self._pos, char))
+        self._pos += 1
+
+    def _parse_continuous(self, rows: list) -> None:
+        while self._skip_whitespace():
+            value = self._next_value()
+            if value is _INCOMPLETE:
+                return
+            if isinstance(value, dict) and 'last_seq' in value and 'id' not in value:
+                self.metadata.update(value)
+            else:
+                rows.append(value)
+
+    # pylint: disable=too-many-branches
+    def _parse_object(self, rows: list) -> None:
+        while self._state != _DONE and self._skip_whitespace():
+            state = self._state
+            if state == _START:
+                self._expect('{')
+                self._state = _KEY
+            elif state == _KEY:
+                if self._buf[self._pos] == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                key = self._next_value()
+                if key is _INCOMPLETE:
+                    return
+                if not isinstance(key, str):
+                    raise ValueError('Invalid member name in response stream')
+                self._key = key
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(':')
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._key == self.rows_key and self._buf[self._pos] == '[':
+                    self._pos += 1
+                    self._state = _ROWS
+                    continue
+                value = self._next_value()
+                if value is _INCOMPLETE:
+                    return
+                self.metadata[self._key] = value
+                self._state = _AFTER_VALUE
+            elif state == _ROWS:
+                if self._buf[self._pos] == ']':
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                value = self._next_value()
+                if value is _INCOMPLETE:
+                    return
+                rows.append(value)
+                self._state = _ROWS_SEPARATOR
+            elif state == _ROWS_SEPARATOR:
+                if self._buf[self._pos] == ']':
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                else:
+                    self._expect(',')
+                    self._state = _ROWS
+            elif state == _AFTER_VALUE:
+                if self._buf[self._pos] == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    self._expect(',')
+                    self._state = _KEY
+
+    def _next_value(self) -> Any:
+        """Decode the JSON value starting at the current position.
+
+        Returns _INCOMPLETE, leaving the position unchanged, when the value is
+        not yet complete. Scanning resumes where it left off on the next call so that
+        large values arriving in many pieces are only scanned once.
+        """
+        if self._scan_start != self._pos:
+            self._scan_start = self._pos
+            self._scan_pos = self._pos
+            self._scan_depth = 0
+            self._scan_in_string = False
+        end = self._scan()
+        if end < 0:
+            return _INCOMPLETE
+        value, end = self._decoder.raw_decode(self._buf, self._pos)
+        self._pos = end
+        self._scan_start = None
+        return value
+
+    def _scan(self) -> int:
+        buf = self._buf
+        length = len(buf)
+        i = self._scan_pos
+        depth = self._scan_depth
+        in_string = self._scan_in_string
+        if i == self._scan_start and buf[i] not in '{["':
+            match = _SCALAR_END.search(buf, i)
+            return match.start() if match else -1
+        while True:
+            if in_string:
+                i = _STRING_CHARS.match(buf, i).end()
+                if i >= length or (buf[i] == '\\' and i + 1 >= length):
+                    break
+                if buf[i] == '\\':
+                    i += 2
+                    continue
+                i += 1
+                in_string = False
+                if depth == 0:
+                    return i
+                continue
+            match = _STRUCTURAL.search(buf, i)
+            if match is None:
+                i = length
+                break
+            char = match.group()
+            i = match.end()
+            if char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return i
+        self._scan_pos = i
+        self._scan_depth = depth
+        self._scan_in_string = in_string
+        return -1
+
+
+class _ResultStreamBase:
+    """Accessors shared by ResultStream and AsyncResultStream."""
+
+    _parser = None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """The members of the result other than the rows read so far."""
+        return self._parser.metadata
+
+    @property
+    def total_rows(self) -> int:
+        """The total_rows of an all docs, view or search result."""
+        return self.metadata.get('total_rows')
+
+    @property
+    def update_seq(self) -> str:
+        """The update_seq of an all docs or view result."""
+        return self.metadata.get('update_seq')
+
+    @property
+    def bookmark(self) -> str:
+        """The bookmark of a find or search result."""
+        return self.metadata.get('bookmark')
+
+    @property
+    def last_seq(self) -> str:
+        """The last_seq of a changes result."""
+        return self.metadata.get('last_seq')
+
+    @property
+    def pending(self) -> int:
+        """The pending count of a changes result."""
+        return self.metadata.get('pending')
+
+
+class ResultStream(_ResultStreamBase):
+    """Iterates over the rows of a streamed result one at a time as the bytes
+    arrive, so memory use is bounded by the largest row rather than by the
+    size of the response.
+
+    The remaining members of the result, for example ``total_rows``,
+    ``bookmark`` or ``last_seq``, are available from ``metadata`` once they
+    have been read; members that follow the rows are only available after
+    the iteration has finished.
+
+    Typical usage::
+
+        response = service.post_view_as_stream(db='db', ddoc='ddoc', view='view')
+        with ResultStream(response, ViewResultRow) as rows:
+            for row in rows:
+                ...
+        total_rows = rows.total_rows
+
+    Suitable ``rows_key`` and ``row_model`` combinations are ``'rows'`` with
+    ``DocsResultRow`` (all docs), ``ViewResultRow`` (views) and
+    ``SearchResultRow`` (search), ``'docs'`` with ``Document`` (find) and
+    ``'results'`` with ``ChangesResultItem`` (changes) or
+    ``BulkGetResultItem`` (bulk get). The Compact models of compact_models
+    use less memory and decode faster for large results.
+
+    Args:
+        response: The response of an *_as_stream operation. A DetailedResponse,
+            a requests.Response, a binary file-like object or an iterable of
+            bytes are accepted.
+        row_model: (optional) A model class with a from_dict method to convert
+            each row into. Rows are returned as decoded JSON when omitted.
+
+    Keyword Args:
+        rows_key: The name of the member holding the rows. Defaults to 'rows'.
+        continuous: True when the response is a continuous changes feed.
+            Defaults to False.
+        chunk_size: The number of bytes to read from the response at a time.
+
+    Attributes:
+        metadata (dict): The members of the result other than the rows.
+
+    Raises:
+        ValueError: The response body is not a valid result.
+    """
+
+    def __init__(self,
+                 response: Any,
+                 row_model: Any = None,
+                 *,
+                 rows_key: str = 'rows',
+                 continuous: bool = False,
+                 chunk_size: int = 16384) -> None:
+        if isinstance(response, DetailedResponse):
+            response = response.get_result()
+        self._response = response
+        self._row_model = row_model
+        self._chunk_size = chunk_size
+        self._parser = IncrementalResultParser(rows_key, continuous)
+        self._rows = self._iter_rows()
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        return next(self._rows)
+
+    def __enter__(self) -> 'ResultStream':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop reading and release the underlying connection."""
+        self._rows.close()
+        if hasattr(self._response, 'close'):
+            self._response.close()
+
+    def _chunks(self) -> Iterable[bytes]:
+        if hasattr(self._response, 'iter_content'):
+            return self._response.iter_content(chunk_size=self._chunk_size)
+        if hasattr(self._response, 'read'):
+            return iter(lambda: self._response.read(self._chunk_size), b'')
+        return self._response
+
+    def _iter_rows(self) -> Iterator[Any]:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parser = self._parser
+        from_dict = self._row_model.from_dict if self._row_model is not None else None
+        for chunk in self._chunks():
+            for row in parser.feed(decoder.decode(chunk)):
+                yield from_dict(row) if from_dict else row
+        for row in parser.feed(decoder.decode(b'', final=True)):
+            yield from_dict(row) if from_dict else row
+        parser.close()
+
+
+class AsyncResultStream(_ResultStreamBase):
+    """The asynchronous counterpart of ResultStream for the responses of
+    AsyncCloudantV1, to be consumed with ``async for``::
+
+        response = await service.post_all_docs_as_stream(db='db')
+        async with AsyncResultStream(response, DocsResultRow) as rows:
+            async for row in rows:
+                ...
+
+    Args:
+        response: The response of an *_as_stream operation. A DetailedResponse,
+            an aiohttp.ClientResponse or an async iterable of bytes are
+            accepted.
+        row_model: (optional) A model class with a from_dict method to convert
+            each row into. Rows are returned as decoded JSON when omitted.
+
+    Keyword Args:
+        rows_key: The name of the member holding the rows. Defaults to 'rows'.
+        continuous: True when the response is a continuous changes feed.
+            Defaults to False.
+        chunk_size: The maximum number of bytes to read from the response at
+            a time.
+
+    Raises:
+        ValueError: The response body is not a valid result.
+    """
+
+    def __init__(self,
+                 response: Any,
+                 row_model: Any = None,
+                 *,
+                 rows_key: str = 'rows',
+                 continuous: bool = False,
+                 chunk_size: int = 16384) -> None:
+        if isinstance(response, DetailedResponse):
+            response = response.get_result()
+        self._response = response
+        self._row_model = row_model
+        self._chunk_size = chunk_size
+        self._parser = IncrementalResultParser(rows_key, continuous)
+        self._rows = self._iter_rows()
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self._rows.__anext__()
+
+    async def __aenter__(self) -> 'AsyncResultStream':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop reading and release the underlying connection."""
+        await self._rows.aclose()
+        if hasattr(self._response, 'release'):
+            self._response.release()
+
+    def _chunks(self) -> AsyncIterable[bytes]:
+        if hasattr(self._response, 'content'):
+            return self._response.content.iter_chunked(self._chunk_size)
+        return self._response
+
+    async def _iter_rows(self) -> AsyncIterator[Any]:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parser = self._parser
+        from_dict = self._row_model.from_dict if self._row_model is not None else None
+        async for chunk in self._chunks():
+            for row in parser.feed(decoder.decode(chunk)):
+                yield from_dict(row) if from_dict else row
+        for row in parser.feed(decoder.decode(b'', final=True)):
+            yield from_dict(row) if from_dict else row
+        parser.close()
@@ -0,0 +1,213 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for retrying requests that failed with transient errors
+"""
+import email.utils
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+from ibm_cloud_sdk_core import ApiException
+from .common import get_operation_id
+
+# Operations without side effects besides GET and HEAD requests
+SAFE_OPERATIONS = frozenset([
+    'post_all_docs', 'post_all_docs_as_stream', 'post_all_docs_queries', 'post_all_docs_queries_as_stream',
+    'post_bulk_get', 'post_bulk_get_as_mixed', 'post_bulk_get_as_related', 'post_bulk_get_as_stream',
+    'post_design_docs', 'post_design_docs_queries', 'post_explain', 'post_find', 'post_find_as_stream',
+    'post_local_docs', 'post_local_docs_queries', 'post_missing_revs', 'post_partition_all_docs',
+    'post_partition_all_docs_as_stream', 'post_partition_find', 'post_partition_find_as_stream',
+    'post_partition_search', 'post_partition_search_as_stream', 'post_partition_view',
+    'post_partition_view_as_stream', 'post_revs_diff', 'post_search', 'post_search_as_stream', 'post_view',
+    'post_view_as_stream', 'post_view_queries', 'post_view_queries_as_stream',
+])
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is sent again.
+
+    Set on a service client with set_retry_policy. Requests rejected with
+    429 Too Many Requests were not processed by the server and are retried
+    for every operation. Requests failing with ``retry_status_codes`` or a
+    connection error or timeout are only retried for safe operations: GET
+    and HEAD requests and the POST queries listed in SAFE_OPERATIONS.
+
+    The delay before a retry is the Retry-After of the response when the
+    server sends one, and otherwise drawn uniformly between 0 and
+    ``base_delay * 2 ** retry`` capped at ``max_delay`` (full jitter), which
+    keeps clients that failed together from retrying together.
+
+    Keyword Args:
+        max_retries: The maximum number of retries of a request. Defaults to 4.
+        base_delay: The delay cap of the first retry in seconds.
+            Defaults to 0.5.
+        max_delay: The maximum delay in seconds. Defaults to 30.
+        budget: The maximum number of seconds from the first attempt after
+            which no retry is started. Defaults to 60.
+        attempt_timeout: (optional) The read timeout in seconds of each
+            attempt, also bounded by the remaining budget. Note that a timeout
+            set with set_http_config takes precedence.
+        retry_status_codes: The status codes, besides 429, retried for safe
+            operations. Defaults to 502, 503 and 504.
+
+    Attributes:
+        retries (dict): The number of retries per operation_id.
+    """
+
+    def __init__(self,
+                 *,
+                 max_retries: int = 4,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 budget: float = 60.0,
+                 attempt_timeout: float = None,
+                 retry_status_codes: frozenset = frozenset([502, 503, 504])) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.attempt_timeout = attempt_timeout
+        self.retry_status_codes = retry_status_codes
+        self.retries = {}  # type: Dict[str, int]
+        self._lock = threading.Lock()
+
+    def is_retryable(self, method: str, operation_id: str, err: Exception) -> bool:
+        """Return True if a request that failed with the error may be retried."""
+        if isinstance(err, ApiException):
+            if err.code == 429:
+                return True
+            if err.code not in self.retry_status_codes:
+                return False
+        elif not _is_transient(err):
+            return False
+        return method in ('GET', 'HEAD') or operation_id in SAFE_OPERATIONS
+
+    def delay(self, retry: int, err: Exception) -> float:
+        """Return the number of seconds to wait before a retry.
+
+        Args:
+            retry: The number of the retry, starting at 1.
+            err: The error of the failed attempt.
+        """
+        retry_after = _retry_after(err)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def record(self, operation_id: str) -> None:
+        """Count a retry of an operation."""
+        with self._lock:
+            self.retries[operation_id] = self.retries.get(operation_id, 0) + 1
+
+    def start(self, request: dict) -> Optional['RetryState']:
+        """Start the attempts of a request.
+
+        Args:
+            request: The request returned by prepare_request.
+
+        Returns:
+            The RetryState of the request, or None if its body cannot be sent
+            again, e.g. a stream that is read while it is sent.
+        """
+        data = request.get('data')
+        if not (isinstance(data, (bytes, str, type(None))) or getattr(data, 'replayable', False)):
+            return None
+        return RetryState(self, request['method'], get_operation_id(request['headers']))
+
+
+class RetryState:
+    """The attempts of a request sent with a RetryPolicy.
+
+    The clients send the request in a loop, applying the attempt_timeout
+    before each attempt and sleeping for the retry_delay of each failure::
+
+        while True:
+            timeout = state.attempt_timeout()
+            if timeout is not None:
+                kwargs['timeout'] = timeout
+            try:
+                return send(request, **kwargs)
+            except Exception as err:
+                delay = state.retry_delay(err)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    Args:
+        policy: The RetryPolicy of the request.
+        method: The HTTP method of the request.
+        operation_id: The operation of the request.
+    """
+
+    def __init__(self, policy: RetryPolicy, method: str, operation_id: str) -> None:
+        self.policy = policy
+        self.method = method
+        self.operation_id = operation_id
+        self.retry = 0
+        self.deadline = time.monotonic() + policy.budget
+
+    def attempt_timeout(self) -> Optional[float]:
+        """Return the read timeout of the next attempt, None for the timeout
+        of the client."""
+        if self.policy.attempt_timeout is None:
+            return None
+        return max(0.001, min(self.policy.attempt_timeout, self.deadline - time.monotonic()))
+
+    def retry_delay(self, err: Exception) -> Optional[float]:
+        """Return the number of seconds to wait before retrying after the
+        error of an attempt, or None if the error is to be raised."""
+        policy = self.policy
+        self.retry += 1
+        if self.retry > policy.max_retries or not policy.is_retryable(self.method, self.operation_id, err):
+            return None
+        delay = policy.delay(self.retry, err)
+        if time.monotonic() + delay >= self.deadline:
+            return None
+        logging.warning('Retrying %s in %.2fs after: %s', self.operation_id, delay, err)
+        policy.record(self.operation_id)
+        return delay
+
+
+def _is_transient(err: Exception) -> bool:
+    """Return True for connection errors and timeouts of requests and, for
+    AsyncCloudantV1, of aiohttp."""
+    if isinstance(err, (RequestsConnectionError, Timeout)):
+        return True
+    # aiohttp is only imported with AsyncCloudantV1
+    aiohttp = sys.modules.get('aiohttp')
+    return aiohttp is not None and isinstance(err, (aiohttp.ClientConnectionError,
+                                                    sys.modules['asyncio'].TimeoutError))
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    response = getattr(err, 'http_response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,51 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module to patch sdk core base service for retrying failed requests
+"""
+import time
+
+from ibm_cloud_sdk_core import DetailedResponse
+from .rate_limiter_base_service_patch import new_send as old_send
+from .retry_policy import RetryPolicy
+
+
+def set_retry_policy(self, policy: RetryPolicy) -> None:
+    """Set the policy for retrying failed requests, or None to stop
+    retrying.
+
+    Args:
+        policy: The RetryPolicy to use.
+    """
+    self.retry_policy = policy
+
+
+def new_send(self, request, **kwargs) -> DetailedResponse:  # pylint: disable=missing-docstring
+    policy = getattr(self, 'retry_policy', None)
+    state = policy.start(request) if policy is not None else None
+    if state is None:
+        return old_send(self, request, **kwargs)
+    while True:
+        timeout = state.attempt_timeout()
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        try:
+            return old_send(self, request, **kwargs)
+        except Exception as err:  # pylint: disable=broad-except
+            delay = state.retry_delay(err)
+            if delay is None:
+                raise
+            time.sleep(delay)
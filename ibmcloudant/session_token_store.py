@@ -0,0 +1,132 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for sharing session cookies between clients and processes
+"""
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import ContextManager, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SessionTokenStore(ABC):
+    """Abstract base class of the stores sharing the session cookies of
+    CouchDbSessionAuthenticators.
+
+    A token manager with a store takes the store's lock before it renews a
+    session, then reuses the session in the store if another manager
+    renewed it meanwhile, or requests a new session and saves it. Of the
+    clients sharing a store only one therefore logs in, at start-up and at
+    each renewal, and the others reuse its session.
+
+    The sessions are stored as dicts of JSON values, by a key identifying
+    the user and server.
+    """
+
+    @abstractmethod
+    def lock(self, key: str) -> ContextManager[None]:
+        """Return a context manager holding the lock of the session of key,
+        excluding the other clients sharing the store."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[Dict]:
+        """Return the session saved for key, or None."""
+
+    @abstractmethod
+    def save(self, key: str, token: Dict) -> None:
+        """Save the session for key."""
+
+
+class MemorySessionTokenStore(SessionTokenStore):
+    """A store sharing sessions between the clients of a process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens = {}
+
+    @contextmanager
+    def lock(self, key: str):
+        with self._lock:
+            yield
+
+    def load(self, key: str) -> Optional[Dict]:
+        return self._tokens.get(key)
+
+    def save(self, key: str, token: Dict) -> None:
+        self._tokens[key] = token
+
+
+class FileSessionTokenStore(SessionTokenStore):
+    """A store sharing sessions between the processes of a host, e.g. the
+    workers of a web server, in a JSON file.
+
+    The store is locked with flock on the file path + '.lock'. The file is
+    replaced atomically on each save, and both files are only readable by
+    their owner as the session cookies are credentials.
+
+    Args:
+        path: The path of the file.
+
+    Raises:
+        ImportError: The fcntl module is not available, e.g. on Windows.
+    """
+
+    def __init__(self, path: str) -> None:
+        if fcntl is None:
+            raise ImportError('FileSessionTokenStore requires the fcntl module')
+        self.path = os.fspath(path)
+
+    @contextmanager
+    def lock(self, key: str):
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # closing the file releases the lock
+            os.close(fd)
+
+    def load(self, key: str) -> Optional[Dict]:
+        return self._read().get(key)
+
+    def save(self, key: str, token: Dict) -> None:
+        tokens = self._read()
+        tokens[key] = token
+        (fd, temp_path) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(tokens, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                tokens = json.load(file)
+        except (OSError, ValueError):
+            # a missing or damaged file holds no session
+            return {}
+        return tokens if isinstance(tokens, dict) else {}
@@ -0,0 +1,169 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module for request bodies streamed in chunks
+"""
+import zlib
+from typing import Any, Iterable, Iterator
+
+from ibm_cloud_sdk_core.utils import convert_model
+from .json_codec import JsonCodec
+
+# Bytes collected before a chunk is written to the socket
+CHUNK_SIZE = 65536
+
+
+class StreamedBody:
+    """A request body produced chunk by chunk while it is sent, with chunked
+    transfer encoding, so that it is never held in memory as a whole.
+
+    A body read from a generator can be sent only once, so requests with
+    such a body are not retried, while bodies of bytes or seekable files
+    are replayable.
+
+    Args:
+        chunks: The bytes of the body.
+
+    Attributes:
+        size (int): The number of bytes produced by the last iteration.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = chunks
+        self.size = 0
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'StreamedBody':
+        """Return a replayable body of the chunks of data."""
+        return cls(_BytesChunks(data))
+
+    @classmethod
+    def from_file(cls, file: Any) -> 'StreamedBody':
+        """Return a body of the content of a file-like object from its
+        current position, replayable if the file is seekable."""
+        return cls(_FileChunks(file))
+
+    @property
+    def replayable(self) -> bool:
+        """True if the body can be iterated, and so sent, again."""
+        return _replayable(self._chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.size = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.size += len(chunk)
+                yield chunk
+
+    def gzip(self, level: int = 6) -> 'StreamedBody':
+        """Return the body compressed with gzip while it is produced."""
+        return StreamedBody(_GzipChunks(self._chunks, level))
+
+
+def _replayable(chunks: Iterable[bytes]) -> bool:
+    # an iterator, e.g. a generator, is exhausted by the first iteration
+    return getattr(chunks, 'replayable', not isinstance(chunks, Iterator))
+
+
+class _BytesChunks:
+
+    replayable = True
+
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+
+    def __iter__(self) -> Iterator[bytes]:
+        data = self._data
+        for start in range(0, len(data), CHUNK_SIZE):
+            yield data[start:start + CHUNK_SIZE]
+
+
+class _FileChunks:
+
+    def __init__(self, file: Any) -> None:
+        self._file = file
+        try:
+            self._start = file.tell() if file.seekable() else None
+        except (AttributeError, OSError):
+            self._start = None
+
+    @property
+    def replayable(self) -> bool:
+        return self._start is not None
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._start is not None:
+            self._file.seek(self._start)
+        while True:
+            chunk = self._file.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+class _GzipChunks:
+
+    def __init__(self, chunks: Iterable[bytes], level: int) -> None:
+        self._chunks = chunks
+        self._level = level
+
+    @property
+    def replayable(self) -> bool:
+        return _replayable(self._chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in self._chunks:
+            yield compressor.compress(chunk)
+        yield compressor.flush()
+
+
+def bulk_docs_body(docs: Iterable[Any], codec: JsonCodec, *, new_edits: bool = None) -> StreamedBody:
+    """Return a streamed post_bulk_docs request body.
+
+    The documents are converted and encoded one at a time as the body is
+    sent, so the memory used is bounded by a document and a chunk.
+
+    Args:
+        docs: The documents, Document models or dicts.
+        codec: The JsonCodec encoding the documents.
+
+    Keyword Args:
+        new_edits: (optional) The new_edits member of the body.
+    """
+    return StreamedBody(_bulk_docs_chunks(docs, codec, new_edits))
+
+
+def _bulk_docs_chunks(docs: Iterable[Any], codec: JsonCodec, new_edits: bool) -> Iterator[bytes]:
+    buffer = [b'{"docs":[']
+    buffered = 0
+    separator = b''
+    for doc in docs:
+        encoded = codec.dumps_bytes(convert_model(doc))
+        buffer.append(separator)
+        buffer.append(encoded)
+        separator = b','
+        buffered += len(encoded) + 1
+        if buffered >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    buffer.append(b']')
+    if new_edits is not None:
+        buffer.append(b',"new_edits":')
+        buffer.append(b'true' if new_edits else b'false')
+    buffer.append(b'}')
+    yield b''.join(buffer)
@@ -67,6 +67,7 @@ setup(name=PACKAGE_NAME.replace('_', '-'),
       license='Apache 2.0',
       install_requires=install_requires,
       tests_require=tests_require,
+      extras_require={'async': ['aiohttp>=3.7,<4'], 'orjson': ['orjson>=3,<4']},
       cmdclass={'test': PyTest, 'test_unit': PyTestUnit, 'test_integration': PyTestIntegration},
       author='IBM',
       author_email='support@cloudant.com',
@@ -0,0 +1,95 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the peak client memory of large post_bulk_docs requests
+
+The same documents are sent to the fake_couchdb server, started in a
+separate process, once as a BulkDocs model holding a list of the documents
+and once as a generator streamed with chunked transfer encoding. The peak
+memory allocated by the client while building and sending the request is
+reported, as traced by tracemalloc. Both include the decoded response, a
+result per document, which bounds the peak of the streamed request.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_bulk_docs_stream.py --megabytes 10,50
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant.cloudant_v1 import BulkDocs, CloudantV1, Document
+
+FAKE_COUCHDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'unit', 'fake_couchdb.py')
+
+DOC_BYTES = 1000
+
+
+def generate_docs(megabytes, prefix):
+    for i in range(megabytes * 1000000 // DOC_BYTES):
+        yield Document(id='{0}{1:08d}'.format(prefix, i), type='benchmark', data=str(i) * (DOC_BYTES // 10))
+
+
+def measure(service, db, make_body):
+    """Return the peak MB allocated and the seconds taken to send a body."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    service.post_bulk_docs(db=db, bulk_docs=make_body())
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (peak / 1e6, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', default='10,50', help='comma separated batch sizes in MB')
+    parser.add_argument('--no-gzip', action='store_true', help='send the bodies uncompressed')
+    args = parser.parse_args(argv)
+    process = subprocess.Popen([sys.executable, FAKE_COUCHDB], stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(process.stdout.readline().strip())
+        service.set_enable_gzip_compression(not args.no_gzip)
+        print('{0:<8} {1:>14} {2:>12} {3:>14} {4:>12}'.format(
+            'batch', 'list peak MB', 'list s', 'stream peak MB', 'stream s'))
+        for megabytes in [int(size) for size in args.megabytes.split(',')]:
+            db = 'benchmark-{0}'.format(megabytes)
+            service.put_database(db=db)
+            try:
+                (list_peak, list_time) = measure(
+                    service, db, lambda: BulkDocs(docs=list(generate_docs(megabytes, 'list'))))
+                (stream_peak, stream_time) = measure(
+                    service, db, lambda: generate_docs(megabytes, 'stream'))
+            finally:
+                service.delete_database(db=db)
+            print('{0:<8} {1:>14.1f} {2:>12.2f} {3:>14.1f} {4:>12.2f}'.format(
+                '{0} MB'.format(megabytes), list_peak, list_time, stream_peak, stream_time))
+    finally:
+        process.terminate()
+        process.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
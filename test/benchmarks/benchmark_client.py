@@ -0,0 +1,279 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Throughput and latency benchmarks of the client hot path
+
+Each scenario calls one operation repeatedly from a number of threads for a
+fixed time, for every combination of document size and concurrency, and
+reports the operations per second and latency percentiles. By default the
+requests go to the fake_couchdb server from the unit tests, started in a
+separate process so that it does not compete with the client for the GIL,
+which makes runs repeatable offline.
+
+Typical usage, saving a baseline and comparing a later run against it::
+
+    python test/benchmarks/benchmark_client.py --json baseline.json
+    python test/benchmarks/benchmark_client.py --baseline baseline.json
+
+The comparison exits with status 1 when the throughput of any case dropped
+by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ConnectionPool, ResultStream
+from ibmcloudant.cloudant_v1 import BulkDocs, BulkGetQueryDocument, CloudantV1, Document
+
+FAKE_COUCHDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'unit', 'fake_couchdb.py')
+
+# documents loaded into each database read by the scenarios
+DOC_COUNT = 1000
+BATCH_SIZE = 100
+
+
+def make_doc(doc_id, payload, rng):
+    """Return a document with a rotation of the payload as data member, so
+    documents differ without generating random data per document."""
+    offset = rng.randrange(len(payload)) if payload else 0
+    return Document(id=doc_id, type='benchmark', data=payload[offset:] + payload[:offset])
+
+
+class Scenario:
+    """An operation to benchmark.
+
+    Subclasses implement call, run with a random number generator of the
+    calling thread, and returning the number of documents processed.
+    """
+
+    name = None
+    preload = True
+
+    def __init__(self, service, db, size):
+        self.service = service
+        self.db = db
+        self.size = size
+        self.ids = ['doc{0:06d}'.format(i) for i in range(DOC_COUNT)]
+        rng = random.Random(size)
+        self.payload = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(size))
+
+    def setup(self):
+        self.service.put_database(db=self.db)
+        if self.preload:
+            rng = random.Random(self.size)
+            for start in range(0, DOC_COUNT, BATCH_SIZE):
+                docs = [make_doc(doc_id, self.payload, rng) for doc_id in self.ids[start:start + BATCH_SIZE]]
+                self.service.post_bulk_docs(db=self.db, bulk_docs=BulkDocs(docs=docs))
+
+    def teardown(self):
+        self.service.delete_database(db=self.db)
+
+    def call(self, rng):
+        raise NotImplementedError
+
+
+class GetDocument(Scenario):
+    name = 'get_document'
+
+    def call(self, rng):
+        self.service.get_document(db=self.db, doc_id=rng.choice(self.ids)).get_result()
+        return 1
+
+
+class PostBulkDocs(Scenario):
+    name = 'post_bulk_docs'
+    preload = False
+
+    def __init__(self, service, db, size):
+        super().__init__(service, db, size)
+        self._counter = iter(range(sys.maxsize))
+        self._lock = threading.Lock()
+
+    def call(self, rng):
+        with self._lock:
+            batch = next(self._counter)
+        docs = [make_doc('new{0:08d}-{1:03d}'.format(batch, i), self.payload, rng) for i in range(BATCH_SIZE)]
+        self.service.post_bulk_docs(db=self.db, bulk_docs=BulkDocs(docs=docs)).get_result()
+        return BATCH_SIZE
+
+
+class PostBulkGet(Scenario):
+    name = 'post_bulk_get'
+
+    def call(self, rng):
+        docs = [BulkGetQueryDocument(id=doc_id) for doc_id in rng.sample(self.ids, BATCH_SIZE)]
+        self.service.post_bulk_get(db=self.db, docs=docs).get_result()
+        return BATCH_SIZE
+
+
+class PostAllDocs(Scenario):
+    name = 'post_all_docs'
+
+    def call(self, rng):
+        rows = self.service.post_all_docs(db=self.db, startkey=rng.choice(self.ids[:-BATCH_SIZE]),
+                                          limit=BATCH_SIZE, include_docs=True).get_result()['rows']
+        return len(rows)
+
+
+class PostChangesAsStream(Scenario):
+    name = 'post_changes_as_stream'
+
+    def call(self, rng):
+        response = self.service.post_changes_as_stream(db=self.db, include_docs=True)
+        with ResultStream(response.get_result(), rows_key='results') as stream:
+            return sum(1 for _ in stream)
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (GetDocument, PostBulkDocs, PostBulkGet, PostAllDocs,
+                                                      PostChangesAsStream)}
+
+
+def run_case(scenario, concurrency, duration):
+    """Run a scenario from concurrency threads for duration seconds.
+
+    Returns:
+        A dict of the throughput and latency percentiles of the case.
+    """
+    latencies = []
+    docs = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        (worker_latencies, worker_docs) = ([], 0)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            worker_docs += scenario.call(rng)
+            worker_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(worker_latencies)
+            docs[0] += worker_docs
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, seed) for seed in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(quantile):
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] * 1000 if latencies else None
+
+    return {
+        'operation': scenario.name,
+        'size': scenario.size,
+        'concurrency': concurrency,
+        'ops': len(latencies),
+        'ops_per_second': len(latencies) / elapsed,
+        'docs_per_second': docs[0] / elapsed,
+        'p50_ms': percentile(0.5),
+        'p90_ms': percentile(0.9),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def start_fake_couchdb(latency):
+    process = subprocess.Popen([sys.executable, FAKE_COUCHDB, '--latency', str(latency)],
+                               stdout=subprocess.PIPE, universal_newlines=True)
+    return (process, process.stdout.readline().strip())
+
+
+def case_key(result):
+    return '{operation} size={size} concurrency={concurrency}'.format(**result)
+
+
+def compare(results, baseline_path, tolerance):
+    """Print the throughput change of each case against a baseline and
+    return the number of regressions."""
+    with open(baseline_path) as baseline_file:
+        baseline = {case_key(result): result for result in json.load(baseline_file)}
+    regressions = 0
+    for result in results:
+        before = baseline.get(case_key(result))
+        if before is None:
+            continue
+        change = result['ops_per_second'] / before['ops_per_second'] - 1
+        regressed = change < -tolerance
+        regressions += regressed
+        print('{0:<55} {1:>+8.1%}{2}'.format(case_key(result), change, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--operations', default=','.join(SCENARIOS),
+                        help='comma separated scenarios, default all of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma separated document sizes in bytes')
+    parser.add_argument('--concurrency', default='1,4,16', help='comma separated numbers of threads')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds each case runs for')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the fake server delays each request by')
+    parser.add_argument('--url', help='the URL of a server to use instead of the fake, without authentication')
+    parser.add_argument('--json', help='the file to write the results to')
+    parser.add_argument('--baseline', help='a results file to compare the throughput with')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='the relative throughput drop reported as a regression, default 0.1')
+    args = parser.parse_args(argv)
+    concurrencies = [int(level) for level in args.concurrency.split(',')]
+
+    process = None
+    url = args.url
+    if url is None:
+        (process, url) = start_fake_couchdb(args.latency)
+    try:
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(url)
+        service.set_connection_pool(ConnectionPool(max_hosts=1, max_connections_per_host=max(concurrencies)))
+        results = []
+        print('{0:<55} {1:>10} {2:>10} {3:>9} {4:>9} {5:>9}'.format(
+            'case', 'ops/s', 'docs/s', 'p50 ms', 'p90 ms', 'p99 ms'))
+        for name in args.operations.split(','):
+            for size in [int(size) for size in args.sizes.split(',')]:
+                scenario = SCENARIOS[name](service, 'benchmark-{0}-{1}'.format(name.replace('_', '-'), size), size)
+                scenario.setup()
+                try:
+                    for concurrency in concurrencies:
+                        result = run_case(scenario, concurrency, args.duration)
+                        results.append(result)
+                        print('{0:<55} {ops_per_second:>10.1f} {docs_per_second:>10.1f} {p50_ms:>9.2f} '
+                              '{p90_ms:>9.2f} {p99_ms:>9.2f}'.format(case_key(result), **result), flush=True)
+                finally:
+                    scenario.teardown()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
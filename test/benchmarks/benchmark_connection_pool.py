@@ -0,0 +1,102 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the connection pool size against the number of threads
+
+A number of threads share one client and call get_document for a fixed time
+against the fake_couchdb server, started in a separate process, with the
+default pool of requests, a ConnectionPool of the default size and a
+ConnectionPool sized to the threads. The throughput is reported with the
+statistics of the pool: connections opened, discarded for lack of room in
+the pool and the time spent waiting for a connection.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_connection_pool.py --threads 64
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ConnectionPool
+from ibmcloudant.cloudant_v1 import CloudantV1, Document
+
+from benchmark_client import start_fake_couchdb
+
+
+def measure(url, pool, threads, duration):
+    """Return the requests per second of the threads and the statistics
+    of the pool."""
+    service = CloudantV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url(url)
+    if pool is not None:
+        service.set_connection_pool(pool)
+    counts = [0] * threads
+    deadline = time.monotonic() + duration
+
+    def work(index):
+        while time.monotonic() < deadline:
+            service.get_document(db='pool', doc_id='doc')
+            counts[index] += 1
+
+    workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stats = pool.snapshot()[url] if pool is not None else {}
+    service.get_http_client().close()
+    return (sum(counts) / duration, stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=64, help='the number of threads sharing the client')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds each case runs for')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the fake server delays requests by')
+    args = parser.parse_args(argv)
+    (process, url) = start_fake_couchdb(args.latency)
+    try:
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(url)
+        service.put_database(db='pool')
+        service.put_document(db='pool', doc_id='doc', document=Document(value=1))
+        cases = [
+            ('requests default', None),
+            ('pool of 10', ConnectionPool(max_connections_per_host=10)),
+            ('pool of 10 blocking', ConnectionPool(max_connections_per_host=10, block=True)),
+            ('pool of {0}'.format(args.threads), ConnectionPool(max_connections_per_host=args.threads,
+                                                                  prewarm=args.threads)),
+        ]
+        print('{0:<22} {1:>10} {2:>8} {3:>10} {4:>10}'.format('case', 'req/s', 'opened', 'discarded', 'wait s'))
+        for (name, pool) in cases:
+            (throughput, stats) = measure(url, pool, args.threads, args.duration)
+            print('{0:<22} {1:>10.0f} {2:>8} {3:>10} {4:>10}'.format(
+                name, throughput, stats.get('opened', '-'), stats.get('discarded', '-'),
+                '{0:.1f}'.format(stats['wait_seconds']) if stats else '-'))
+    finally:
+        process.terminate()
+        process.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
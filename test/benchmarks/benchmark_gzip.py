@@ -0,0 +1,86 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the gzip compression of request bodies
+
+For JSON bodies of several sizes the request is prepared and its body read
+as it would be sent, at the compression level of sdk core (9) and at lower
+levels, reporting the time, the compressed size and the peak memory
+allocated on top of the uncompressed body.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_gzip.py --sizes 1000,100000,10000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+
+def make_body(size):
+    rng = random.Random(size)
+    docs = []
+    length = 2
+    while length < size:
+        doc = {'_id': 'doc{0:08d}'.format(len(docs)), 'type': 'order', 'total': round(rng.random() * 100, 2),
+               'status': rng.choice(['new', 'paid', 'shipped'])}
+        docs.append(doc)
+        length += len(json.dumps(doc)) + 2
+    return json.dumps({'docs': docs}).encode('utf-8')
+
+
+def measure(service, data):
+    """Return the milliseconds, the size sent and the peak bytes allocated
+    to prepare the request and read its body."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    body = service.prepare_request('POST', '/db/_bulk_docs', data=data)['data']
+    size = len(body) if isinstance(body, bytes) else sum(len(chunk) for chunk in body)
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (elapsed * 1000, size, peak)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,10000000', help='comma separated body sizes in bytes')
+    parser.add_argument('--levels', default='9,6,1', help='comma separated compression levels')
+    args = parser.parse_args(argv)
+    service = CloudantV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url('http://cloudant.example')
+    print('{0:>10} {1:>6} {2:>10} {3:>10} {4:>8} {5:>12}'.format('size', 'level', 'ms', 'sent', 'ratio', 'peak bytes'))
+    for size in [int(size) for size in args.sizes.split(',')]:
+        data = make_body(size)
+        for level in [int(level) for level in args.levels.split(',')]:
+            service.set_gzip_compression_level(level)
+            (elapsed, sent, peak) = measure(service, data)
+            print('{0:>10} {1:>6} {2:>10.2f} {3:>10} {4:>8.2f} {5:>12}'.format(
+                len(data), level, elapsed, sent, sent / len(data), peak))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the import time of the ibmcloudant package
+
+Each statement is timed in fresh interpreters, reporting the median over the
+runs and, with --detail, the slowest modules reported by -X importtime.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_import.py --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    'python': 'pass',
+    'ibm_cloud_sdk_core': 'import ibm_cloud_sdk_core',
+    'ibmcloudant': 'import ibmcloudant',
+    'CloudantV1()': 'from ibmcloudant import CloudantV1\n'
+                    'from ibm_cloud_sdk_core.authenticators import NoAuthAuthenticator\n'
+                    'CloudantV1(authenticator=NoAuthAuthenticator())',
+    'AsyncCloudantV1': 'from ibmcloudant import AsyncCloudantV1',
+}
+
+TIMER = '''
+import time
+start = time.perf_counter()
+exec({0!r})
+print(time.perf_counter() - start)
+'''
+
+
+def time_statement(statement, runs):
+    """Return the median seconds to run a statement in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', TIMER.format(statement)])
+        timings.append(float(output.decode('utf-8').splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def slowest_modules(statement, count):
+    """Return the cumulative microseconds and names of the slowest modules."""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            stderr=subprocess.PIPE, check=True).stderr.decode('utf-8')
+    modules = []
+    for line in output.splitlines()[1:]:
+        (_, cumulative, name) = line.split('|')
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='interpreters started per statement')
+    parser.add_argument('--detail', type=int, default=0, help='number of slowest modules to list')
+    args = parser.parse_args(argv)
+    for (name, statement) in STATEMENTS.items():
+        print('{0:<20} {1:>8.1f} ms'.format(name, time_statement(statement, args.runs) * 1000), flush=True)
+    for (cumulative, name) in slowest_modules(STATEMENTS['ibmcloudant'], args.detail):
+        print('  {0:<50} {1:>8.1f} ms'.format(name, cumulative / 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
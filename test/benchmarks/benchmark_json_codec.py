@@ -0,0 +1,96 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the JSON codecs on bulk document payloads
+
+For each batch size post_bulk_docs is called with send replaced by a function
+returning the prepared request, so the time covers the conversion of the
+models and the encoding of the body, without compression. The decoding is
+measured on a post_bulk_get like response of the same documents.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_json_codec.py --megabytes 1,10
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import JsonCodec, OrjsonCodec
+from ibmcloudant.cloudant_v1 import BulkDocs, CloudantV1, Document
+from ibmcloudant.json_codec import orjson
+
+DOC_BYTES = 1000
+
+
+def make_docs(megabytes):
+    rng = random.Random(megabytes)
+    docs = []
+    for i in range(megabytes * 1000000 // DOC_BYTES):
+        docs.append(Document(id='doc{0:08d}'.format(i), type='order', total=rng.random() * 100,
+                             items=[{'sku': 'sku{0}'.format(rng.randrange(1000)), 'quantity': rng.randrange(10)}
+                                    for _ in range(8)],
+                             note=''.join(rng.choice('abcdefghij ') for _ in range(600))))
+    return docs
+
+
+def best_of(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def measure(codec, docs, response):
+    """Return the milliseconds to encode the bulk request and decode the
+    response."""
+    service = CloudantV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url('http://cloudant.example')
+    service.set_enable_gzip_compression(False)
+    service.set_json_codec(codec)
+    service.send = lambda request, **kwargs: request
+    encode = best_of(lambda: service.post_bulk_docs(db='db', bulk_docs=BulkDocs(docs=docs)))
+    decode = best_of(lambda: codec.loads(response))
+    return (encode, decode)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', default='1,10', help='comma separated batch sizes in MB')
+    args = parser.parse_args(argv)
+    codecs = [JsonCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+    print('{0:<10} {1:<8} {2:>12} {3:>12}'.format('batch', 'codec', 'encode ms', 'decode ms'))
+    for megabytes in [int(size) for size in args.megabytes.split(',')]:
+        docs = make_docs(megabytes)
+        response = json.dumps({'results': [{'id': doc.id, 'docs': [{'ok': doc.to_dict()}]} for doc in docs]})
+        response = response.encode('utf-8')
+        for codec in codecs:
+            (encode, decode) = measure(codec, docs, response)
+            print('{0:<10} {1:<8} {2:>12.1f} {3:>12.1f}'.format(
+                '{0} MB'.format(megabytes), codec.name, encode, decode))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
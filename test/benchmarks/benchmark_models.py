@@ -0,0 +1,100 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the memory and decoding time of result rows
+
+For each row type the same decoded JSON rows are converted with from_dict of
+the generated model and of its compact variant, reporting the rows decoded
+per second and the memory allocated per row, excluding the JSON input. Then
+the time to decode a whole result and read only its first rows is compared
+between the generated result models and their lazy variants.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_models.py --rows 1000000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from ibmcloudant.cloudant_v1 import AllDocsResult, ChangesResultItem, DocsResultRow, ViewResult, ViewResultRow
+from ibmcloudant.compact_models import CompactChangesResultItem, CompactDocsResultRow, CompactViewResultRow
+from ibmcloudant.lazy_models import LazyAllDocsResult, LazyViewResult
+
+ROW_TYPES = {
+    'view': (ViewResultRow, CompactViewResultRow,
+             lambda i: {'id': 'doc{0:07d}'.format(i), 'key': ['customer', i], 'value': i}),
+    'all_docs': (DocsResultRow, CompactDocsResultRow,
+                 lambda i: {'id': 'doc{0:07d}'.format(i), 'key': 'doc{0:07d}'.format(i), 'value': {'rev': '1-abc'}}),
+    'changes': (ChangesResultItem, CompactChangesResultItem,
+                lambda i: {'changes': [{'rev': '1-abc'}], 'id': 'doc{0:07d}'.format(i), 'seq': str(i)}),
+}
+
+
+def measure(model, rows):
+    """Return the rows per second and bytes per row of decoding rows."""
+    gc.collect()
+    start = time.perf_counter()
+    decoded = [model.from_dict(row) for row in rows]
+    elapsed = time.perf_counter() - start
+    del decoded
+    gc.collect()
+    tracemalloc.start()
+    decoded = [model.from_dict(row) for row in rows]
+    (size, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (len(rows) / elapsed, size / len(rows))
+
+
+def measure_partial(model, result, head):
+    """Return the milliseconds to decode a result and read the IDs of its
+    first head rows."""
+    start = time.perf_counter()
+    decoded = model.from_dict(result)
+    [row.id for row in decoded.rows[:head]]  # pylint: disable=expression-not-assigned
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000, help='rows per measurement')
+    args = parser.parse_args(argv)
+    print('{0:<10} {1:>14} {2:>14} {3:>8} {4:>10} {5:>10} {6:>8}'.format(
+        'rows', 'generated r/s', 'compact r/s', 'speedup', 'gen B/row', 'cmp B/row', 'saving'))
+    for (name, (model, compact, make_row)) in ROW_TYPES.items():
+        rows = [make_row(i) for i in range(args.rows)]
+        (before_rate, before_size) = measure(model, rows)
+        (after_rate, after_size) = measure(compact, rows)
+        print('{0:<10} {1:>14.0f} {2:>14.0f} {3:>7.2f}x {4:>10.0f} {5:>10.0f} {6:>7.0%}'.format(
+            name, before_rate, after_rate, after_rate / before_rate, before_size, after_size,
+            1 - after_size / before_size))
+    print()
+    print('{0:<10} {1:>14} {2:>14} {3:>8}'.format('first 10', 'generated ms', 'lazy ms', 'speedup'))
+    for (name, model, lazy, make_row) in (('view', ViewResult, LazyViewResult, ROW_TYPES['view'][2]),
+                                          ('all_docs', AllDocsResult, LazyAllDocsResult, ROW_TYPES['all_docs'][2])):
+        result = {'total_rows': args.rows, 'rows': [make_row(i) for i in range(args.rows)]}
+        before = measure_partial(model, result, 10)
+        after = measure_partial(lazy, result, 10)
+        print('{0:<10} {1:>14.2f} {2:>14.2f} {3:>7.0f}x'.format(name, before, after, before / after))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark of the client side CPU cost of building a request
+
+Each operation is called with send replaced by a function returning the
+prepared request, so only the work before the network is measured: once with
+the request preparation and path encoding of sdk core and uncached SDK
+headers, and once with the cached headers and patches of this package.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_prepare_request.py --number 100000
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from ibm_cloud_sdk_core import BaseService
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import common
+from ibmcloudant import cloudant_v1
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+deferred_json = cloudant_v1.json
+
+DOCUMENT = cloudant_v1.Document(id='doc', rev='1-abc', value=1)
+
+OPERATIONS = {
+    'get_document': lambda service: service.get_document(db='db', doc_id='doc', conflicts=True),
+    'put_document': lambda service: service.put_document(db='db', doc_id='doc', document=DOCUMENT),
+    'post_all_docs': lambda service: service.post_all_docs(db='db', include_docs=True, limit=100),
+    'head_document': lambda service: service.head_document(db='db', doc_id='doc'),
+}
+
+
+def uncached_sdk_headers(service_name, service_version, operation_id):
+    """The headers as built before they were cached."""
+    return {
+        common.SDK_ANALYTICS_HEADER: common.get_sdk_analytics(service_name, service_version, operation_id),
+        common.USER_AGENT_HEADER: common.get_user_agent(),
+    }
+
+
+def measure(operation, number, baseline):
+    """Return the microseconds per call of an operation."""
+    service = CloudantV1(authenticator=NoAuthAuthenticator())
+    service.set_service_url('http://cloudant.example')
+    service.send = lambda request, **kwargs: request
+    if baseline:
+        service.prepare_request = lambda *args, **kwargs: BaseService.prepare_request(service, *args, **kwargs)
+        service.encode_path_vars = BaseService.encode_path_vars
+        cloudant_v1.get_sdk_headers = uncached_sdk_headers
+        cloudant_v1.json = json
+    try:
+        return min(timeit.repeat(lambda: operation(service), number=number, repeat=3)) / number * 1e6
+    finally:
+        cloudant_v1.get_sdk_headers = common.get_sdk_headers
+        cloudant_v1.json = deferred_json
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help='calls per measurement')
+    args = parser.parse_args(argv)
+    print('{0:<16} {1:>12} {2:>12} {3:>8}'.format('operation', 'sdk core us', 'current us', 'speedup'))
+    for (name, operation) in OPERATIONS.items():
+        before = measure(operation, args.number, baseline=True)
+        after = measure(operation, args.number, baseline=False)
+        print('{0:<16} {1:>12.2f} {2:>12.2f} {3:>7.2f}x'.format(name, before, after, before / after))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
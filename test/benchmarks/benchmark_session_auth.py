@@ -0,0 +1,76 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark of the per-request cost of CouchDbSessionAuthenticator
+
+The authenticator is given a valid session cookie and authenticate is called
+repeatedly, once merging the session cookies into the client jar on every
+call as before, and once merging them only when the session rotates.
+
+Typical usage::
+
+    python test/benchmarks/benchmark_session_auth.py --number 100000
+"""
+
+import argparse
+import sys
+import time
+import timeit
+
+from requests.cookies import RequestsCookieJar, create_cookie
+
+from ibmcloudant import CouchDbSessionAuthenticator
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+
+def make_authenticator():
+    authenticator = CouchDbSessionAuthenticator('adm', 'pass')
+    service = CloudantV1(authenticator=authenticator)
+    service.set_service_url('http://cloudant.example')
+    token_manager = authenticator.token_manager
+    token_manager.access_token = RequestsCookieJar()
+    token_manager.access_token.set_cookie(create_cookie('AuthSession', 'x' * 64, domain='cloudant.example.local'))
+    token_manager.expire_time = time.time() + 3600
+    token_manager.refresh_time = token_manager.expire_time
+    return authenticator
+
+
+def measure(number, baseline):
+    """Return the microseconds per call of authenticate."""
+    authenticator = make_authenticator()
+    if baseline:
+        def authenticate():
+            authenticator.jar.update(authenticator.token_manager.get_token())
+    else:
+        def authenticate():
+            authenticator.authenticate(None)
+    return min(timeit.repeat(authenticate, number=number, repeat=3)) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000, help='calls per measurement')
+    args = parser.parse_args(argv)
+    before = measure(args.number, baseline=True)
+    after = measure(args.number, baseline=False)
+    print('{0:>14} {1:>12} {2:>8}'.format('merge each us', 'current us', 'speedup'))
+    print('{0:>14.3f} {1:>12.3f} {2:>7.1f}x'.format(before, after, before / after))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
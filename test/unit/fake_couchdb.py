@@ -0,0 +1,843 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+An in-process stand-in for a CouchDB server, for tests and benchmarks
+
+The server keeps databases in memory and implements the subset of the API
+the SDK helpers use: documents, _all_docs, _bulk_docs, _bulk_get, _changes
+(normal, longpoll and continuous feeds), views of simple map functions, _find
+with the common selector operators and _session.
+
+Typical usage::
+
+    with FakeCouchDB() as server:
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(server.url)
+"""
+
+import base64
+import collections
+import gzip
+import hashlib
+import json
+import re
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+
+class CouchError(Exception):
+    """An error response."""
+
+    def __init__(self, status, error, reason):
+        super().__init__(reason)
+        self.status = status
+        self.error = error
+        self.reason = reason
+
+
+def not_found(reason='missing'):
+    return CouchError(404, 'not_found', reason)
+
+
+def conflict():
+    return CouchError(409, 'conflict', 'Document update conflict.')
+
+
+def bad_request(reason):
+    return CouchError(400, 'bad_request', reason)
+
+
+_TYPE_ORDER = {type(None): 0, bool: 1, int: 2, float: 2, str: 3, list: 4, dict: 5}
+
+
+def collation_key(value):
+    """Approximate CouchDB view collation: null, false, true, numbers, strings,
+    arrays then objects. Strings compare by code point rather than ICU."""
+    rank = _TYPE_ORDER.get(type(value), 6)
+    if isinstance(value, list):
+        return (rank, [collation_key(item) for item in value])
+    if isinstance(value, dict):
+        return (rank, [(key, collation_key(item)) for (key, item) in value.items()])
+    return (rank, value)
+
+
+# emit(doc.<field>, null | <number> | doc.<field>) is the map function
+# shape understood in design documents, Python functions can be added with
+# FakeCouchDB.add_view
+_EMIT = re.compile(r'emit\(\s*doc\.([\w.]+)\s*,\s*(null|-?\d+(?:\.\d+)?|doc\.[\w.]+|doc)\s*\)')
+
+
+def get_field(doc, path):
+    for name in path.split('.'):
+        if not isinstance(doc, dict) or name not in doc:
+            return None
+        doc = doc[name]
+    return doc
+
+
+def compile_map(source):
+    """Return a Python map function for a JavaScript map function that emits
+    a field of the document."""
+    match = _EMIT.search(source or '')
+    if match is None:
+        raise CouchError(400, 'compilation_error', 'Unsupported map function: {0}'.format(source))
+    (key_path, value_expr) = match.groups()
+
+    def map_fn(doc):
+        key = get_field(doc, key_path)
+        if key is None:
+            return []
+        if value_expr == 'null':
+            value = None
+        elif value_expr == 'doc':
+            value = doc
+        elif value_expr.startswith('doc.'):
+            value = get_field(doc, value_expr[4:])
+        else:
+            value = json.loads(value_expr)
+        return [(key, value)]
+    return map_fn
+
+
+def _reduce(reduce, values):
+    if reduce == '_count':
+        return len(values)
+    if reduce == '_sum':
+        return sum(values)
+    raise CouchError(400, 'invalid_design_doc', 'Unsupported reduce function: {0}'.format(reduce))
+
+
+def matches(doc, selector):
+    """Return True if the document matches a Mango selector."""
+    for (field, condition) in selector.items():
+        if field == '$and':
+            if not all(matches(doc, item) for item in condition):
+                return False
+        elif field == '$or':
+            if not any(matches(doc, item) for item in condition):
+                return False
+        elif field == '$not':
+            if matches(doc, condition):
+                return False
+        elif not _matches_field(doc, field, condition):
+            return False
+    return True
+
+
+def _matches_field(doc, field, condition):
+    value = get_field(doc, field)
+    if not isinstance(condition, dict):
+        return value == condition
+    for (operator, operand) in condition.items():
+        if not operator.startswith('$'):
+            # a nested field
+            if not _matches_field(doc, field + '.' + operator, operand):
+                return False
+        elif operator == '$exists':
+            if (value is not None) != operand:
+                return False
+        elif value is None and operator != '$ne':
+            return False
+        elif operator == '$eq' and value != operand:
+            return False
+        elif operator == '$ne' and value == operand:
+            return False
+        elif operator == '$in' and value not in operand:
+            return False
+        elif operator == '$nin' and value in operand:
+            return False
+        elif operator in ('$gt', '$gte', '$lt', '$lte'):
+            (left, right) = (collation_key(value), collation_key(operand))
+            if not {'$gt': left > right, '$gte': left >= right, '$lt': left < right, '$lte': left <= right}[operator]:
+                return False
+        elif operator not in ('$eq', '$ne', '$in', '$nin'):
+            raise CouchError(400, 'invalid_operator', 'Unsupported operator: {0}'.format(operator))
+    return True
+
+
+class Database:
+    """The documents and changes of a database."""
+
+    def __init__(self, name):
+        self.name = name
+        self.docs = {}
+        self.local_docs = {}
+        # the live document IDs in order, for _all_docs
+        self.ids = []
+        # the last sequence of each document, in sequence order
+        self.changes = collections.OrderedDict()
+        self.seq = 0
+        self.views = {}
+        self.changed = threading.Condition()
+
+    def info(self):
+        return {'db_name': self.name, 'doc_count': len(self.ids), 'doc_del_count': len(self.docs) - len(self.ids),
+                'update_seq': self.format_seq(self.seq), 'sizes': {'active': 0, 'external': 0, 'file': 0},
+                'props': {}, 'instance_start_time': '0', 'compact_running': False, 'disk_format_version': 8}
+
+    @staticmethod
+    def format_seq(seq):
+        return '{0}-g1AAAAFakeCouchDB'.format(seq)
+
+    @staticmethod
+    def parse_seq(seq, current):
+        if seq in (None, '', 0, '0'):
+            return 0
+        if seq == 'now':
+            return current
+        try:
+            return int(str(seq).split('-', 1)[0])
+        except ValueError:
+            raise bad_request('Malformed sequence supplied in \'since\' parameter.')
+
+    def get(self, doc_id, rev=None):
+        with self.changed:
+            doc = self.docs.get(doc_id)
+        if doc is None or (rev is None and doc.get('_deleted')):
+            raise not_found('deleted' if doc is not None else 'missing')
+        if rev is not None and doc['_rev'] != rev:
+            raise not_found()
+        return doc
+
+    def update(self, doc, new_edits=True):
+        """Store a document, returning its ID and new revision."""
+        doc_id = doc.get('_id') or uuid.uuid4().hex
+        with self.changed:
+            current = self.docs.get(doc_id)
+            live = current is not None and not current.get('_deleted')
+            if new_edits:
+                if doc.get('_rev') != (current['_rev'] if current is not None else None) and \
+                        (live or doc.get('_rev') is not None):
+                    raise conflict()
+                generation = int(current['_rev'].split('-', 1)[0]) + 1 if current is not None else 1
+                body = json.dumps(doc, sort_keys=True, default=repr).encode('utf-8')
+                rev = '{0}-{1}'.format(generation, hashlib.md5(body).hexdigest())
+            else:
+                rev = doc['_rev']
+            doc = dict(doc, _id=doc_id, _rev=rev)
+            if not live and not doc.get('_deleted'):
+                insort(self.ids, doc_id)
+            elif live and doc.get('_deleted'):
+                del self.ids[bisect_left(self.ids, doc_id)]
+            self.docs[doc_id] = doc
+            if doc_id.startswith('_design/'):
+                self.views.pop(doc_id, None)
+            self.seq += 1
+            self.changes.pop(doc_id, None)
+            self.changes[doc_id] = self.seq
+            self.changed.notify_all()
+        return (doc_id, rev)
+
+    def changes_since(self, since, limit=None):
+        with self.changed:
+            results = []
+            for (doc_id, seq) in reversed(self.changes.items()):
+                if seq <= since:
+                    break
+                results.append((seq, self.docs[doc_id]))
+            results.reverse()
+            pending = max(0, len(results) - limit) if limit is not None else 0
+            return (results[:limit] if limit is not None else results, pending)
+
+    def wait_for_change(self, since, timeout):
+        with self.changed:
+            return self.changed.wait_for(lambda: self.seq > since, timeout)
+
+    def all_docs(self, params):
+        descending = params.get('descending', False)
+        with self.changed:
+            ids = self.ids
+            if 'keys' in params:
+                selected = list(params['keys'])
+            else:
+                start = params.get('startkey', params.get('start_key'))
+                end = params.get('endkey', params.get('end_key'))
+                inclusive_end = params.get('inclusive_end', True)
+                if descending:
+                    high = len(ids) if start is None else bisect_right(ids, start)
+                    low = 0 if end is None else (bisect_left(ids, end) if inclusive_end else bisect_right(ids, end))
+                    selected = ids[low:high][::-1]
+                else:
+                    low = 0 if start is None else bisect_left(ids, start)
+                    high = len(ids) if end is None else \
+                        (bisect_right(ids, end) if inclusive_end else bisect_left(ids, end))
+                    selected = ids[low:high]
+                offset = low if not descending else len(ids) - high
+            skip = params.get('skip', 0)
+            limit = params.get('limit')
+            selected = selected[skip:skip + limit if limit is not None else None]
+            rows = []
+            for doc_id in selected:
+                doc = self.docs.get(doc_id)
+                if doc is None:
+                    rows.append({'key': doc_id, 'error': 'not_found'})
+                    continue
+                row = {'id': doc_id, 'key': doc_id, 'value': {'rev': doc['_rev']}}
+                if doc.get('_deleted'):
+                    row['value']['deleted'] = True
+                    row['doc'] = None
+                elif params.get('include_docs'):
+                    row['doc'] = doc
+                if not params.get('include_docs'):
+                    row.pop('doc', None)
+                rows.append(row)
+            result = {'total_rows': len(ids), 'rows': rows}
+            if 'keys' not in params:
+                result['offset'] = offset + skip
+            if params.get('update_seq'):
+                result['update_seq'] = self.format_seq(self.seq)
+            return result
+
+    def view(self, ddoc, view, params):
+        design_id = '_design/' + ddoc
+        with self.changed:
+            index = self.views.get(design_id, {}).get(view)
+            if index is None:
+                index = self._build_view(design_id, view)
+            (rows, reduce) = index
+        if 'key' in params:
+            params = dict(params, startkey=params['key'], endkey=params['key'], inclusive_end=True)
+        if reduce is not None and params.get('reduce', True):
+            return self._reduced(rows, reduce, params)
+        descending = params.get('descending', False)
+        if 'keys' in params:
+            keys = [collation_key(key) for key in params['keys']]
+            selected = [row for key in keys for row in rows if row[0][0] == key]
+        else:
+            selected = [row for row in (rows[::-1] if descending else rows) if self._in_range(row, params)]
+        skip = params.get('skip', 0)
+        limit = params.get('limit')
+        selected = selected[skip:skip + limit if limit is not None else None]
+        result_rows = []
+        for (_, key, doc_id, value) in selected:
+            row = {'id': doc_id, 'key': key, 'value': value}
+            if params.get('include_docs'):
+                row['doc'] = self.docs.get(doc_id)
+            result_rows.append(row)
+        return {'total_rows': len(rows), 'offset': skip, 'rows': result_rows}
+
+    def _build_view(self, design_id, view):
+        design = self.docs.get(design_id)
+        if design is None or design.get('_deleted'):
+            raise not_found()
+        definition = (design.get('views') or {}).get(view)
+        if definition is None:
+            raise not_found('missing_named_view')
+        map_fn = definition['map'] if callable(definition['map']) else compile_map(definition['map'])
+        rows = []
+        for doc_id in self.ids:
+            if doc_id.startswith('_design/'):
+                continue
+            for (key, value) in map_fn(self.docs[doc_id]):
+                rows.append(((collation_key(key), doc_id), key, doc_id, value))
+        rows.sort(key=lambda row: row[0])
+        index = (rows, definition.get('reduce'))
+        self.views.setdefault(design_id, {})[view] = index
+        return index
+
+    @staticmethod
+    def _in_range(row, params):
+        (key, doc_id) = row[0]
+        start = params.get('startkey', params.get('start_key'))
+        end = params.get('endkey', params.get('end_key'))
+        start_id = params.get('startkey_docid')
+        inclusive_end = params.get('inclusive_end', True)
+        if params.get('descending', False):
+            if start is not None and (key, doc_id) > (collation_key(start), start_id or '\U0010ffff'):
+                return False
+            if end is not None and (key < collation_key(end) if inclusive_end else key <= collation_key(end)):
+                return False
+        else:
+            if start is not None and (key, doc_id) < (collation_key(start), start_id or ''):
+                return False
+            if end is not None and (key > collation_key(end) if inclusive_end else key >= collation_key(end)):
+                return False
+        return True
+
+    def _reduced(self, rows, reduce, params):
+        group = params.get('group', False) or params.get('group_level') is not None
+        if not group:
+            values = [row[3] for row in rows if self._in_range(row, params)]
+            return {'rows': [{'key': None, 'value': _reduce(reduce, values)}] if values else []}
+        groups = collections.OrderedDict()
+        for row in rows:
+            if self._in_range(row, params):
+                groups.setdefault(json.dumps(row[1]), (row[1], []))[1].append(row[3])
+        return {'rows': [{'key': key, 'value': _reduce(reduce, values)} for (key, values) in groups.values()]}
+
+    def find(self, query):
+        selector = query.get('selector')
+        if not isinstance(selector, dict):
+            raise bad_request('selector must be a JSON object')
+        with self.changed:
+            docs = [self.docs[doc_id] for doc_id in self.ids if not doc_id.startswith('_design/')]
+        docs = [doc for doc in docs if matches(doc, selector)]
+        for sort in reversed(query.get('sort') or []):
+            (field, direction) = next(iter(sort.items())) if isinstance(sort, dict) else (sort, 'asc')
+            docs.sort(key=lambda doc, field=field: collation_key(get_field(doc, field)),
+                      reverse=direction == 'desc')
+        skip = query.get('skip', 0)
+        if query.get('bookmark') not in (None, 'nil'):
+            skip = int(base64.urlsafe_b64decode(query['bookmark'].encode('ascii')))
+        limit = query.get('limit', 25)
+        docs = docs[skip:skip + limit]
+        fields = query.get('fields')
+        if fields:
+            docs = [{field: get_field(doc, field) for field in fields if get_field(doc, field) is not None}
+                    for doc in docs]
+        bookmark = base64.urlsafe_b64encode(str(skip + len(docs)).encode('ascii')).decode('ascii')
+        return {'docs': docs, 'bookmark': bookmark}
+
+
+class FakeCouchDB:
+    """A CouchDB stand-in serving HTTP on a local port from a background
+    thread.
+
+    Requests are not authenticated, but _session issues and checks
+    AuthSession cookies so that session authentication can be exercised.
+
+    Args:
+        host: The address to listen on. Defaults to 127.0.0.1.
+        port: The port to listen on. Defaults to any free port.
+
+    Keyword Args:
+        latency: Seconds each request is delayed by, to model a network
+            round trip. Defaults to 0.
+        session_lifetime: Seconds an AuthSession cookie is valid.
+            Defaults to 600.
+
+    Attributes:
+        databases (dict): The Database of each name.
+        request_counts (Counter): The number of requests per method and
+            endpoint, e.g. ('POST', '_bulk_docs').
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, *, latency=0.0, session_lifetime=600):
+        self.latency = latency
+        self.session_lifetime = session_lifetime
+        self.databases = {}
+        self.sessions = {}
+        self.request_counts = collections.Counter()
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.couch = self
+        self._thread = None
+
+    @property
+    def url(self):
+        (host, port) = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='FakeCouchDB', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        for database in list(self.databases.values()):
+            with database.changed:
+                database.changed.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def create_database(self, name):
+        with self._lock:
+            if name in self.databases:
+                raise CouchError(412, 'file_exists', 'The database could not be created, the file already exists.')
+            database = self.databases[name] = Database(name)
+            return database
+
+    def database(self, name):
+        database = self.databases.get(name)
+        if database is None:
+            raise not_found('Database does not exist.')
+        return database
+
+    def add_view(self, db, ddoc, view, map_fn, reduce=None):
+        """Add a view with a Python map function, called with each document
+        and returning an iterable of (key, value) pairs."""
+        database = self.database(db)
+        design_id = '_design/' + ddoc
+        try:
+            design = dict(database.get(design_id))
+        except CouchError:
+            design = {'_id': design_id}
+        design['views'] = dict(design.get('views') or {}, **{view: {'map': map_fn, 'reduce': reduce}})
+        database.update(design)
+
+
+_JSON_PARAMS = frozenset(['key', 'keys', 'startkey', 'start_key', 'endkey', 'end_key', 'doc_ids'])
+
+
+def _parse_params(query):
+    params = {}
+    for (name, value) in parse_qsl(query, keep_blank_values=True):
+        if name in _JSON_PARAMS or value in ('true', 'false') or re.fullmatch(r'-?\d+', value):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        params[name] = value
+    return params
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+    # room for the connections many client threads open at once
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CouchDB/3.1.1'
+    sys_version = '(FakeCouchDB)'
+
+    def setup(self):
+        super().setup()
+        # headers and body are written separately, without this small
+        # responses wait for the delayed ACK of the client
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    @property
+    def couch(self):
+        return self.server.couch
+
+    def _handle(self):
+        start = time.perf_counter()
+        self.body_time = 0
+        try:
+            (path, _, query) = self.path.partition('?')
+            segments = [unquote(segment) for segment in urlsplit(path).path.split('/') if segment]
+            self.params = _parse_params(query)
+            body = self._read_body()
+            self.body_time = int((time.perf_counter() - start) * 1000)
+            if self.couch.latency:
+                time.sleep(self.couch.latency)
+            (status, result, headers) = self._route(segments, body)
+        except CouchError as err:
+            (status, result, headers) = (err.status, {'error': err.error, 'reason': err.reason}, {})
+        if result is not _STREAMED:
+            self._respond(status, result, headers)
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            data = self._read_chunks()
+        else:
+            length = int(self.headers.get('Content-Length') or 0)
+            data = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Encoding') == 'gzip' and data:
+            data = gzip.decompress(data)
+        if not data:
+            return None
+        if (self.headers.get('Content-Type') or '').startswith('application/x-www-form-urlencoded'):
+            return dict(parse_qsl(data.decode('utf-8')))
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise bad_request('invalid UTF-8 JSON')
+
+    def _read_chunks(self):
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if not size:
+                # the trailer, ending with an empty line
+                while self.rfile.readline().strip():
+                    pass
+                return b''.join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def _respond(self, status, result, headers):
+        data = b'' if result is None else \
+            json.dumps(result, separators=(',', ':'), default=repr).encode('utf-8') + b'\n'
+        self.send_response(status)
+        self._send_common_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for (name, value) in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def _send_common_headers(self):
+        self.send_header('Cache-Control', 'must-revalidate')
+        self.send_header('X-Couch-Request-ID', uuid.uuid4().hex[:10])
+        self.send_header('X-CouchDB-Body-Time', str(self.body_time))
+
+    def _count(self, endpoint):
+        with self.couch._lock:  # pylint: disable=protected-access
+            self.couch.request_counts[(self.command, endpoint)] += 1
+
+    def _route(self, segments, body):  # pylint: disable=too-many-return-statements
+        if not segments:
+            self._count('/')
+            return (200, {'couchdb': 'Welcome', 'version': '3.1.1', 'vendor': {'name': 'FakeCouchDB'},
+                          'features': []}, {})
+        if segments[0] == '_session':
+            self._count('_session')
+            return self._session(body)
+        if segments[0] == '_all_dbs':
+            self._count('_all_dbs')
+            return (200, sorted(self.couch.databases), {})
+        if len(segments) == 1:
+            self._count('db')
+            return self._database(segments[0], body)
+        database = self.couch.database(segments[0])
+        endpoint = segments[1]
+        if endpoint in ('_all_docs', '_bulk_docs', '_bulk_get', '_changes', '_find'):
+            self._count(endpoint)
+            params = dict(self.params, **(body or {})) if endpoint != '_changes' else self.params
+            if endpoint == '_all_docs':
+                return (200, database.all_docs(params), {})
+            if endpoint == '_bulk_docs':
+                return self._bulk_docs(database, body)
+            if endpoint == '_bulk_get':
+                return self._bulk_get(database, body)
+            if endpoint == '_find':
+                return (200, database.find(params), {})
+            return self._changes(database, body)
+        if endpoint == '_design' and len(segments) == 5 and segments[3] == '_view':
+            self._count('_view')
+            return (200, database.view(segments[2], segments[4], dict(self.params, **(body or {}))), {})
+        if endpoint in ('_design', '_local') and len(segments) == 3:
+            doc_id = endpoint + '/' + segments[2]
+        elif len(segments) == 2:
+            doc_id = endpoint
+        else:
+            raise bad_request('Unsupported path')
+        self._count('_local' if endpoint == '_local' else 'doc')
+        return self._document(database, doc_id, body)
+
+    def _session(self, body):
+        if self.command == 'POST':
+            token = uuid.uuid4().hex
+            name = (body or {}).get('name') or (body or {}).get('username')
+            with self.couch._lock:  # pylint: disable=protected-access
+                self.couch.sessions[token] = (name, time.time() + self.couch.session_lifetime)
+            cookie = 'AuthSession={0}; Version=1; Path=/; HttpOnly; Max-Age={1}'.format(
+                token, self.couch.session_lifetime)
+            return (200, {'ok': True, 'name': name, 'roles': ['_admin']}, {'Set-Cookie': cookie})
+        if self.command == 'DELETE':
+            return (200, {'ok': True}, {'Set-Cookie': 'AuthSession=; Version=1; Path=/; HttpOnly'})
+        name = None
+        match = re.search(r'AuthSession=([0-9a-f]+)', self.headers.get('Cookie') or '')
+        session = self.couch.sessions.get(match.group(1)) if match else None
+        if session is not None and session[1] > time.time():
+            name = session[0]
+        return (200, {'ok': True, 'userCtx': {'name': name, 'roles': ['_admin'] if name else []},
+                      'info': {'authenticated': 'cookie' if name else None}}, {})
+
+    def _database(self, name, body):
+        if self.command == 'PUT':
+            self.couch.create_database(name)
+            return (201, {'ok': True}, {})
+        if self.command == 'DELETE':
+            self.couch.database(name)
+            with self.couch._lock:  # pylint: disable=protected-access
+                self.couch.databases.pop(name, None)
+            return (200, {'ok': True}, {})
+        database = self.couch.database(name)
+        if self.command == 'POST':
+            (doc_id, rev) = database.update(body or {})
+            return (201, {'ok': True, 'id': doc_id, 'rev': rev}, {})
+        return (200, database.info(), {})
+
+    def _document(self, database, doc_id, body):
+        if doc_id.startswith('_local/'):
+            return self._local_document(database, doc_id, body)
+        if self.command in ('GET', 'HEAD'):
+            doc = database.get(doc_id, self.params.get('rev'))
+            etag = '"{0}"'.format(doc['_rev'])
+            if self.headers.get('If-None-Match') == etag:
+                return (304, None, {'ETag': etag})
+            return (200, doc, {'ETag': etag})
+        if self.command == 'DELETE':
+            current = database.get(doc_id)
+            rev = self.params.get('rev') or self.headers.get('If-Match')
+            if rev != current['_rev']:
+                raise conflict()
+            (_, rev) = database.update({'_id': doc_id, '_rev': rev, '_deleted': True})
+        else:
+            doc = dict(body or {}, _id=doc_id)
+            if 'rev' in self.params:
+                doc['_rev'] = self.params['rev']
+            (_, rev) = database.update(doc)
+        return (201, {'ok': True, 'id': doc_id, 'rev': rev}, {'ETag': '"{0}"'.format(rev)})
+
+    def _local_document(self, database, doc_id, body):
+        with database.changed:
+            if self.command in ('GET', 'HEAD'):
+                if doc_id not in database.local_docs:
+                    raise not_found()
+                return (200, database.local_docs[doc_id], {})
+            if self.command == 'DELETE':
+                if database.local_docs.pop(doc_id, None) is None:
+                    raise not_found()
+                return (200, {'ok': True, 'id': doc_id, 'rev': '0-0'}, {})
+            database.local_docs[doc_id] = dict(body or {}, _id=doc_id, _rev='0-1')
+            return (201, {'ok': True, 'id': doc_id, 'rev': '0-1'}, {})
+
+    def _bulk_docs(self, database, body):
+        new_edits = (body or {}).get('new_edits', True)
+        results = []
+        for doc in (body or {}).get('docs') or []:
+            try:
+                (doc_id, rev) = database.update(dict(doc), new_edits)
+                results.append({'ok': True, 'id': doc_id, 'rev': rev})
+            except CouchError as err:
+                results.append({'id': doc.get('_id'), 'error': err.error, 'reason': err.reason})
+        return (201, results, {})
+
+    def _bulk_get(self, database, body):
+        results = []
+        for request in (body or {}).get('docs') or []:
+            try:
+                doc = database.get(request['id'], request.get('rev'))
+                results.append({'id': request['id'], 'docs': [{'ok': doc}]})
+            except CouchError as err:
+                results.append({'id': request['id'], 'docs': [{'error': {
+                    'id': request['id'], 'rev': request.get('rev') or 'undefined',
+                    'error': err.error, 'reason': err.reason}}]})
+        return (200, {'results': results}, {})
+
+    def _change_row(self, seq, doc):
+        row = {'seq': Database.format_seq(seq), 'id': doc['_id'], 'changes': [{'rev': doc['_rev']}]}
+        if doc.get('_deleted'):
+            row['deleted'] = True
+        if self.params.get('include_docs'):
+            row['doc'] = doc
+        return row
+
+    def _changes_filter(self, body):
+        doc_ids = (body or {}).get('doc_ids') or self.params.get('doc_ids')
+        selector = (body or {}).get('selector')
+
+        def included(doc):
+            if doc_ids is not None and doc['_id'] not in doc_ids:
+                return False
+            return selector is None or matches(doc, selector)
+        return included
+
+    def _changes(self, database, body):
+        feed = self.params.get('feed', 'normal')
+        since = database.parse_seq(self.params.get('since'), database.seq)
+        limit = self.params.get('limit')
+        timeout = self.params.get('timeout', 60000) / 1000
+        included = self._changes_filter(body)
+        if feed == 'continuous':
+            self._continuous(database, since, limit, timeout, included)
+            return (200, _STREAMED, {})
+        if feed == 'longpoll' and database.seq <= since:
+            database.wait_for_change(since, timeout)
+        (changes, pending) = database.changes_since(since, limit)
+        rows = [self._change_row(seq, doc) for (seq, doc) in changes if included(doc)]
+        last_seq = changes[-1][0] if changes else since
+        return (200, {'results': rows, 'last_seq': Database.format_seq(last_seq), 'pending': pending}, {})
+
+    def _continuous(self, database, since, limit, timeout, included):
+        heartbeat = self.params.get('heartbeat')
+        heartbeat = heartbeat / 1000 if isinstance(heartbeat, int) and heartbeat > 0 else None
+        self.send_response(200)
+        self._send_common_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        deadline = time.monotonic() + timeout if heartbeat is None else None
+        sent = 0
+        try:
+            while not self.couch.stopping.is_set():
+                (changes, _) = database.changes_since(since)
+                lines = []
+                for (seq, doc) in changes:
+                    since = seq
+                    if included(doc):
+                        lines.append(json.dumps(self._change_row(seq, doc)).encode('utf-8') + b'\n')
+                        sent += 1
+                        if limit is not None and sent >= limit:
+                            break
+                self._write_chunk(b''.join(lines))
+                if limit is not None and sent >= limit:
+                    break
+                wait = heartbeat if heartbeat is not None else deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                if not database.wait_for_change(since, wait) and heartbeat is not None:
+                    self._write_chunk(b'\n')
+            self._write_chunk(json.dumps({'last_seq': Database.format_seq(since), 'pending': 0}).encode('utf-8')
+                              + b'\n')
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        if data:
+            self.wfile.write('{0:x}\r\n'.format(len(data)).encode('ascii') + data + b'\r\n')
+
+
+_STREAMED = object()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve a FakeCouchDB until interrupted.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds each request is delayed by')
+    args = parser.parse_args()
+    server = FakeCouchDB(args.host, args.port, latency=args.latency).start()
+    # the first line of output tells a parent process where to connect
+    print(server.url, flush=True)
+    try:
+        server.stopping.wait()
+    except KeyboardInterrupt:
+        server.stop()
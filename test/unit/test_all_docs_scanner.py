@@ -0,0 +1,119 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the all_docs_scanner module
+"""
+
+import bisect
+import gzip
+import json
+import threading
+import unittest
+
+import requests
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import AllDocsScanner
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+BASE_URL = 'http://cloudant.example'
+ALL_DOCS_URL = BASE_URL + '/db/_all_docs'
+
+
+class FakeAllDocs:
+    """Serves _all_docs requests over a sorted list of IDs."""
+
+    def __init__(self, ids, fail_once=None):
+        self.ids = sorted(ids)
+        self.fail_once = fail_once
+        self.lock = threading.Lock()
+        self.ranges = []
+
+    def __call__(self, request):
+        body = json.loads(gzip.decompress(request.body))
+        ids = self.ids[::-1] if body.get('descending') else self.ids
+        start = 0
+        if 'startkey' in body:
+            start = bisect.bisect_left(self.ids, body['startkey'])
+        end = len(ids)
+        if 'endkey' in body:
+            end = bisect.bisect_left(self.ids, body['endkey']) if body.get('inclusive_end') is False else \
+                bisect.bisect_right(self.ids, body['endkey'])
+        rows = ids[start:end][:body.get('limit', len(ids))]
+        if body.get('limit') != 0 and not body.get('descending') and body.get('limit') != 1:
+            with self.lock:
+                self.ranges.append((body.get('startkey'), body.get('endkey')))
+                if self.fail_once is not None and body.get('startkey') == self.fail_once:
+                    self.fail_once = None
+                    raise requests.exceptions.ConnectionError('reset')
+        result = {'total_rows': len(self.ids), 'offset': start,
+                  'rows': [{'id': i, 'key': i, 'value': {'rev': '1-abc'}} for i in rows]}
+        return (200, {}, json.dumps(result))
+
+
+class TestAllDocsScanner(unittest.TestCase):
+    """
+    Test the AllDocsScanner class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+
+    def test_reserved_params(self):
+        with self.assertRaises(ValueError):
+            AllDocsScanner(self.service, 'db', limit=10)
+
+    @responses.activate
+    def test_unordered(self):
+        fake = FakeAllDocs(['{0:04x}'.format(i * 37) for i in range(500)])
+        responses.add_callback(responses.POST, ALL_DOCS_URL, fake)
+        ids = [row.id for row in AllDocsScanner(self.service, 'db', workers=3)]
+        self.assertEqual(fake.ids, sorted(ids))
+        self.assertEqual(12, len(fake.ranges))
+
+    @responses.activate
+    def test_ordered(self):
+        fake = FakeAllDocs(['doc{0:05d}'.format(i) for i in range(300)])
+        responses.add_callback(responses.POST, ALL_DOCS_URL, fake)
+        ids = [row.id for row in AllDocsScanner(self.service, 'db', workers=2, ordered=True, buffer_size=5)]
+        self.assertEqual(fake.ids, ids)
+
+    @responses.activate
+    def test_balanced_ranges(self):
+        # skewed IDs, all but one share a long prefix
+        fake = FakeAllDocs(['a'] + ['prefix-{0:08x}'.format(i * 7919) for i in range(1000)])
+        responses.add_callback(responses.POST, ALL_DOCS_URL, fake)
+        ranges = AllDocsScanner(self.service, 'db', partitions=4).ranges()
+        self.assertEqual(4, len(ranges))
+        sizes = [len([i for i in fake.ids if (s is None or i >= s) and (e is None or i < e)]) for (s, e) in ranges]
+        self.assertTrue(all(180 <= size <= 320 for size in sizes), sizes)
+
+    @responses.activate
+    def test_empty_database(self):
+        responses.add_callback(responses.POST, ALL_DOCS_URL, FakeAllDocs([]))
+        self.assertEqual([], list(AllDocsScanner(self.service, 'db')))
+
+    @responses.activate
+    def test_retries_transient_errors(self):
+        fake = FakeAllDocs(['doc{0:03d}'.format(i) for i in range(100)])
+        responses.add_callback(responses.POST, ALL_DOCS_URL, fake)
+        scanner = AllDocsScanner(self.service, 'db', partitions=2, balanced=False)
+        fake.fail_once = scanner.ranges()[1][0]
+        ids = [row.id for row in scanner]
+        self.assertEqual(fake.ids, sorted(ids))
@@ -0,0 +1,109 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the bulk_writer module
+"""
+
+import gzip
+import json
+import unittest
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import BulkWriter
+from ibmcloudant.cloudant_v1 import CloudantV1, Document, DocumentResult
+
+BULK_DOCS_URL = 'http://cloudant.example/db/_bulk_docs'
+
+
+def bulk_docs(request):
+    docs = json.loads(gzip.decompress(request.body))['docs']
+    results = []
+    for doc in docs:
+        if doc['_id'] == 'conflict':
+            results.append({'id': doc['_id'], 'error': 'conflict', 'reason': 'Document update conflict.'})
+        else:
+            results.append({'id': doc['_id'], 'rev': '1-abc', 'ok': True})
+    return 201, {}, json.dumps(results)
+
+
+def batch_sizes():
+    return [len(json.loads(gzip.decompress(call.request.body))['docs']) for call in responses.calls]
+
+
+class TestBulkWriter(unittest.TestCase):
+    """
+    Test the BulkWriter class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url('http://cloudant.example')
+
+    @responses.activate
+    def test_batches_by_count(self):
+        responses.add_callback(responses.POST, BULK_DOCS_URL, callback=bulk_docs)
+        with BulkWriter(self.service, 'db', batch_size=3, flush_interval=60) as writer:
+            futures = [writer.write({'_id': 'doc{0}'.format(i)}) for i in range(7)]
+        self.assertEqual([3, 3, 1], sorted(batch_sizes(), reverse=True))
+        self.assertEqual(DocumentResult('doc5', rev='1-abc', ok=True), futures[5].result())
+
+    @responses.activate
+    def test_batches_by_size(self):
+        responses.add_callback(responses.POST, BULK_DOCS_URL, callback=bulk_docs)
+        doc_size = len(json.dumps({'_id': 'doc0', 'data': 'x' * 100}))
+        with BulkWriter(self.service, 'db', max_batch_bytes=2 * doc_size + 2, flush_interval=60) as writer:
+            for i in range(5):
+                writer.write({'_id': 'doc{0}'.format(i), 'data': 'x' * 100})
+        self.assertEqual([2, 2, 1], sorted(batch_sizes(), reverse=True))
+
+    @responses.activate
+    def test_flush_interval(self):
+        responses.add_callback(responses.POST, BULK_DOCS_URL, callback=bulk_docs)
+        writer = BulkWriter(self.service, 'db', flush_interval=0.05)
+        try:
+            future = writer.write(Document(id='doc0', name='zebra'))
+            self.assertEqual('1-abc', future.result(timeout=5).rev)
+            self.assertEqual({'docs': [{'_id': 'doc0', 'name': 'zebra'}]},
+                             json.loads(gzip.decompress(responses.calls[0].request.body)))
+        finally:
+            writer.close()
+
+    @responses.activate
+    def test_document_error(self):
+        responses.add_callback(responses.POST, BULK_DOCS_URL, callback=bulk_docs)
+        with BulkWriter(self.service, 'db') as writer:
+            ok = writer.write({'_id': 'doc0'})
+            conflict = writer.write({'_id': 'conflict'})
+        self.assertTrue(ok.result().ok)
+        self.assertEqual('conflict', conflict.result().error)
+
+    @responses.activate
+    def test_request_error(self):
+        responses.add(responses.POST, BULK_DOCS_URL, status=500, json={'error': 'internal_server_error'})
+        with BulkWriter(self.service, 'db') as writer:
+            futures = [writer.write({'_id': 'doc0'}), writer.write({'_id': 'doc1'})]
+        for future in futures:
+            self.assertIsInstance(future.exception(), ApiException)
+
+    def test_write_after_close(self):
+        writer = BulkWriter(self.service, 'db')
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write({'_id': 'doc0'})
@@ -0,0 +1,136 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the changes_follower module
+"""
+
+import gzip
+import json
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ChangesFollower
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+BASE_URL = 'http://cloudant.example'
+CHANGES_URL = BASE_URL + '/db/_changes'
+
+
+def feed(*seqs, last_seq=None):
+    lines = [json.dumps({'seq': seq, 'id': 'doc' + seq, 'changes': [{'rev': '1-' + seq}]}) for seq in seqs]
+    lines.append('')
+    if last_seq:
+        lines.append(json.dumps({'last_seq': last_seq, 'pending': 0}))
+    return '\n'.join(lines) + '\n'
+
+
+def since_of(call):
+    return parse_qs(urlparse(call.request.url).query)['since'][0]
+
+
+class TestChangesFollower(unittest.TestCase):
+    """
+    Test the ChangesFollower class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+
+    def follower(self, **kwargs):
+        return ChangesFollower(self.service, 'db', batch_wait=0.05, retry_delay=0.01, **kwargs)
+
+    def test_reserved_params(self):
+        with self.assertRaises(ValueError):
+            ChangesFollower(self.service, 'db', feed='longpoll')
+
+    @responses.activate
+    def test_resumes_after_end_of_feed_and_errors(self):
+        responses.add(responses.POST, CHANGES_URL, body=feed('1', '2', last_seq='3'))
+        responses.add(responses.POST, CHANGES_URL, body=requests.exceptions.ConnectionError('reset'))
+        responses.add(responses.POST, CHANGES_URL, status=503, json={'error': 'unavailable'})
+        responses.add(responses.POST, CHANGES_URL, body=feed('4'))
+        follower = self.follower(since='0', include_docs=True)
+        ids = []
+        for item in follower:
+            ids.append(item.id)
+            if len(ids) == 3:
+                follower.stop()
+                follower.join()
+                break
+        self.assertEqual(['doc1', 'doc2', 'doc4'], ids)
+        self.assertEqual(['0', '3', '3', '3'], [since_of(call) for call in responses.calls[:4]])
+        query = parse_qs(urlparse(responses.calls[0].request.url).query)
+        self.assertEqual(['continuous'], query['feed'])
+        self.assertEqual(['true'], query['include_docs'])
+
+    @responses.activate
+    def test_batches(self):
+        responses.add(responses.POST, CHANGES_URL, body=feed('1', '2', '3', '4', '5'))
+        responses.add(responses.POST, CHANGES_URL, body='\n\n')
+        follower = self.follower(since='0', batch_size=2)
+        batches = []
+        for batch in follower.batches():
+            batches.append([item.seq for item in batch])
+            if sum(len(b) for b in batches) >= 5:
+                follower.stop()
+                follower.join()
+        self.assertEqual([['1', '2'], ['3', '4'], ['5']], batches)
+
+    @responses.activate
+    def test_since_now_resumes_from_update_seq(self):
+        responses.add(responses.GET, BASE_URL + '/db', json={'db_name': 'db', 'update_seq': '5'})
+        responses.add(responses.POST, CHANGES_URL, body=requests.exceptions.ConnectionError('reset'))
+        responses.add(responses.POST, CHANGES_URL, body=feed('6'))
+        follower = self.follower()
+        for item in follower:
+            follower.stop()
+            follower.join()
+            break
+        self.assertEqual('doc6', item.id)
+        posts = [call for call in responses.calls if call.request.method == 'POST']
+        self.assertEqual(['5', '5'], [since_of(call) for call in posts[:2]])
+
+    @responses.activate
+    def test_permanent_error(self):
+        responses.add(responses.GET, BASE_URL + '/db', status=404, json={'error': 'not_found'})
+        with self.assertRaises(ApiException) as ctx:
+            list(self.follower())
+        self.assertEqual(404, ctx.exception.code)
+
+    @responses.activate
+    def test_checkpoint(self):
+        local_url = BASE_URL + '/db/_local/follower1'
+        responses.add(responses.GET, local_url, json={'_id': '_local/follower1', '_rev': '0-1', 'seq': '2'})
+        responses.add(responses.PUT, local_url, json={'id': '_local/follower1', 'rev': '0-2', 'ok': True})
+        responses.add(responses.POST, CHANGES_URL, body=feed('3', '4'))
+        follower = self.follower(checkpoint_id='follower1')
+        for item in follower:
+            if item.seq == '4':
+                follower.stop()
+                follower.join()
+                break
+        self.assertEqual('2', since_of(next(c for c in responses.calls if c.request.url.startswith(CHANGES_URL))))
+        puts = [c for c in responses.calls if c.request.method == 'PUT']
+        self.assertEqual(1, len(puts))
+        self.assertEqual({'_rev': '0-1', 'seq': '3'}, json.loads(gzip.decompress(puts[0].request.body)))
+        self.assertEqual('3', follower.last_seq)
@@ -0,0 +1,277 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the cloudant_v1_async module
+"""
+
+import asyncio
+import email.utils
+import functools
+import gzip
+import json
+import socketserver
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import (AsyncCloudantV1, AsyncResultStream, ConnectionPool, CouchDbSessionAuthenticator,
+                         MetricsCollector, RateLimiter, ResponseCache, RetryPolicy)
+from ibmcloudant.cloudant_v1 import BulkDocs, Document, DocsResultRow
+from ibmcloudant.cloudant_v1_async import _get_error_message
+from ibmcloudant.json_codec import DEFAULT_JSON_CODEC
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for (name, value) in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _record(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        self.server.calls.append((self.command, self.path, self.headers, body))
+        return body
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._record()
+        path = urlparse(self.path).path
+        if path == '/db/doc1':
+            self._reply(200, {'_id': 'doc1', '_rev': '1-abc'})
+        elif path == '/db/flaky':
+            # fails every other request
+            self.server.flaky += 1
+            if self.server.flaky % 2:
+                self._reply(503, {'error': 'service_unavailable', 'reason': 'busy'}, {'Retry-After': '0'})
+            else:
+                self._reply(200, {'_id': 'flaky', '_rev': '1-abc'})
+        else:
+            self._reply(404, {'error': 'not_found', 'reason': 'missing'})
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        self._record()
+        self.send_response(200)
+        self.send_header('ETag', '"1-abc"')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = self._record()
+        path = urlparse(self.path).path
+        if path == '/_session':
+            self.server.sessions += 1
+            time.sleep(0.05)
+            expires = email.utils.formatdate(time.time() + 600, usegmt=True)
+            self._reply(200, {'ok': True}, {
+                'Set-Cookie': 'AuthSession=session{0}; Version=1; Expires={1}; Max-Age=600; Path=/; HttpOnly'.format(
+                    self.server.sessions, expires)})
+        elif path == '/db/_bulk_docs':
+            docs = json.loads(body)['docs']
+            self._reply(201, [{'id': doc['_id'], 'rev': '1-abc', 'ok': True} for doc in docs])
+        elif path == '/db/_all_docs':
+            rows = [{'id': 'doc{0}'.format(i), 'key': 'doc{0}'.format(i), 'value': {'rev': '1-abc'}}
+                    for i in range(50)]
+            self._reply(200, {'total_rows': 50, 'offset': 0, 'rows': rows})
+        else:
+            self._reply(404, {'error': 'not_found', 'reason': 'missing'})
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+
+
+class _AsyncTestCase(unittest.TestCase):
+    """Run coroutine test methods, as unittest.IsolatedAsyncioTestCase does
+    from Python 3.8, in a new event loop per test."""
+
+    def run(self, result=None):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        method = getattr(self, self._testMethodName)
+
+        @functools.wraps(method)
+        def run_method():
+            loop.run_until_complete(method())
+
+        setattr(self, self._testMethodName, run_method)
+        self._loop = loop  # pylint: disable=attribute-defined-outside-init
+        try:
+            return super().run(result)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            asyncio.set_event_loop(None)
+
+    def setUp(self) -> None:
+        self._loop.run_until_complete(self.asyncSetUp())
+
+    def tearDown(self) -> None:
+        self._loop.run_until_complete(self.asyncTearDown())
+
+    async def asyncSetUp(self) -> None:
+        pass
+
+    async def asyncTearDown(self) -> None:
+        pass
+
+
+class TestAsyncCloudantV1(_AsyncTestCase):
+    """
+    Test the AsyncCloudantV1 class
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = _Server(('127.0.0.1', 0), _Handler)
+        cls.server.calls = []
+        cls.server.sessions = 0
+        cls.server.flaky = 0
+        cls.url = 'http://127.0.0.1:{0}'.format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def asyncSetUp(self) -> None:
+        self.server.calls.clear()
+        self.service = AsyncCloudantV1(NoAuthAuthenticator())
+        self.service.set_service_url(self.url)
+
+    async def asyncTearDown(self) -> None:
+        await self.service.close()
+
+    async def test_get_document(self):
+        response = await self.service.get_document(db='db', doc_id='doc1', revs_info=True)
+        self.assertEqual(200, response.get_status_code())
+        self.assertEqual({'_id': 'doc1', '_rev': '1-abc'}, response.get_result())
+        (method, path, headers, _) = self.server.calls[0]
+        self.assertEqual('GET', method)
+        self.assertEqual(['true'], parse_qs(urlparse(path).query)['revs_info'])
+        self.assertIn('operation_id=get_document', headers['X-IBMCloud-SDK-Analytics'])
+
+    async def test_head_document(self):
+        response = await self.service.head_document(db='db', doc_id='doc1')
+        self.assertIsNone(response.get_result())
+        self.assertEqual('"1-abc"', response.get_headers()['ETag'])
+
+    async def test_post_bulk_docs(self):
+        docs = [Document(id='doc{0}'.format(i)) for i in range(3)]
+        response = await self.service.post_bulk_docs(db='db', bulk_docs=BulkDocs(docs=docs))
+        self.assertEqual(['doc0', 'doc1', 'doc2'], [result['id'] for result in response.get_result()])
+        self.assertEqual('gzip', self.server.calls[0][2].get('Content-Encoding'))
+        self.assertEqual(3, len(json.loads(self.server.calls[0][3])['docs']))
+
+    async def test_error(self):
+        with self.assertRaises(ApiException) as ctx:
+            await self.service.get_document(db='db', doc_id='missing')
+        self.assertEqual(404, ctx.exception.code)
+        self.assertEqual('not_found', ctx.exception.message)
+
+    async def test_retry_policy(self):
+        policy = RetryPolicy(base_delay=0.001)
+        self.service.set_retry_policy(policy)
+        response = await self.service.get_document(db='db', doc_id='flaky')
+        self.assertEqual('flaky', response.get_result()['_id'])
+        self.assertEqual(2, len(self.server.calls))
+        self.assertEqual({'get_document': 1}, policy.retries)
+
+    async def test_metrics(self):
+        collector = MetricsCollector()
+        self.service.set_metrics(collector)
+        await self.service.get_document(db='db', doc_id='doc1')
+        with self.assertRaises(ApiException):
+            await self.service.get_document(db='db', doc_id='missing')
+        snapshot = collector.snapshot()['get_document']
+        self.assertEqual({200: 1, 404: 1}, snapshot['statuses'])
+        self.assertEqual(2, snapshot['latency_seconds']['count'])
+
+    async def test_rate_limiter(self):
+        limiter = RateLimiter(read=20)
+        self.service.set_rate_limiter(limiter)
+        start = time.monotonic()
+        await asyncio.gather(*[self.service.get_document(db='db', doc_id='doc1') for _ in range(25)])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    async def test_unsupported_setters(self):
+        with self.assertRaises(NotImplementedError):
+            self.service.set_response_cache(ResponseCache())
+        with self.assertRaises(NotImplementedError):
+            self.service.set_connection_pool(ConnectionPool())
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*[self.service.get_document(db='db', doc_id='doc1') for _ in range(20)])
+        self.assertEqual(20, len(responses))
+        self.assertTrue(all(r.get_result()['_id'] == 'doc1' for r in responses))
+
+    async def test_as_stream(self):
+        response = await self.service.post_all_docs_as_stream(db='db')
+        async with AsyncResultStream(response, DocsResultRow) as rows:
+            ids = [row.id async for row in rows]
+        self.assertEqual(['doc{0}'.format(i) for i in range(50)], ids)
+        self.assertEqual(50, rows.total_rows)
+
+    async def test_session_authenticator(self):
+        service = AsyncCloudantV1(CouchDbSessionAuthenticator('adm', 'pass'))
+        service.set_service_url(self.url)
+        sessions = self.server.sessions
+        async with service:
+            await asyncio.gather(*[service.get_document(db='db', doc_id='doc1') for _ in range(5)])
+        self.assertEqual(sessions + 1, self.server.sessions)
+        cookies = [headers.get('Cookie') for (_, path, headers, _) in self.server.calls if path.startswith('/db/')]
+        self.assertEqual(['AuthSession=session{0}'.format(self.server.sessions)] * 5, cookies)
+
+
+class TestGetErrorMessage(unittest.TestCase):
+    """
+    Test the error messages of AsyncCloudantV1 responses
+    """
+
+    def test_messages(self):
+        cases = [
+            (400, b'{"errors": [{"message": "bad"}]}', 'bad'),
+            (404, b'{"error": "not_found", "reason": "missing"}', 'not_found'),
+            (500, b'{"errors": [{"code": "x"}]}', 'Internal Server Error'),
+            (500, b'{"errors": []}', 'Internal Server Error'),
+            (502, b'[1, 2]', 'Bad Gateway'),
+            (503, b'<html>busy</html>', '<html>busy</html>'),
+            (503, b'', 'Service Unavailable'),
+            (401, b'{}', 'Unauthorized: Access is denied due to invalid credentials'),
+            (599, b'', 'Unknown error'),
+        ]
+        for (status, body, message) in cases:
+            with self.subTest(body=body):
+                self.assertEqual(message, _get_error_message(status, body, DEFAULT_JSON_CODEC))
@@ -41,3 +41,22 @@ class TestCommon(unittest.TestCase):
         """
         system_info = common.get_system_info()
         self.assertIsNotNone(system_info)
+
+    def test_get_operation_id(self):
+        """
+        Test the get_operation_id method
+        """
+        headers = common.get_sdk_headers(service_name='ibmcloudant', service_version='V1', operation_id='operation1')
+        self.assertEqual('operation1', common.get_operation_id(headers))
+        self.assertIsNone(common.get_operation_id({}))
+
+    def test_get_sdk_headers_copies(self):
+        """
+        Test the get_sdk_headers method returns a new dict on every call
+        """
+        headers = common.get_sdk_headers(service_name='ibmcloudant', service_version='V1', operation_id='operation1')
+        headers['Accept'] = 'application/json'
+        again = common.get_sdk_headers(service_name='ibmcloudant', service_version='V1', operation_id='operation1')
+        self.assertNotIn('Accept', again)
+        self.assertEqual('service_name=ibmcloudant;service_version=V1;operation_id=operation1',
+                         again[common.SDK_ANALYTICS_HEADER])
@@ -0,0 +1,109 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the compact_models module
+"""
+
+import json
+import pickle
+import unittest
+
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import AllDocsPager, ResultStream
+from ibmcloudant.cloudant_v1 import ChangesResultItem, CloudantV1, DocsResultRow, Document, ViewResultRow
+from ibmcloudant.compact_models import (CompactChangesResultItem, CompactDocsResultRow, CompactDocsResultRowValue,
+                                        CompactViewResultRow)
+
+BASE_URL = 'http://cloudant.example'
+
+DOC = {'_id': 'doc1', '_rev': '1-abc', 'type': 'order', 'total': 12.5}
+ROWS = [
+    (DocsResultRow, CompactDocsResultRow, {'id': 'doc1', 'key': 'doc1', 'value': {'rev': '1-abc'}, 'doc': DOC}),
+    (DocsResultRow, CompactDocsResultRow, {'key': 'missing', 'error': 'not_found'}),
+    (ViewResultRow, CompactViewResultRow, {'id': 'doc1', 'key': ['a', 1], 'value': None}),
+    (ViewResultRow, CompactViewResultRow, {'id': 'doc1', 'key': 'a', 'value': {'n': 1}, 'doc': DOC}),
+    (ChangesResultItem, CompactChangesResultItem,
+     {'changes': [{'rev': '2-def'}], 'id': 'doc1', 'seq': '2-g1A', 'deleted': True}),
+    (ChangesResultItem, CompactChangesResultItem,
+     {'changes': [{'rev': '1-abc'}], 'id': 'doc1', 'seq': '1-g1A', 'doc': DOC}),
+]
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def test_same_as_generated_models(self):
+        for (model, compact, row) in ROWS:
+            with self.subTest(model=model.__name__, row=row):
+                expected = model.from_dict(row)
+                actual = compact.from_dict(row)
+                self.assertEqual(actual.to_dict(), expected.to_dict())
+                self.assertEqual(str(actual), str(expected))
+                for name in compact.__slots__:
+                    if name not in ('value', 'changes'):
+                        self.assertEqual(getattr(actual, name), getattr(expected, name))
+
+    def test_no_instance_dict(self):
+        row = CompactDocsResultRow.from_dict(ROWS[0][2])
+        self.assertFalse(hasattr(row, '__dict__'))
+        self.assertIsInstance(row.value, CompactDocsResultRowValue)
+        self.assertIsInstance(row.doc, Document)
+        with self.assertRaises(AttributeError):
+            row.other = 1
+
+    def test_equality_and_pickle(self):
+        for (_, compact, row) in ROWS:
+            first = compact.from_dict(row)
+            self.assertEqual(first, compact.from_dict(json.loads(json.dumps(row))))
+            self.assertEqual(first, pickle.loads(pickle.dumps(first)))
+        self.assertNotEqual(CompactViewResultRow('a', 1), CompactViewResultRow('a', 2))
+        self.assertNotEqual(CompactViewResultRow('a', 1), ViewResultRow('a', 1))
+
+    def test_constructor(self):
+        row = CompactViewResultRow(['a'], 1, id='doc1')
+        self.assertEqual(row.to_dict(), {'id': 'doc1', 'key': ['a'], 'value': 1})
+        self.assertEqual(row, CompactViewResultRow.from_dict(row.to_dict()))
+
+    def test_required_properties(self):
+        with self.assertRaisesRegex(ValueError, "'value' not present in ViewResultRow JSON"):
+            CompactViewResultRow.from_dict({'key': 'a'})
+        with self.assertRaisesRegex(ValueError, "'key' not present in DocsResultRow JSON"):
+            CompactDocsResultRow.from_dict({'id': 'a'})
+        with self.assertRaisesRegex(ValueError, "'seq' not present in ChangesResultItem JSON"):
+            CompactChangesResultItem.from_dict({'changes': [], 'id': 'a'})
+        with self.assertRaisesRegex(ValueError, "'rev' not present in Change JSON"):
+            CompactChangesResultItem.from_dict({'changes': [{}], 'id': 'a', 'seq': '1'})
+
+    def test_result_stream(self):
+        body = json.dumps({'results': [row for (_, compact, row) in ROWS if compact is CompactChangesResultItem],
+                           'last_seq': '2-g1A'}).encode()
+        with ResultStream([body], CompactChangesResultItem, rows_key='results') as stream:
+            items = list(stream)
+        self.assertEqual([item.seq for item in items], ['2-g1A', '1-g1A'])
+        self.assertEqual(items[1].changes[0].rev, '1-abc')
+
+    @responses.activate
+    def test_pager_row_model(self):
+        rows = [{'id': 'doc{0}'.format(i), 'key': 'doc{0}'.format(i), 'value': {'rev': '1-abc'}} for i in range(3)]
+        responses.add(responses.POST, BASE_URL + '/db/_all_docs',
+                      json={'total_rows': 3, 'offset': 0, 'rows': rows})
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(BASE_URL)
+        pager = AllDocsPager(service, 'db', prefetch=False, row_model=CompactDocsResultRow)
+        result = list(pager.rows())
+        self.assertEqual(result, [CompactDocsResultRow.from_dict(row) for row in rows])
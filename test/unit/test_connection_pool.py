@@ -0,0 +1,125 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the connection_pool module
+"""
+
+import pickle
+import socket
+import threading
+import time
+import unittest
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ConnectionPool
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+from fake_couchdb import FakeCouchDB
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Test the ConnectionPool adapter against the FakeCouchDB server
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeCouchDB(latency=0.02).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def new_client(self, pool):
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(self.server.url)
+        service.set_connection_pool(pool)
+        self.addCleanup(pool.close)
+        return service
+
+    def stats(self, pool):
+        return pool.snapshot()[self.server.url]
+
+    def run_threads(self, service, threads, requests):
+        def work():
+            for _ in range(requests):
+                service.get_server_information()
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def test_undersized_pool_discards(self):
+        pool = ConnectionPool(max_connections_per_host=2)
+        self.run_threads(self.new_client(pool), 8, 5)
+        stats = self.stats(pool)
+        self.assertEqual(stats['requests'], 40)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertGreater(stats['max_in_use'], 2)
+        self.assertGreater(stats['discarded'], 0)
+        self.assertLessEqual(stats['idle'], 2)
+
+    def test_blocking_pool_waits(self):
+        pool = ConnectionPool(max_connections_per_host=2, block=True)
+        self.run_threads(self.new_client(pool), 8, 5)
+        stats = self.stats(pool)
+        self.assertEqual(stats['max_in_use'], 2)
+        self.assertEqual(stats['opened'], 2)
+        self.assertEqual(stats['discarded'], 0)
+        self.assertGreater(stats['wait_seconds'], 0)
+
+    def test_sized_pool_reuses(self):
+        pool = ConnectionPool(max_connections_per_host=8)
+        self.run_threads(self.new_client(pool), 8, 5)
+        stats = self.stats(pool)
+        self.assertEqual(stats['discarded'], 0)
+        self.assertLessEqual(stats['opened'], 8)
+        self.assertEqual(stats['idle'], stats['opened'])
+
+    def test_prewarm(self):
+        pool = ConnectionPool(prewarm=3)
+        service = self.new_client(pool)
+        stats = self.stats(pool)
+        self.assertEqual((stats['idle'], stats['opened']), (3, 3))
+        service.get_server_information()
+        self.assertEqual(self.stats(pool)['opened'], 3)
+
+    def test_idle_timeout(self):
+        pool = ConnectionPool(idle_timeout=0.05)
+        service = self.new_client(pool)
+        service.get_server_information()
+        service.get_server_information()
+        time.sleep(0.1)
+        service.get_server_information()
+        stats = self.stats(pool)
+        self.assertEqual((stats['expired'], stats['opened']), (1, 2))
+
+    def test_tcp_nodelay(self):
+        for tcp_nodelay in (True, False):
+            pool = ConnectionPool(tcp_nodelay=tcp_nodelay, prewarm=1)
+            self.new_client(pool)
+            connection = next(iter(pool._pools)).pool.queue[-1]
+            self.assertEqual(bool(connection.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)), tcp_nodelay)
+
+    def test_pickle(self):
+        pool = pickle.loads(pickle.dumps(ConnectionPool(max_connections_per_host=4, idle_timeout=5)))
+        self.new_client(pool).get_server_information()
+        self.assertEqual(pool.idle_timeout, 5)
+        self.assertEqual(self.stats(pool)['max_connections'], 4)
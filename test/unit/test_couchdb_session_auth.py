@@ -16,6 +16,7 @@
 
 import datetime
 import json
+import threading
 import unittest
 
 import requests
@@ -113,12 +114,18 @@ class TestCouchDbSessionAuth(unittest.TestCase):
         self.cookie_value = "bar"
         self.authenticator.token_manager.refresh_time = 0
         self.client.get_session_information()
+        # the session is renewed in the background while requests go on with the current cookie
+        self.assertEqual(responses.calls[-1].request.headers["Cookie"], "AuthSession=foobar")
+        self.authenticator.token_manager.wait_for_refresh()
+        self.client.get_session_information()
         self.assertEqual(responses.calls[-1].request.headers["Cookie"], "AuthSession=bar")
 
         self.assertNotEqual(self.authenticator.token_manager.refresh_time, 0)
         self.cookie_value = "bar2"
         self.authenticator.token_manager.refresh_time = 0
         self.client.get_session_information()
+        self.authenticator.token_manager.wait_for_refresh()
+        self.client.get_session_information()
         self.assertEqual(responses.calls[-1].request.headers["Cookie"], "AuthSession=bar2")
 
     @responses.activate
@@ -162,3 +169,57 @@ class TestCouchDbSessionAuth(unittest.TestCase):
         self.assertEqual(responses.calls[-2].request.method, "POST")
         self.assertEqual(responses.calls[-1].request.url, "http://cloudant2.example/_session")
         self.assertEqual(responses.calls[-1].request.method, "GET")
+
+    @responses.activate
+    def test_expired_cookie_requested_once(self):
+        token_manager = self.authenticator.token_manager
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(token_manager.get_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(responses.calls[0].request.method, "POST")
+
+    @responses.activate
+    def test_refresh_failure_keeps_cookie(self):
+        self.client.get_session_information()
+        token_manager = self.authenticator.token_manager
+        responses.replace(responses.POST, 'http://cloudant.example/_session', status=500, json={"error": "failed"})
+        token_manager.refresh_time = 0
+        with self.assertLogs(level='WARNING'):
+            self.client.get_session_information()
+            token_manager.wait_for_refresh()
+        self.client.get_session_information()
+        self.assertEqual(responses.calls[-1].request.headers["Cookie"], "AuthSession=foobar")
+
+    @responses.activate
+    def test_scheduled_refresh(self):
+        self.client.get_session_information()
+        token_manager = self.authenticator.token_manager
+        self.cookie_value = "bar"
+        token_manager.refresh_time = 0
+        token_manager._schedule_refresh(0.01)
+        for _ in range(100):
+            if any(cookie.value == "bar" for cookie in token_manager.access_token):
+                break
+            time.sleep(0.01)
+        self.assertEqual(sum(call.request.method == "POST" for call in responses.calls), 2)
+
+    @responses.activate
+    def test_jar_updated_on_rotation(self):
+        self.client.get_session_information()
+        updates = []
+        update = self.client.jar.update
+        self.client.jar.update = lambda other: updates.append(other) or update(other)
+        for _ in range(3):
+            self.client.get_session_information()
+        self.assertEqual(updates, [])
+        self.cookie_value = "bar"
+        self.authenticator.token_manager.expire_time = 0
+        self.client.get_session_information()
+        self.client.get_session_information()
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(responses.calls[-1].request.headers["Cookie"], "AuthSession=bar")
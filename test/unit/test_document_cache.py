@@ -0,0 +1,171 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the document_cache module
+"""
+
+import json
+import queue
+import threading
+import time
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import DocumentCache
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+BASE_URL = 'http://cloudant.example'
+DB_URL = BASE_URL + '/db'
+CHANGES_URL = DB_URL + '/_changes'
+DOC_URL = BASE_URL + '/db/doc1'
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting for condition')
+        time.sleep(0.01)
+
+
+class TestDocumentCache(unittest.TestCase):
+    """
+    Test the DocumentCache class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+        self.changes = queue.Queue()
+
+    def changes_feed(self, request):  # pylint: disable=unused-argument
+        try:
+            body = self.changes.get(timeout=0.05)
+        except queue.Empty:
+            body = '\n'
+        return (200, {}, body)
+
+    def push_change(self, seq, doc=None, deleted=None):
+        change = {'seq': seq, 'id': 'doc1', 'changes': [{'rev': seq + '-abc'}]}
+        if doc is not None:
+            change['doc'] = doc
+        if deleted:
+            change['deleted'] = True
+        self.changes.put(json.dumps(change) + '\n')
+
+    def get_count(self):
+        return len([c for c in responses.calls if c.request.url.startswith(DOC_URL)])
+
+    @responses.activate
+    def test_invalidation(self):
+        responses.add(responses.GET, DB_URL, json={'db_name': 'db', 'update_seq': '1'})
+        responses.add_callback(responses.POST, CHANGES_URL, self.changes_feed)
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '1-abc'})
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '2-abc'})
+        with DocumentCache(self.service, 'db', heartbeat=1000) as cache:
+            wait_for(lambda: cache.fresh)
+            self.assertEqual('1-abc', cache.get_document('doc1')['_rev'])
+            self.assertEqual('1-abc', cache.get_document('doc1')['_rev'])
+            self.assertEqual(1, self.get_count())
+            self.push_change('2')
+            wait_for(lambda: cache.invalidations == 1)
+            self.assertEqual('2-abc', cache.get_document('doc1')['_rev'])
+            self.assertEqual('2-abc', cache.get_document('doc1')['_rev'])
+            self.assertEqual(2, self.get_count())
+            self.assertEqual((2, 2), (cache.hits, cache.misses))
+
+    @responses.activate
+    def test_refresh(self):
+        responses.add(responses.GET, DB_URL, json={'db_name': 'db', 'update_seq': '1'})
+        responses.add_callback(responses.POST, CHANGES_URL, self.changes_feed)
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '1-abc'})
+        with DocumentCache(self.service, 'db', heartbeat=1000, refresh=True) as cache:
+            wait_for(lambda: cache.fresh)
+            cache.get_document('doc1')
+            self.push_change('2', doc={'_id': 'doc1', '_rev': '2-abc', 'value': 2})
+            wait_for(lambda: cache.invalidations == 1)
+            self.assertEqual({'_id': 'doc1', '_rev': '2-abc', 'value': 2}, cache.get_document('doc1'))
+            self.push_change('3', deleted=True)
+            wait_for(lambda: cache.invalidations == 2)
+            self.assertEqual(0, len(cache))
+        changes = next(c for c in responses.calls if c.request.url.startswith(CHANGES_URL))
+        self.assertIn(('include_docs', 'true'), [tuple(p.split('=')) for p in
+                                                 changes.request.url.split('?')[1].split('&')])
+
+    @responses.activate
+    def test_outage_before_first_change(self):
+        seqs = []
+        sinces = []
+        outage = threading.Event()
+
+        def changes_feed(request):
+            since = parse_qs(urlparse(request.url).query)['since'][0]
+            sinces.append(since)
+            if outage.is_set():
+                raise requests.exceptions.ConnectionError('reset')
+            time.sleep(0.05)
+            # with since=now only changes made while connected are sent
+            rows = [{'seq': str(seq), 'id': 'doc1', 'changes': [{'rev': '{0}-abc'.format(seq)}]}
+                    for seq in seqs if since != 'now' and seq > int(since)]
+            return (200, {}, ''.join(json.dumps(row) + '\n' for row in rows) or '\n')
+
+        responses.add(responses.GET, DB_URL, json={'db_name': 'db', 'update_seq': '1'})
+        responses.add_callback(responses.POST, CHANGES_URL, changes_feed)
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '1-abc'})
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '2-abc'})
+        with DocumentCache(self.service, 'db', heartbeat=1000) as cache:
+            wait_for(lambda: cache.fresh)
+            self.assertEqual('1-abc', cache.get_document('doc1')['_rev'])
+            outage.set()
+            attempts = len(sinces)
+            wait_for(lambda: len(sinces) > attempts)
+            # the document changes while the feed is disconnected
+            seqs.append(2)
+            outage.clear()
+            wait_for(lambda: cache.invalidations == 1)
+            self.assertEqual('2-abc', cache.get_document('doc1')['_rev'])
+        self.assertNotIn('now', sinces)
+        self.assertEqual('1', sinces[0])
+
+    @responses.activate
+    def test_feed_failure_disables_cache(self):
+        responses.add(responses.GET, DB_URL, json={'db_name': 'db', 'update_seq': '1'})
+        responses.add(responses.POST, CHANGES_URL, status=404, json={'error': 'not_found'})
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1', '_rev': '1-abc'})
+        cache = DocumentCache(self.service, 'db', heartbeat=1000)
+        wait_for(lambda: cache._failed)  # pylint: disable=protected-access
+        cache.get_document('doc1')
+        cache.get_document('doc1')
+        self.assertEqual(2, self.get_count())
+        self.assertFalse(cache.fresh)
+        cache.close()
+
+    @responses.activate
+    def test_not_found(self):
+        responses.add(responses.GET, DB_URL, json={'db_name': 'db', 'update_seq': '1'})
+        responses.add_callback(responses.POST, CHANGES_URL, self.changes_feed)
+        responses.add(responses.GET, DOC_URL, status=404, json={'error': 'not_found', 'reason': 'missing'})
+        with DocumentCache(self.service, 'db', heartbeat=1000) as cache:
+            wait_for(lambda: cache.fresh)
+            with self.assertRaises(ApiException):
+                cache.get_document('doc1')
+            self.assertEqual(0, len(cache))
@@ -0,0 +1,106 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the document_loader module
+"""
+
+import gzip
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import DocumentLoader
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+BULK_GET_URL = 'http://cloudant.example/db/_bulk_get'
+
+
+def bulk_get(request):
+    results = []
+    for query in json.loads(gzip.decompress(request.body))['docs']:
+        if query['id'].startswith('missing'):
+            docs = [{'error': {'id': query['id'], 'rev': 'undefined', 'error': 'not_found', 'reason': 'missing'}}]
+        else:
+            docs = [{'ok': {'_id': query['id'], '_rev': query.get('rev', '1-abc'), 'name': query['id'].upper()}}]
+        results.append({'id': query['id'], 'docs': docs})
+    return 200, {}, json.dumps({'results': results})
+
+
+def requested_docs():
+    return [json.loads(gzip.decompress(call.request.body))['docs'] for call in responses.calls]
+
+
+class TestDocumentLoader(unittest.TestCase):
+    """
+    Test the DocumentLoader class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url('http://cloudant.example')
+
+    @responses.activate
+    def test_coalesces_and_deduplicates(self):
+        responses.add_callback(responses.POST, BULK_GET_URL, callback=bulk_get)
+        with DocumentLoader(self.service, 'db', window=0.2) as loader:
+            first = loader.load('doc1')
+            again = loader.load('doc1')
+            rev = loader.load('doc1', '2-def')
+            other = loader.load('doc2')
+            self.assertIs(first, again)
+            self.assertEqual('doc2', other.result(timeout=5).docs[0].ok.id)
+        self.assertEqual([[{'id': 'doc1'}, {'id': 'doc1', 'rev': '2-def'}, {'id': 'doc2'}]], requested_docs())
+        self.assertEqual('1-abc', first.result().docs[0].ok.rev)
+        self.assertEqual('2-def', rev.result().docs[0].ok.rev)
+
+    @responses.activate
+    def test_max_batch_size(self):
+        responses.add_callback(responses.POST, BULK_GET_URL, callback=bulk_get)
+        with DocumentLoader(self.service, 'db', window=60, max_batch_size=2) as loader:
+            futures = [loader.load('doc{0}'.format(i)) for i in range(3)]
+            futures[0].result(timeout=5)
+        self.assertEqual([2, 1], [len(docs) for docs in requested_docs()])
+        self.assertEqual(['doc0', 'doc1', 'doc2'], [f.result().id for f in futures])
+
+    @responses.activate
+    def test_get_document_from_many_threads(self):
+        responses.add_callback(responses.POST, BULK_GET_URL, callback=bulk_get)
+        with DocumentLoader(self.service, 'db', window=0.05) as loader:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                docs = list(pool.map(lambda i: loader.get_document('doc{0}'.format(i % 4)), range(64)))
+        self.assertEqual(['DOC{0}'.format(i % 4) for i in range(64)], [doc['name'] for doc in docs])
+        self.assertLess(len(responses.calls), 64)
+
+    @responses.activate
+    def test_get_document_missing(self):
+        responses.add_callback(responses.POST, BULK_GET_URL, callback=bulk_get)
+        with DocumentLoader(self.service, 'db', window=0) as loader:
+            with self.assertRaises(ApiException) as ctx:
+                loader.get_document('missing1')
+        self.assertEqual(404, ctx.exception.code)
+        self.assertEqual('missing', ctx.exception.message)
+
+    @responses.activate
+    def test_request_error(self):
+        responses.add(responses.POST, BULK_GET_URL, status=429, json={'error': 'too_many_requests'})
+        with DocumentLoader(self.service, 'db', window=0) as loader:
+            future = loader.load('doc1')
+            self.assertEqual(429, future.exception(timeout=5).code)
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test the SDK against the fake_couchdb server
+"""
+
+import unittest
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ChangesFollower, CouchDbSessionAuthenticator, ResultStream
+from ibmcloudant.cloudant_v1 import BulkDocs, BulkGetQueryDocument, CloudantV1, DesignDocument, \
+    DesignDocumentViewsMapReduce, Document
+
+from fake_couchdb import FakeCouchDB
+
+
+class TestFakeCouchDB(unittest.TestCase):
+    """
+    Test the FakeCouchDB server
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeCouchDB().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(self.server.url)
+        self.db = self.id().rpartition('.')[2]
+        self.service.put_database(db=self.db)
+        docs = [Document(id='doc{0:02d}'.format(i), type='even' if i % 2 == 0 else 'odd', value=i)
+                for i in range(20)]
+        self.service.post_bulk_docs(db=self.db, bulk_docs=BulkDocs(docs=docs))
+
+    def test_documents(self):
+        result = self.service.put_document(db=self.db, doc_id='new', document=Document(value=1)).get_result()
+        doc = self.service.get_document(db=self.db, doc_id='new').get_result()
+        self.assertEqual(result['rev'], doc['_rev'])
+        with self.assertRaises(ApiException) as context:
+            self.service.put_document(db=self.db, doc_id='new', document=Document(value=2))
+        self.assertEqual(409, context.exception.code)
+        self.service.delete_document(db=self.db, doc_id='new', rev=doc['_rev'])
+        with self.assertRaises(ApiException) as context:
+            self.service.get_document(db=self.db, doc_id='new')
+        self.assertEqual(404, context.exception.code)
+        self.assertEqual(20, self.service.get_database_information(db=self.db).get_result()['doc_count'])
+
+    def test_all_docs(self):
+        result = self.service.post_all_docs(db=self.db, startkey='doc05', limit=3, include_docs=True).get_result()
+        self.assertEqual(['doc05', 'doc06', 'doc07'], [row['id'] for row in result['rows']])
+        self.assertEqual(5, result['offset'])
+        self.assertEqual(6, result['rows'][1]['doc']['value'])
+        result = self.service.post_all_docs(db=self.db, descending=True, endkey='doc18').get_result()
+        self.assertEqual(['doc19', 'doc18'], [row['id'] for row in result['rows']])
+
+    def test_bulk_get(self):
+        docs = [BulkGetQueryDocument(id='doc01'), BulkGetQueryDocument(id='missing')]
+        results = self.service.post_bulk_get(db=self.db, docs=docs).get_result()['results']
+        self.assertEqual(1, results[0]['docs'][0]['ok']['value'])
+        self.assertEqual('not_found', results[1]['docs'][0]['error']['error'])
+
+    def test_changes(self):
+        result = self.service.post_changes(db=self.db, limit=5).get_result()
+        self.assertEqual(['doc00', 'doc01', 'doc02', 'doc03', 'doc04'], [row['id'] for row in result['results']])
+        self.assertEqual(15, result['pending'])
+        result = self.service.post_changes(db=self.db, since=result['last_seq'], include_docs=True).get_result()
+        self.assertEqual(15, len(result['results']))
+        self.assertEqual(19, result['results'][-1]['doc']['value'])
+        with ResultStream(self.service.post_changes_as_stream(db=self.db).get_result(), rows_key='results') as stream:
+            self.assertEqual(20, len(list(stream)))
+        response = self.service.post_changes_as_stream(db=self.db, feed='continuous', timeout=0)
+        with ResultStream(response.get_result(), continuous=True) as stream:
+            self.assertEqual(20, len(list(stream)))
+            self.assertEqual(result['last_seq'], stream.last_seq)
+
+    def test_changes_follower(self):
+        follower = ChangesFollower(self.service, self.db, since='0', heartbeat=100, batch_wait=0)
+        changes = iter(follower)
+        self.assertEqual(['doc{0:02d}'.format(i) for i in range(20)], [next(changes).id for _ in range(20)])
+        self.service.put_document(db=self.db, doc_id='followed', document=Document(value=1))
+        self.assertEqual('followed', next(changes).id)
+        follower.stop()
+        follower.join(5)
+
+    def test_view(self):
+        design = DesignDocument(views={'by_type': DesignDocumentViewsMapReduce(
+            map='function (doc) { emit(doc.type, doc.value); }', reduce='_sum')})
+        self.service.put_design_document(db=self.db, ddoc='ddoc', design_document=design)
+        result = self.service.post_view(db=self.db, ddoc='ddoc', view='by_type', group=True).get_result()
+        self.assertEqual([{'key': 'even', 'value': 90}, {'key': 'odd', 'value': 100}], result['rows'])
+        result = self.service.post_view(db=self.db, ddoc='ddoc', view='by_type', reduce=False, key='odd',
+                                        limit=2).get_result()
+        self.assertEqual([('doc01', 1), ('doc03', 3)], [(row['id'], row['value']) for row in result['rows']])
+
+    def test_find(self):
+        result = self.service.post_find(db=self.db, selector={'type': 'odd', 'value': {'$gt': 10}},
+                                        fields=['_id'], sort=[{'value': 'desc'}], limit=3).get_result()
+        self.assertEqual(['doc19', 'doc17', 'doc15'], [doc['_id'] for doc in result['docs']])
+        result = self.service.post_find(db=self.db, selector={'type': 'odd', 'value': {'$gt': 10}},
+                                        bookmark=result['bookmark']).get_result()
+        self.assertEqual(2, len(result['docs']))
+
+    def test_session(self):
+        service = CloudantV1(authenticator=CouchDbSessionAuthenticator('admin', 'password'))
+        service.set_service_url(self.server.url)
+        self.assertEqual('admin', service.get_session_information().get_result()['userCtx']['name'])
+        self.assertEqual(1, self.server.request_counts[('POST', '_session')])
@@ -0,0 +1,64 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test the lazy imports of the ibmcloudant package
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import ibmcloudant
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+
+# Run in a fresh interpreter, the test process has imported everything
+IMPORT_SCRIPT = '''
+import json, sys
+import ibmcloudant
+from ibmcloudant.cloudant_v1 import CloudantV1
+from ibm_cloud_sdk_core.authenticators import NoAuthAuthenticator
+CloudantV1(authenticator=NoAuthAuthenticator())
+loaded = sorted(m for m in sys.modules if m.startswith(('ibmcloudant', 'aiohttp', 'concurrent')))
+ibmcloudant.ChangesFollower
+print(json.dumps({'loaded': loaded,
+                  'follower': 'ibmcloudant.changes_follower' in sys.modules}))
+'''
+
+
+class TestImport(unittest.TestCase):
+    """
+    Test the import of the ibmcloudant package
+    """
+
+    def test_helpers_imported_on_first_access(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT] + sys.path))
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT], env=env)
+        result = json.loads(output.decode('utf-8').splitlines()[-1])
+        for module in ('aiohttp', 'concurrent.futures', 'ibmcloudant.cloudant_v1_async',
+                       'ibmcloudant.changes_follower', 'ibmcloudant.pagination'):
+            self.assertNotIn(module, result['loaded'])
+        self.assertTrue(result['follower'])
+
+    def test_lazy_attributes(self):
+        from ibmcloudant.pagination import ViewPager  # pylint: disable=import-outside-toplevel
+        self.assertIs(ViewPager, ibmcloudant.ViewPager)
+        self.assertIn('AsyncCloudantV1', dir(ibmcloudant))
+        with self.assertRaises(AttributeError):
+            ibmcloudant.NoSuchHelper  # pylint: disable=pointless-statement
@@ -0,0 +1,100 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the json_codec module
+"""
+
+import gzip
+import json
+import unittest
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import JsonCodec, OrjsonCodec, get_fastest_json_codec
+from ibmcloudant.cloudant_v1 import BulkDocs, CloudantV1, Document
+from ibmcloudant.json_codec import orjson
+
+BASE_URL = 'http://cloudant.example'
+DOC_URL = BASE_URL + '/db/doc1'
+
+
+class RecordingCodec(JsonCodec):
+
+    def __init__(self):
+        self.encoded = []
+        self.decoded = []
+
+    def dumps(self, obj):
+        self.encoded.append(obj)
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.decoded.append(data)
+        return super().loads(data)
+
+
+class TestJsonCodec(unittest.TestCase):
+    """
+    Test the JsonCodec classes and their use by the service client
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+
+    @responses.activate
+    def test_default_codec(self):
+        responses.add(responses.PUT, DOC_URL, status=201, json={'ok': True, 'id': 'doc1', 'rev': '1-abc'})
+        document = Document(id='doc1', value=[1, 'ü'])
+        result = self.service.put_document(db='db', doc_id='doc1', document=document).get_result()
+        self.assertEqual(result['rev'], '1-abc')
+        self.assertEqual(gzip.decompress(responses.calls[0].request.body).decode('utf-8'),
+                         json.dumps(document.to_dict()))
+
+    @responses.activate
+    def test_codec_encodes_and_decodes(self):
+        codec = RecordingCodec()
+        self.service.set_json_codec(codec)
+        responses.add(responses.POST, BASE_URL + '/db/_bulk_docs', status=201, json=[{'id': 'doc1', 'rev': '1-abc'}])
+        responses.add(responses.GET, DOC_URL, status=404, json={'error': 'not_found', 'reason': 'missing'})
+        self.service.post_bulk_docs(db='db', bulk_docs=BulkDocs(docs=[Document(id='doc1')]))
+        self.assertEqual(codec.encoded, [{'docs': [{'_id': 'doc1'}]}])
+        self.assertEqual(len(codec.decoded), 1)
+        with self.assertRaises(ApiException) as context:
+            self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(context.exception.message, 'not_found')
+        self.assertEqual(len(codec.decoded), 2)
+
+    def test_model_str_unchanged(self):
+        document = Document(id='doc1', value=1)
+        self.assertEqual(str(document), json.dumps(document.to_dict(), indent=2))
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_codec(self):
+        codec = OrjsonCodec()
+        self.assertIsInstance(get_fastest_json_codec(), OrjsonCodec)
+        self.assertEqual(codec.dumps({'a': [1, 'ü']}), '{"a":[1,"ü"]}'.encode('utf-8'))
+        self.assertEqual(codec.loads(b'{"a":[1,"\\u00fc"]}'), {'a': [1, 'ü']})
+        # values orjson does not support are left to the standard library
+        self.assertEqual(json.loads(codec.dumps({'big': 2 ** 70})), {'big': 2 ** 70})
+        self.assertEqual(codec.dumps({1: 'a'}), '{"1": "a"}')
+        self.assertEqual(codec.dumps_bytes({1: 'a'}), b'{"1": "a"}')
+        self.assertNotEqual(codec.loads('NaN'), codec.loads('NaN'))
+        with self.assertRaises(ValueError):
+            codec.loads(b'{')
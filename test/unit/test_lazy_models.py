@@ -0,0 +1,98 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the lazy_models module
+"""
+
+import unittest
+from unittest import mock
+
+from ibmcloudant import LazyAllDocsResult, LazyFindResult, LazyViewResult
+from ibmcloudant.cloudant_v1 import AllDocsResult, DocsResultRow, Document, FindResult, ViewResult
+from ibmcloudant.lazy_models import LazyModelList
+
+ALL_DOCS = {
+    'total_rows': 3,
+    'update_seq': '3-g1A',
+    'rows': [{'id': 'doc{0}'.format(i), 'key': 'doc{0}'.format(i), 'value': {'rev': '1-abc'}} for i in range(3)],
+}
+VIEW = {'total_rows': 2, 'rows': [{'id': 'doc0', 'key': ['a', 0], 'value': 1}, {'key': None, 'value': 2}]}
+FIND = {
+    'bookmark': 'g1A',
+    'docs': [{'_id': 'doc0', '_rev': '1-abc', 'type': 'order'}],
+    'execution_stats': {'total_keys_examined': 0, 'total_docs_examined': 1, 'total_quorum_docs_examined': 0,
+                        'results_returned': 1, 'execution_time_ms': 1.5},
+    'warning': 'no matching index found',
+}
+
+
+class TestLazyModels(unittest.TestCase):
+
+    def test_same_as_generated_results(self):
+        for (lazy, model, result) in ((LazyAllDocsResult, AllDocsResult, ALL_DOCS),
+                                      (LazyViewResult, ViewResult, VIEW),
+                                      (LazyFindResult, FindResult, FIND)):
+            with self.subTest(model=model.__name__):
+                expected = model.from_dict(result)
+                actual = lazy.from_dict(result)
+                self.assertIsInstance(actual, model)
+                self.assertEqual(actual.to_dict(), expected.to_dict())
+                self.assertEqual(actual, expected)
+                self.assertEqual(expected, actual)
+                self.assertEqual(str(actual), str(expected))
+
+    def test_rows_decoded_on_access(self):
+        with mock.patch.object(DocsResultRow, 'from_dict', wraps=DocsResultRow.from_dict) as from_dict:
+            result = LazyAllDocsResult.from_dict(ALL_DOCS)
+            self.assertEqual(result.total_rows, 3)
+            self.assertEqual(len(result.rows), 3)
+            self.assertEqual(from_dict.call_count, 0)
+            self.assertEqual(result.rows[-1].id, 'doc2')
+            self.assertIs(result.rows[2], result.rows[-1])
+            self.assertEqual(from_dict.call_count, 1)
+            self.assertEqual([row.key for row in result.rows[:2]], ['doc0', 'doc1'])
+            self.assertEqual(from_dict.call_count, 3)
+            self.assertEqual(repr(result.rows), 'LazyModelList(DocsResultRow, 3 items, 3 decoded)')
+
+    def test_modifications(self):
+        result = LazyFindResult.from_dict(FIND)
+        result.docs[0].type = 'invoice'
+        result.docs.append(Document(id='doc1'))
+        result.docs.insert(0, Document(id='first'))
+        self.assertEqual([doc.id for doc in result.docs], ['first', 'doc0', 'doc1'])
+        self.assertEqual(result.to_dict()['docs'][1]['type'], 'invoice')
+        del result.docs[0]
+        result.docs[1:] = [Document(id='last')]
+        self.assertEqual([doc.id for doc in result.docs], ['doc0', 'last'])
+        self.assertEqual(FIND['docs'], [{'_id': 'doc0', '_rev': '1-abc', 'type': 'order'}])
+
+    def test_required_properties(self):
+        with self.assertRaisesRegex(ValueError, "'total_rows' not present in AllDocsResult JSON"):
+            LazyAllDocsResult.from_dict({'rows': []})
+        with self.assertRaisesRegex(ValueError, "'rows' not present in ViewResult JSON"):
+            LazyViewResult.from_dict({'total_rows': 0})
+        with self.assertRaisesRegex(ValueError, "'docs' not present in FindResult JSON"):
+            LazyFindResult.from_dict({'bookmark': 'nil'})
+
+    def test_list_equality(self):
+        rows = LazyModelList([{'_id': 'a'}], Document)
+        self.assertEqual(repr(rows), 'LazyModelList(Document, 1 items, 0 decoded)')
+        self.assertEqual(rows.to_dicts(), [{'_id': 'a'}])
+        self.assertEqual(repr(rows), 'LazyModelList(Document, 1 items, 0 decoded)')
+        self.assertEqual(rows, [Document(id='a')])
+        self.assertNotEqual(rows, [Document(id='b')])
+        self.assertNotEqual(rows, [])
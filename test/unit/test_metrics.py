@@ -0,0 +1,106 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the metrics module
+"""
+
+import random
+import unittest
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import MetricsCollector, ResponseCache
+from ibmcloudant.cloudant_v1 import CloudantV1
+from ibmcloudant.metrics import Histogram
+
+BASE_URL = 'http://cloudant.example'
+DOC_URL = BASE_URL + '/db/doc1'
+DOC = {'_id': 'doc1', '_rev': '1-abc', 'value': 1}
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test the MetricsCollector class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+        self.metrics = MetricsCollector()
+        self.service.set_metrics(self.metrics)
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        values = [random.randint(0, 10 ** 7) for _ in range(10000)]
+        for value in values:
+            histogram.record(value)
+        values.sort()
+        for quantile in (0.5, 0.9, 0.99):
+            expected = values[int(quantile * len(values)) - 1]
+            self.assertAlmostEqual(expected, histogram.quantile(quantile), delta=expected / 32 + 1)
+        self.assertEqual(values[-1], histogram.quantile(1))
+        self.assertLess(len(histogram.counts), 500)
+
+    @responses.activate
+    def test_records_request(self):
+        responses.add(responses.GET, DOC_URL, json=DOC,
+                      headers={'X-Couch-Request-ID': 'abc123', 'X-CouchDB-Body-Time': '5'})
+        records = []
+        self.metrics.listeners.append(records.append)
+        self.service.get_document(db='db', doc_id='doc1')
+        record = records[0]
+        self.assertEqual(('get_document', 'GET', 200, 0, 'abc123', 0.005),
+                         (record.operation_id, record.method, record.status_code, record.request_bytes,
+                          record.request_id, record.body_time))
+        self.assertGreater(record.response_bytes, 0)
+        self.assertLessEqual(record.time_to_first_byte, record.latency)
+        snapshot = self.metrics.snapshot()['get_document']
+        self.assertEqual({200: 1}, snapshot['statuses'])
+        self.assertEqual(1, snapshot['latency_seconds']['count'])
+
+    @responses.activate
+    def test_records_errors(self):
+        responses.add(responses.PUT, DOC_URL, status=409, json={'error': 'conflict'})
+        with self.assertRaises(ApiException):
+            self.service.put_document(db='db', doc_id='doc1', document=DOC)
+        snapshot = self.metrics.snapshot()['put_document']
+        self.assertEqual({409: 1}, snapshot['statuses'])
+        self.assertEqual(1, snapshot['request_bytes']['count'])
+        self.assertGreater(snapshot['request_bytes']['max'], 0)
+
+    @responses.activate
+    def test_records_status_before_cache_replay(self):
+        self.service.set_response_cache(ResponseCache())
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        responses.add(responses.GET, DOC_URL, status=304, headers={'ETag': '"1-abc"'})
+        self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(DOC, self.service.get_document(db='db', doc_id='doc1').get_result())
+        self.assertEqual({200: 1, 304: 1}, self.metrics.snapshot()['get_document']['statuses'])
+
+    @responses.activate
+    def test_prometheus(self):
+        responses.add(responses.GET, DOC_URL, json=DOC)
+        self.service.get_document(db='db', doc_id='doc1')
+        text = self.metrics.to_prometheus()
+        self.assertIn('cloudant_requests_total{operation_id="get_document",status="200"} 1\n', text)
+        self.assertIn('# TYPE cloudant_request_latency_seconds summary\n', text)
+        self.assertIn('cloudant_request_latency_seconds{operation_id="get_document",quantile="0.99"} ', text)
+        self.assertIn('cloudant_request_latency_seconds_count{operation_id="get_document"} 1\n', text)
+        self.metrics.reset()
+        self.assertEqual({}, self.metrics.snapshot())
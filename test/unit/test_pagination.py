@@ -0,0 +1,115 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the pagination module
+"""
+
+import gzip
+import json
+import unittest
+
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import AllDocsPager, FindPager, SearchPager, ViewPager
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+BASE_URL = 'http://cloudant.example'
+
+# view rows sorted by key then ID, with keys shared by several documents
+VIEW_ROWS = [{'id': 'doc{0:02d}'.format(i), 'key': i // 3, 'value': {'rev': '1-abc'}} for i in range(10)]
+ALL_DOCS_ROWS = [{'id': 'doc{0:02d}'.format(i), 'key': 'doc{0:02d}'.format(i), 'value': {'rev': '1-abc'}}
+                 for i in range(10)]
+
+
+def request_body(call):
+    return json.loads(gzip.decompress(call.request.body))
+
+
+def key_callback(all_rows):
+    def callback(request):
+        body = json.loads(gzip.decompress(request.body))
+        rows = all_rows
+        if 'startkey' in body:
+            start = (body['startkey'], body.get('startkey_docid', ''))
+            rows = [row for row in rows if (row['key'], row['id']) >= start]
+        return (200, {}, json.dumps({'total_rows': len(all_rows), 'offset': 0, 'rows': rows[:body['limit']]}))
+    return callback
+
+
+def bookmark_callback(rows_key, total):
+    def callback(request):
+        body = json.loads(gzip.decompress(request.body))
+        start = int(body.get('bookmark', '0'))
+        rows = [{'_id': 'doc{0}'.format(i), 'id': 'doc{0}'.format(i), 'order': [i], 'fields': {}}
+                for i in range(start, min(start + body['limit'], total))]
+        return (200, {}, json.dumps({rows_key: rows, 'bookmark': str(start + len(rows)), 'total_rows': total}))
+    return callback
+
+
+class TestPagination(unittest.TestCase):
+    """
+    Test the pager classes
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+
+    def test_reserved_params(self):
+        with self.assertRaises(ValueError):
+            AllDocsPager(self.service, 'db', skip=10)
+        with self.assertRaises(ValueError):
+            FindPager(self.service, 'db', {}, bookmark='x')
+        with self.assertRaises(ValueError):
+            SearchPager(self.service, 'db', 'ddoc', 'index', 'q:*', page_size=201)
+
+    @responses.activate
+    def test_view_pager(self):
+        responses.add_callback(responses.POST, BASE_URL + '/db/_design/ddoc/_view/view', key_callback(VIEW_ROWS))
+        for prefetch in (True, False):
+            pages = list(ViewPager(self.service, 'db', 'ddoc', 'view', page_size=4, prefetch=prefetch))
+            self.assertEqual([4, 4, 2], [len(page) for page in pages])
+            self.assertEqual([row['id'] for row in VIEW_ROWS], [row.id for page in pages for row in page])
+        bodies = [request_body(call) for call in responses.calls[:3]]
+        self.assertEqual([5, 5, 5], [body['limit'] for body in bodies])
+        self.assertEqual((1, 'doc04'), (bodies[1]['startkey'], bodies[1]['startkey_docid']))
+        self.assertNotIn('skip', bodies[2])
+
+    @responses.activate
+    def test_all_docs_pager_exact_pages(self):
+        responses.add_callback(responses.POST, BASE_URL + '/db/_all_docs', key_callback(ALL_DOCS_ROWS))
+        rows = list(AllDocsPager(self.service, 'db', page_size=5).rows())
+        self.assertEqual(10, len(rows))
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_find_pager(self):
+        responses.add_callback(responses.POST, BASE_URL + '/db/_find', bookmark_callback('docs', 7))
+        pages = list(FindPager(self.service, 'db', {'type': 'a'}, page_size=3))
+        self.assertEqual([['doc0', 'doc1', 'doc2'], ['doc3', 'doc4', 'doc5'], ['doc6']],
+                         [[doc.id for doc in page] for page in pages])
+        self.assertEqual(['3', '6'], [request_body(call)['bookmark'] for call in responses.calls[1:]])
+        self.assertEqual({'type': 'a'}, request_body(responses.calls[2])['selector'])
+
+    @responses.activate
+    def test_search_pager(self):
+        url = BASE_URL + '/db/_design/ddoc/_search/index'
+        responses.add_callback(responses.POST, url, bookmark_callback('rows', 4))
+        rows = list(SearchPager(self.service, 'db', 'ddoc', 'index', 'q:*', page_size=2).rows())
+        self.assertEqual(['doc0', 'doc1', 'doc2', 'doc3'], [row.id for row in rows])
+        self.assertEqual(3, len(responses.calls))
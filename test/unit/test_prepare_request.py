@@ -0,0 +1,110 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the prepare_request_base_service_patch module
+"""
+
+import gzip
+import io
+import unittest
+
+from ibm_cloud_sdk_core import BaseService
+from ibm_cloud_sdk_core.authenticators import BasicAuthenticator
+
+from ibmcloudant.cloudant_v1 import CloudantV1
+from ibmcloudant.prepare_request_base_service_patch import STREAMED_GZIP_SIZE
+from ibmcloudant.streamed_body import StreamedBody
+
+BASE_URL = 'http://cloudant.example'
+
+
+class TestPrepareRequest(unittest.TestCase):
+    """
+    Test the CloudantV1.prepare_request patch
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=BasicAuthenticator('user', 'pass'))
+        self.service.set_service_url(BASE_URL + '/')
+
+    def assert_same_request(self, method, url, **kwargs):
+        expected = BaseService.prepare_request(self.service, method, url, **kwargs)
+        actual = self.service.prepare_request(method, url, **kwargs)
+        self.assertEqual(expected, actual)
+        self.assertEqual(dict(expected['headers']), dict(actual['headers']))
+        return actual
+
+    def test_same_as_sdk_core(self):
+        headers = {'If-None-Match': None, 'Accept': 'application/json', 'X-Flag': True}
+        params = {'conflicts': True, 'revs': False, 'rev': None, 'limit': 10}
+        request = self.assert_same_request('GET', '/db/doc', headers=headers, params=params)
+        self.assertEqual({'conflicts': 'true', 'revs': 'false', 'limit': 10}, request['params'])
+        self.assertIn('authorization', request['headers'])
+        self.assert_same_request('GET', '/', params=None)
+
+    def test_body_and_default_headers(self):
+        # the compression level of sdk core
+        self.service.set_gzip_compression_level(9)
+        self.service.set_default_headers({'X-Default': 'yes', 'user-agent': 'custom'})
+        request = self.assert_same_request('POST', '/db', headers={'Content-Type': 'application/json'},
+                                           data='{"_id": "é"}')
+        self.assertEqual('gzip', request['headers']['Content-Encoding'])
+        self.assertEqual('custom', request['headers']['User-Agent'])
+        self.service.set_enable_gzip_compression(False)
+        request = self.assert_same_request('PUT', '/db/doc/att', data=b'\x00\x01')
+        self.assertEqual(b'\x00\x01', request['data'])
+
+    def test_file_bodies(self):
+        self.service.set_enable_gzip_compression(False)
+        request = self.service.prepare_request('PUT', '/db/doc/att', data=io.BytesIO(b'123'))
+        self.assertEqual(b'123', request['data'].read())
+
+    def test_gzip_threshold_and_level(self):
+        self.service.set_gzip_compression_threshold(100)
+        request = self.service.prepare_request('POST', '/db', data='{"_id": "small"}')
+        self.assertEqual(b'{"_id": "small"}', request['data'])
+        self.assertNotIn('Content-Encoding', request['headers'])
+        data = b'{"value": "' + b'abcdefgh' * 1000 + b'"}'
+        sizes = []
+        for level in (1, 9):
+            self.service.set_gzip_compression_level(level)
+            request = self.service.prepare_request('POST', '/db', data=data)
+            self.assertEqual('gzip', request['headers']['Content-Encoding'])
+            self.assertEqual(data, gzip.decompress(request['data']))
+            sizes.append(len(request['data']))
+        self.assertGreaterEqual(sizes[0], sizes[1])
+        for level in (0, 10):
+            with self.assertRaises(ValueError):
+                self.service.set_gzip_compression_level(level)
+        self.assertEqual(9, self.service.gzip_compression_level)
+
+    def test_large_and_file_bodies_compressed_while_sent(self):
+        data = bytes(range(256)) * (STREAMED_GZIP_SIZE // 256)
+        for body in (data, io.BytesIO(data)):
+            request = self.service.prepare_request('PUT', '/db/doc/att', data=body)
+            self.assertEqual('gzip', request['headers']['Content-Encoding'])
+            self.assertIsInstance(request['data'], StreamedBody)
+            self.assertTrue(request['data'].replayable)
+            for _ in range(2):
+                self.assertEqual(data, gzip.decompress(b''.join(request['data'])))
+        self.service.set_gzip_compression_threshold(len(data) + 1)
+        request = self.service.prepare_request('PUT', '/db/doc/att', data=io.BytesIO(data))
+        self.assertEqual(data, request['data'].read())
+
+    def test_encode_path_vars(self):
+        self.assertEqual(list(BaseService.encode_path_vars('db', 'a/b c', 'é')),
+                         list(self.service.encode_path_vars('db', 'a/b c', 'é')))
@@ -0,0 +1,93 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the rate_limiter module
+"""
+
+import time
+import unittest
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import RateLimiter
+from ibmcloudant.cloudant_v1 import CloudantV1
+from ibmcloudant.rate_limiter import GLOBAL_QUERY, READ, WRITE, TokenBucket, classify
+
+BASE_URL = 'http://cloudant.example'
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Test the RateLimiter and TokenBucket classes
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+
+    def test_classify(self):
+        self.assertEqual(READ, classify('get_document'))
+        self.assertEqual(READ, classify('post_all_docs_as_stream'))
+        self.assertEqual(READ, classify('post_partition_view'))
+        self.assertEqual(WRITE, classify('post_bulk_docs'))
+        self.assertEqual(GLOBAL_QUERY, classify('post_find_as_stream'))
+        self.assertEqual(GLOBAL_QUERY, classify('post_view_queries'))
+        self.assertIsNone(classify('get_server_information'))
+        self.assertIsNone(classify(None))
+
+    def test_bucket_paces_requests(self):
+        bucket = TokenBucket(50, burst=0.1)
+        start = time.monotonic()
+        for _ in range(15):
+            bucket.acquire()
+        # 5 tokens of burst, then 10 tokens at 50 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_bucket_throttle(self):
+        bucket = TokenBucket(100, decrease=0.5, recovery=1.0, cooldown=10)
+        bucket.throttle()
+        bucket.throttle()
+        self.assertEqual(2, bucket.throttled)
+        self.assertLessEqual(bucket.rate, 50.5)
+        time.sleep(0.1)
+        bucket.acquire()
+        self.assertGreater(bucket.rate, 55)
+        self.assertLessEqual(bucket.rate, 100)
+
+    @responses.activate
+    def test_from_capacity(self):
+        responses.add(responses.GET, BASE_URL + '/_api/v2/user/capacity/throughput',
+                      json={'current': {'throughput': {'blocks': 2, 'read': 200, 'write': 100, 'query': 10}},
+                            'target': {'throughput': {'blocks': 2, 'read': 200, 'write': 100, 'query': 10}}})
+        limiter = RateLimiter.from_capacity(self.service, utilization=0.5)
+        self.assertEqual({READ: 100, WRITE: 50, GLOBAL_QUERY: 5},
+                         {name: bucket.ceiling for (name, bucket) in limiter.buckets.items()})
+
+    @responses.activate
+    def test_throttled_requests_reduce_rate(self):
+        responses.add(responses.POST, BASE_URL + '/db/_find', status=429, json={'error': 'too_many_requests'})
+        responses.add(responses.GET, BASE_URL + '/db/doc1', json={'_id': 'doc1'})
+        limiter = RateLimiter(read=1000, query=10)
+        self.service.set_rate_limiter(limiter)
+        with self.assertRaises(ApiException):
+            self.service.post_find(db='db', selector={})
+        self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(1, limiter.buckets[GLOBAL_QUERY].throttled)
+        self.assertLess(limiter.buckets[GLOBAL_QUERY].rate, 10)
+        self.assertEqual(0, limiter.buckets[READ].throttled)
@@ -0,0 +1,140 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the response_cache module
+"""
+
+import unittest
+
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ConnectionPool, ResponseCache, RetryPolicy
+from ibmcloudant.cloudant_v1 import CloudantV1, Document
+from ibmcloudant.response_cache import CachedResponse
+
+from fake_couchdb import FakeCouchDB
+
+BASE_URL = 'http://cloudant.example'
+DOC_URL = BASE_URL + '/db/doc1'
+DOC = {'_id': 'doc1', '_rev': '1-abc', 'value': 1}
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test the ResponseCache class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+        self.cache = ResponseCache(max_entries=2)
+        self.service.set_response_cache(self.cache)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, max_bytes=10)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, CachedResponse('"1"', {}, b'123'))
+        self.assertIsNone(cache.get('a'))
+        cache.get('b')
+        cache.put('d', CachedResponse('"1"', {}, b'1234567'))
+        self.assertEqual(['b', 'd'], [key for key in ('b', 'c', 'd') if cache.get(key)])
+        cache.put('e', CachedResponse('"1"', {}, b'12345678901'))
+        self.assertIsNone(cache.get('e'))
+
+    @responses.activate
+    def test_not_modified(self):
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        responses.add(responses.GET, DOC_URL, status=304, headers={'ETag': '"1-abc"'})
+        first = self.service.get_document(db='db', doc_id='doc1')
+        second = self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(DOC, first.get_result())
+        self.assertEqual(DOC, second.get_result())
+        self.assertEqual(200, second.get_status_code())
+        self.assertNotIn('If-None-Match', responses.calls[0].request.headers)
+        self.assertEqual('"1-abc"', responses.calls[1].request.headers['If-None-Match'])
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    @responses.activate
+    def test_modified(self):
+        updated = dict(DOC, _rev='2-def')
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        responses.add(responses.GET, DOC_URL, json=updated, headers={'ETag': '"2-def"'})
+        responses.add(responses.GET, DOC_URL, status=304)
+        self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(updated, self.service.get_document(db='db', doc_id='doc1').get_result())
+        self.assertEqual(updated, self.service.get_document(db='db', doc_id='doc1').get_result())
+        self.assertEqual('"2-def"', responses.calls[2].request.headers['If-None-Match'])
+
+    @responses.activate
+    def test_keyed_on_query(self):
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        self.service.get_document(db='db', doc_id='doc1')
+        self.service.get_document(db='db', doc_id='doc1', revs=True)
+        self.assertNotIn('If-None-Match', responses.calls[1].request.headers)
+
+    @responses.activate
+    def test_not_found_discards(self):
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        responses.add(responses.GET, DOC_URL, status=404, json={'error': 'not_found', 'reason': 'deleted'})
+        self.service.get_document(db='db', doc_id='doc1')
+        with self.assertRaises(ApiException):
+            self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(0, len(self.cache))
+
+    @responses.activate
+    def test_retried_read(self):
+        self.service.set_retry_policy(RetryPolicy(base_delay=0.001))
+        responses.add(responses.GET, DOC_URL, json=DOC, headers={'ETag': '"1-abc"'})
+        responses.add(responses.GET, DOC_URL, status=503, json={'error': 'service_unavailable'})
+        responses.add(responses.GET, DOC_URL, status=304, headers={'ETag': '"1-abc"'})
+        self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(DOC, self.service.get_document(db='db', doc_id='doc1').get_result())
+        self.assertEqual(['"1-abc"', '"1-abc"'],
+                         [call.request.headers.get('If-None-Match') for call in responses.calls[1:]])
+        self.assertEqual(1, self.cache.hits)
+
+    @responses.activate
+    def test_other_operations_not_cached(self):
+        responses.add(responses.GET, BASE_URL + '/db', json={'db_name': 'db'}, headers={'ETag': '"1"'})
+        self.service.get_database_information(db='db')
+        self.assertEqual(0, len(self.cache))
+
+
+class TestResponseCacheConnections(unittest.TestCase):
+    """
+    Test the connections of cached reads against the FakeCouchDB server
+    """
+
+    def test_connection_reused_after_not_modified(self):
+        with FakeCouchDB() as server:
+            service = CloudantV1(authenticator=NoAuthAuthenticator())
+            service.set_service_url(server.url)
+            service.set_response_cache(ResponseCache())
+            pool = ConnectionPool(max_connections_per_host=1)
+            service.set_connection_pool(pool)
+            service.put_database(db='db')
+            service.put_document(db='db', doc_id='doc1', document=Document(value=1))
+            for _ in range(20):
+                result = service.get_document(db='db', doc_id='doc1').get_result()
+                self.assertEqual(result['value'], 1)
+            stats = pool.snapshot()[server.url]
+            pool.close()
+        self.assertEqual(server.request_counts[('GET', 'doc')], 20)
+        self.assertEqual(service.response_cache.hits, 19)
+        self.assertEqual(stats['opened'], 1)
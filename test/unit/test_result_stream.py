@@ -0,0 +1,136 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the result_stream module
+"""
+
+import io
+import json
+import unittest
+
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import ResultStream
+from ibmcloudant.cloudant_v1 import CloudantV1, ChangesResultItem, DocsResultRow, Document
+
+ALL_DOCS_RESULT = {
+    'total_rows': 3,
+    'offset': 0,
+    'rows': [
+        {'id': 'a"\\x', 'key': 'a"\\x', 'value': {'rev': '1-a'}},
+        {'id': 'b', 'key': 'b', 'value': {'rev': '1-b'}, 'doc': {'_id': 'b', '_rev': '1-b', 'name': 'é☃ ]}'}},
+        {'id': 'c', 'key': 'c', 'value': {'rev': '1-c'}},
+    ],
+    'update_seq': '3-g1AAAA',
+}
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestResultStream(unittest.TestCase):
+    """
+    Test the ResultStream class
+    """
+
+    def test_rows_across_chunk_boundaries(self):
+        body = json.dumps(ALL_DOCS_RESULT, ensure_ascii=False).encode('utf-8')
+        for size in (1, 2, 3, 17, len(body)):
+            stream = ResultStream(chunked(body, size), DocsResultRow)
+            rows = list(stream)
+            self.assertEqual([DocsResultRow.from_dict(x) for x in ALL_DOCS_RESULT['rows']], rows)
+            self.assertEqual(3, stream.total_rows)
+            self.assertEqual('3-g1AAAA', stream.update_seq)
+            self.assertEqual({'total_rows': 3, 'offset': 0, 'update_seq': '3-g1AAAA'}, stream.metadata)
+
+    def test_leading_metadata_available_during_iteration(self):
+        stream = ResultStream(chunked(json.dumps(ALL_DOCS_RESULT).encode('utf-8'), 16))
+        next(stream)
+        self.assertEqual(3, stream.total_rows)
+        self.assertIsNone(stream.update_seq)
+
+    def test_find_docs(self):
+        body = json.dumps({'docs': [{'_id': 'a', 'x': 1}, {'_id': 'b', 'x': [2]}],
+                           'bookmark': 'g1AAAA', 'warning': 'no matching index'}).encode('utf-8')
+        stream = ResultStream(io.BytesIO(body), Document, rows_key='docs', chunk_size=5)
+        self.assertEqual(['a', 'b'], [doc.id for doc in stream])
+        self.assertEqual('g1AAAA', stream.bookmark)
+
+    def test_empty_rows(self):
+        stream = ResultStream([b'{"total_rows":0,"offset":0,"rows":[\r\n\r\n]}\n'])
+        self.assertEqual([], list(stream))
+        self.assertEqual(0, stream.total_rows)
+
+    def test_continuous_changes(self):
+        body = (b'{"seq":"1-a","id":"a","changes":[{"rev":"1-a"}]}\n'
+                b'\n\n'
+                b'{"seq":"2-b","id":"b","changes":[{"rev":"2-b"}],"deleted":true}\n'
+                b'{"last_seq":"2-b","pending":0}\n')
+        for size in (1, 4, len(body)):
+            stream = ResultStream(chunked(body, size), ChangesResultItem, continuous=True)
+            items = list(stream)
+            self.assertEqual(['a', 'b'], [item.id for item in items])
+            self.assertTrue(items[1].deleted)
+            self.assertEqual('2-b', stream.last_seq)
+            self.assertEqual(0, stream.pending)
+
+    def test_null_rows_and_metadata(self):
+        bodies = [
+            b'{"total_rows":2,"offset":null,"rows":[{"id":"a"},null]}',
+            b'{"rows":[null,{"id":"a"}],"total_rows":2,"offset":null}',
+            b'{"total_rows":2,"rows":[{"id":"a"}, null ],"offset":null,"update_seq":null}',
+        ]
+        for body in bodies:
+            result = json.loads(body)
+            for size in (1, 2, 3, 5, len(body)):
+                with self.subTest(body=body, size=size):
+                    stream = ResultStream(chunked(body, size))
+                    self.assertEqual(result['rows'], list(stream))
+                    del result['rows']
+                    self.assertEqual(result, stream.metadata)
+                    result = json.loads(body)
+
+    def test_null_split_across_chunks(self):
+        stream = ResultStream([b'{"offset":nu', b'll,"rows":[n', b'ull]', b'}'])
+        self.assertEqual([None], list(stream))
+        self.assertEqual({'offset': None}, stream.metadata)
+
+    def test_truncated_body(self):
+        body = json.dumps(ALL_DOCS_RESULT).encode('utf-8')
+        stream = ResultStream([body[:-10]])
+        with self.assertRaises(ValueError):
+            list(stream)
+
+    def test_invalid_body(self):
+        with self.assertRaises(ValueError):
+            list(ResultStream([b'{"rows": [{"id": "a"} {"id": "b"}]}']))
+
+    @responses.activate
+    def test_post_all_docs_as_stream(self):
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url('http://cloudant.example')
+        responses.add(responses.POST,
+                      'http://cloudant.example/db/_all_docs',
+                      body=json.dumps(ALL_DOCS_RESULT),
+                      content_type='application/json',
+                      status=200)
+        response = service.post_all_docs_as_stream(db='db')
+        with ResultStream(response, DocsResultRow, chunk_size=7) as stream:
+            self.assertEqual(['a"\\x', 'b', 'c'], [row.id for row in stream])
+        self.assertEqual(3, stream.total_rows)
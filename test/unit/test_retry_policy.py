@@ -0,0 +1,119 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the retry_policy module
+"""
+
+import email.utils
+import time
+import unittest
+
+import requests
+import responses
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import RetryPolicy
+from ibmcloudant.cloudant_v1 import BulkDocs, CloudantV1, Document
+
+BASE_URL = 'http://cloudant.example'
+DOC_URL = BASE_URL + '/db/doc1'
+BULK_DOCS_URL = BASE_URL + '/db/_bulk_docs'
+
+
+def api_exception(code, headers=None):
+    response = requests.Response()
+    response.status_code = code
+    response.headers.update(headers or {})
+    response._content = b'{"error": "error"}'  # pylint: disable=protected-access
+    return ApiException(code, http_response=response)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Test the RetryPolicy class
+    """
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(BASE_URL)
+        self.policy = RetryPolicy(base_delay=0.01)
+        self.service.set_retry_policy(self.policy)
+
+    def test_is_retryable(self):
+        self.assertTrue(self.policy.is_retryable('POST', 'post_bulk_docs', api_exception(429)))
+        self.assertFalse(self.policy.is_retryable('POST', 'post_bulk_docs', api_exception(503)))
+        self.assertTrue(self.policy.is_retryable('POST', 'post_view', api_exception(503)))
+        self.assertTrue(self.policy.is_retryable('GET', 'get_document', requests.exceptions.ConnectionError()))
+        self.assertFalse(self.policy.is_retryable('GET', 'get_document', api_exception(404)))
+        self.assertFalse(self.policy.is_retryable('GET', 'get_document', ValueError()))
+
+    def test_delay(self):
+        self.assertEqual(2.0, self.policy.delay(1, api_exception(429, {'Retry-After': '2'})))
+        date = email.utils.formatdate(time.time() + 10, usegmt=True)
+        self.assertAlmostEqual(10, self.policy.delay(1, api_exception(429, {'Retry-After': date})), delta=1.5)
+        self.assertEqual(30.0, self.policy.delay(1, api_exception(429, {'Retry-After': '3600'})))
+        for retry in range(1, 5):
+            self.assertTrue(0 <= self.policy.delay(retry, api_exception(503)) <= 0.01 * 2 ** (retry - 1))
+
+    def test_retry_state(self):
+        headers = {'X-IBMCloud-SDK-Analytics': 'service_name=cloudant;service_version=V1;operation_id=get_document'}
+        self.assertIsNone(self.policy.start({'method': 'PUT', 'headers': headers, 'data': iter([b'{}'])}))
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, attempt_timeout=5.0, budget=1.0)
+        state = policy.start({'method': 'GET', 'headers': headers, 'data': None})
+        self.assertTrue(0.9 < state.attempt_timeout() <= 1.0)
+        self.assertIsNone(state.retry_delay(api_exception(404)))
+        self.assertIsNotNone(state.retry_delay(api_exception(503)))
+        self.assertIsNone(state.retry_delay(api_exception(503)))
+        self.assertEqual({'get_document': 1}, policy.retries)
+        state = policy.start({'method': 'GET', 'headers': headers, 'data': None})
+        self.assertIsNone(state.retry_delay(api_exception(429, {'Retry-After': '2'})))
+
+    @responses.activate
+    def test_retries_get(self):
+        responses.add(responses.GET, DOC_URL, status=503, json={'error': 'unavailable'})
+        responses.add(responses.GET, DOC_URL, body=requests.exceptions.ConnectionError('reset'))
+        responses.add(responses.GET, DOC_URL, json={'_id': 'doc1'})
+        self.assertEqual({'_id': 'doc1'}, self.service.get_document(db='db', doc_id='doc1').get_result())
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual({'get_document': 2}, self.policy.retries)
+
+    @responses.activate
+    def test_retries_writes_on_429_only(self):
+        responses.add(responses.POST, BULK_DOCS_URL, status=429, json={'error': 'too_many_requests'},
+                      headers={'Retry-After': '0'})
+        responses.add(responses.POST, BULK_DOCS_URL, status=503, json={'error': 'unavailable'})
+        with self.assertRaises(ApiException) as ctx:
+            self.service.post_bulk_docs(db='db', bulk_docs=BulkDocs(docs=[Document(id='doc1')]))
+        self.assertEqual(503, ctx.exception.code)
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(responses.calls[0].request.body, responses.calls[1].request.body)
+
+    @responses.activate
+    def test_max_retries_and_budget(self):
+        responses.add(responses.GET, DOC_URL, status=429, json={'error': 'too_many_requests'})
+        with self.assertRaises(ApiException):
+            self.service.get_document(db='db', doc_id='doc1')
+        self.assertEqual(5, len(responses.calls))
+        self.service.set_retry_policy(RetryPolicy(budget=1.0))
+        responses.replace(responses.GET, DOC_URL, status=429, json={'error': 'too_many_requests'},
+                          headers={'Retry-After': '5'})
+        start = time.monotonic()
+        with self.assertRaises(ApiException):
+            self.service.get_document(db='db', doc_id='doc1')
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(6, len(responses.calls))
@@ -0,0 +1,135 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test sharing session cookies with the session_token_store module
+"""
+
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+from ibm_cloud_sdk_core import get_authenticator_from_environment
+
+from ibmcloudant import (CouchDbSessionAuthenticator, FileSessionTokenStore, MemorySessionTokenStore,
+                         SessionTokenStore)
+from ibmcloudant.cloudant_v1 import CloudantV1
+
+from fake_couchdb import FakeCouchDB
+
+WORKER_SCRIPT = '''
+import sys
+from ibmcloudant import CouchDbSessionAuthenticator, FileSessionTokenStore
+from ibmcloudant.cloudant_v1 import CloudantV1
+service = CloudantV1(CouchDbSessionAuthenticator('adm', 'pass', token_store=FileSessionTokenStore(sys.argv[2])))
+service.set_service_url(sys.argv[1])
+print(service.get_session_information().get_result()['userCtx']['name'])
+'''
+
+
+class TestSessionTokenStore(unittest.TestCase):
+    """
+    Test session authenticators sharing a session through a token store
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeCouchDB().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.server.request_counts.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'session.json')
+
+    def new_client(self, token_store):
+        service = CloudantV1(CouchDbSessionAuthenticator('adm', 'pass', token_store=token_store))
+        service.set_service_url(self.server.url)
+        return service
+
+    def user_name(self, service):
+        return service.get_session_information().get_result()['userCtx']['name']
+
+    def test_incomplete_store(self):
+        class LoadOnlyStore(SessionTokenStore):  # pylint: disable=abstract-method
+            def load(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            LoadOnlyStore()  # pylint: disable=abstract-class-instantiated
+
+    def test_memory_store(self):
+        store = MemorySessionTokenStore()
+        clients = [self.new_client(store) for _ in range(3)]
+        self.assertEqual([self.user_name(client) for client in clients], ['adm'] * 3)
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 1)
+
+    def test_file_store(self):
+        first = self.new_client(FileSessionTokenStore(self.path))
+        self.assertEqual(self.user_name(first), 'adm')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        second = self.new_client(FileSessionTokenStore(self.path))
+        self.assertEqual(self.user_name(second), 'adm')
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 1)
+
+    def test_renewal_shared(self):
+        store = FileSessionTokenStore(self.path)
+        (first, second) = (self.new_client(store), self.new_client(store))
+        self.user_name(first)
+        self.user_name(second)
+        for client in (first, second):
+            client.authenticator.token_manager.expire_time = 0
+        self.assertEqual(self.user_name(first), 'adm')
+        self.assertEqual(self.user_name(second), 'adm')
+        # the expired clients reuse the stored session, not yet due for renewal
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 1)
+        key = 'adm@' + self.server.url
+        token = store.load(key)
+        token['refresh_time'] = 0
+        store.save(key, token)
+        first.authenticator.token_manager.expire_time = 0
+        self.user_name(first)
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 2)
+
+    def test_damaged_file(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write('{')
+        self.assertEqual(self.user_name(self.new_client(FileSessionTokenStore(self.path))), 'adm')
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 1)
+
+    def test_processes(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        workers = [subprocess.Popen([sys.executable, '-c', WORKER_SCRIPT, self.server.url, self.path],
+                                    stdout=subprocess.PIPE, env=env) for _ in range(4)]
+        outputs = [worker.communicate(timeout=60)[0] for worker in workers]
+        self.assertEqual([output.strip() for output in outputs], [b'adm'] * 4)
+        self.assertEqual(self.server.request_counts[('POST', '_session')], 1)
+
+    def test_external_config(self):
+        env = {'TEST_AUTH_TYPE': 'COUCHDB_SESSION', 'TEST_USERNAME': 'adm', 'TEST_PASSWORD': 'pass',
+               'TEST_SESSION_TOKEN_FILE': self.path}
+        with unittest.mock.patch.dict(os.environ, env):
+            authenticator = get_authenticator_from_environment('test')
+        self.assertIsInstance(authenticator.token_manager.token_store, FileSessionTokenStore)
+        self.assertEqual(authenticator.token_manager.token_store.path, self.path)
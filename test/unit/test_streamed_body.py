@@ -0,0 +1,157 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Test methods in the streamed_body module and streamed post_bulk_docs
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import unittest
+
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from ibmcloudant import AsyncCloudantV1, MetricsCollector, RetryPolicy
+from ibmcloudant.cloudant_v1 import BulkDocs, CloudantV1, Document
+from ibmcloudant.json_codec import JsonCodec
+from ibmcloudant.streamed_body import CHUNK_SIZE, StreamedBody, bulk_docs_body
+
+from fake_couchdb import FakeCouchDB
+
+BASE_URL = 'http://cloudant.example'
+
+
+def generate_docs(count, size=10):
+    for i in range(count):
+        yield Document(id='doc{0:05d}'.format(i), data='x' * size)
+
+
+class TestStreamedBody(unittest.TestCase):
+    """
+    Test the StreamedBody class and bulk_docs_body
+    """
+
+    def test_bulk_docs_body(self):
+        body = bulk_docs_body(generate_docs(3), JsonCodec(), new_edits=False)
+        self.assertEqual(json.loads(b''.join(body)), {
+            'docs': [{'_id': 'doc{0:05d}'.format(i), 'data': 'x' * 10} for i in range(3)],
+            'new_edits': False,
+        })
+        self.assertEqual(json.loads(b''.join(bulk_docs_body([], JsonCodec()))), {'docs': []})
+
+    def test_chunks_bounded(self):
+        body = bulk_docs_body(generate_docs(1000, size=1000), JsonCodec())
+        chunks = list(body)
+        self.assertGreater(len(chunks), 10)
+        self.assertLess(max(len(chunk) for chunk in chunks), CHUNK_SIZE + 2000)
+        self.assertEqual(body.size, sum(len(chunk) for chunk in chunks))
+        self.assertEqual(len(json.loads(b''.join(chunks))['docs']), 1000)
+
+    def test_gzip(self):
+        body = StreamedBody(iter([b'{"docs":', b'[]}'])).gzip()
+        compressed = b''.join(body)
+        self.assertEqual(gzip.decompress(compressed), b'{"docs":[]}')
+        self.assertEqual(body.size, len(compressed))
+
+    @responses.activate
+    def test_post_bulk_docs_streamed(self):
+        responses.add(responses.POST, BASE_URL + '/db/_bulk_docs', status=201, json=[])
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(BASE_URL)
+        service.set_enable_gzip_compression(False)
+        service.post_bulk_docs(db='db', bulk_docs=BulkDocs(docs=generate_docs(2), new_edits=True))
+        request = responses.calls[0].request
+        self.assertEqual(request.headers['Transfer-Encoding'], 'chunked')
+        self.assertNotIn('Content-Length', request.headers)
+        self.assertEqual(json.loads(b''.join(request.body)),
+                         {'docs': [{'_id': 'doc00000', 'data': 'x' * 10}, {'_id': 'doc00001', 'data': 'x' * 10}],
+                          'new_edits': True})
+
+    @responses.activate
+    def test_file_body_compressed_and_retried(self):
+        url = BASE_URL + '/db/doc/att'
+        responses.add(responses.PUT, url, status=429, json={'error': 'too_many_requests'})
+        responses.add(responses.PUT, url, status=201, json={'ok': True})
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url(BASE_URL)
+        service.set_retry_policy(RetryPolicy(base_delay=0.01))
+        data = b'attachment ' * 10000
+        service.put_attachment(db='db', doc_id='doc', attachment_name='att', attachment=io.BytesIO(data),
+                               content_type='text/plain')
+        self.assertEqual(len(responses.calls), 2)
+        for call in responses.calls:
+            self.assertEqual(call.request.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(b''.join(call.request.body)), data)
+
+    def test_generator_not_replayable(self):
+        self.assertFalse(bulk_docs_body(generate_docs(1), JsonCodec()).gzip().replayable)
+        self.assertTrue(StreamedBody.from_bytes(b'abc').gzip().replayable)
+
+
+class TestStreamedBulkDocs(unittest.TestCase):
+    """
+    Test streamed post_bulk_docs against the FakeCouchDB server
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeCouchDB().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(authenticator=NoAuthAuthenticator())
+        self.service.set_service_url(self.server.url)
+        self.db = self.id().rpartition('.')[2]
+        self.service.put_database(db=self.db)
+
+    def test_generator(self):
+        metrics = MetricsCollector()
+        self.service.set_metrics(metrics)
+        results = self.service.post_bulk_docs(db=self.db, bulk_docs=generate_docs(2000, size=100)).get_result()
+        self.assertEqual(len(results), 2000)
+        self.assertTrue(all(result.get('ok') for result in results))
+        doc = self.service.get_document(db=self.db, doc_id='doc01999').get_result()
+        self.assertEqual(doc['data'], 'x' * 100)
+        request_bytes = metrics.snapshot()['post_bulk_docs']['request_bytes']
+        # gzip compressed repetitive documents
+        self.assertGreater(request_bytes['max'], 0)
+        self.assertLess(request_bytes['max'], 2000 * 100)
+
+    def test_list_of_dicts(self):
+        docs = [{'_id': 'a', 'value': 1}, {'_id': 'b', 'value': 2}]
+        results = self.service.post_bulk_docs(db=self.db, bulk_docs=docs).get_result()
+        self.assertEqual([result['id'] for result in results], ['a', 'b'])
+
+    def test_async(self):
+        async def post():
+            async with AsyncCloudantV1(NoAuthAuthenticator()) as service:
+                service.set_service_url(self.server.url)
+                response = await service.post_bulk_docs(db=self.db, bulk_docs=generate_docs(100))
+                return response.get_result()
+
+        # asyncio.run is only available from Python 3.7
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(post())
+        finally:
+            loop.close()
+        self.assertEqual(len(results), 100)
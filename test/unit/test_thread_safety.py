@@ -0,0 +1,199 @@
+# coding: utf-8
+
+# © Copyright IBM Corporation 2021.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Stress test of a CloudantV1 client shared by many threads
+"""
+
+import sys
+import threading
+import time
+import unittest
+
+import responses
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+from requests.cookies import create_cookie
+
+from ibmcloudant import ConnectionPool, CouchDbSessionAuthenticator
+from ibmcloudant.cloudant_v1 import CloudantV1, Document
+
+from fake_couchdb import FakeCouchDB
+
+THREADS = 24
+DURATION = 1.5
+
+
+class TestThreadSafety(unittest.TestCase):
+    """
+    Test a session authenticated client shared by threads reading, writing
+    and reconfiguring it while its session is renewed
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeCouchDB().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.service = CloudantV1(CouchDbSessionAuthenticator('adm', 'pass'))
+        self.service.set_service_url(self.server.url)
+        self.service.set_connection_pool(ConnectionPool(max_connections_per_host=THREADS))
+        self.service.put_database(db='stress')
+        self.errors = []
+        self.written = set()
+        self.written_lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def run_thread(self, target, *args):
+        def run():
+            try:
+                while not self.stop.is_set():
+                    target(*args)
+            except Exception as err:  # pylint: disable=broad-except
+                self.errors.append(err)
+                self.stop.set()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def write(self, worker):
+        doc_id = 'doc-{0}-{1}'.format(worker, time.monotonic_ns())
+        self.service.put_document(db='stress', doc_id=doc_id, document=Document(worker=worker))
+        with self.written_lock:
+            self.written.add(doc_id)
+
+    def read(self):
+        with self.written_lock:
+            doc_id = next(iter(self.written), None)
+        if doc_id is not None:
+            self.assertEqual(self.service.get_document(db='stress', doc_id=doc_id).get_result()['_id'], doc_id)
+        session = self.service.get_session_information().get_result()
+        self.assertEqual(session['userCtx']['name'], 'adm')
+
+    def reconfigure(self, counter):
+        counter[0] += 1
+        token_manager = self.service.authenticator.token_manager
+        if counter[0] % 10 == 0:
+            # all threads wait for a single new session
+            token_manager.expire_time = 0
+        else:
+            token_manager.refresh_time = 0
+        self.service.set_default_headers({'X-Stress': str(counter[0])})
+        self.service.set_http_config({'timeout': 30})
+        if counter[0] % 5 == 0:
+            self.service.set_connection_pool(ConnectionPool(max_connections_per_host=THREADS))
+        time.sleep(0.01)
+
+    def test_shared_client(self):
+        self.server.request_counts.clear()
+        counter = [0]
+        threads = [self.run_thread(self.write, worker) for worker in range(THREADS // 2)]
+        threads += [self.run_thread(self.read) for _ in range(THREADS // 2)]
+        threads.append(self.run_thread(self.reconfigure, counter))
+        self.stop.wait(DURATION)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        self.service.authenticator.token_manager.wait_for_refresh()
+        if self.errors:
+            raise self.errors[0]
+        all_docs = self.service.post_all_docs(db='stress').get_result()
+        self.assertEqual({row['id'] for row in all_docs['rows']}, self.written)
+        self.assertGreater(counter[0], 10)
+        # at most one session request per renewal
+        self.assertLessEqual(self.server.request_counts[('POST', '_session')], counter[0] + 1)
+
+
+class TestRaces(unittest.TestCase):
+    """
+    Test the state shared by threads with frequent thread switches
+    """
+
+    def setUp(self) -> None:
+        interval = sys.getswitchinterval()
+        self.addCleanup(sys.setswitchinterval, interval)
+        sys.setswitchinterval(1e-6)
+
+    def race(self, read, write, iterations=2000):
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    read()
+                except Exception as err:  # pylint: disable=broad-except
+                    errors.append(err)
+                    stop.set()
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for iteration in range(iterations):
+                if stop.is_set():
+                    break
+                write(iteration)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_set_connection_pool(self):
+        service = CloudantV1(authenticator=NoAuthAuthenticator())
+        service.set_service_url('http://cloudant.example')
+        self.race(lambda: service.get_http_client().get_adapter('http://cloudant.example/db'),
+                  lambda _: service.set_connection_pool(ConnectionPool()))
+
+    def test_session_jar(self):
+        service = CloudantV1(CouchDbSessionAuthenticator('adm', 'pass'))
+        jar = service.jar
+
+        def write(iteration):
+            jar.set_cookie(create_cookie('AuthSession', 'x', domain='host{0}.example'.format(iteration)))
+            if iteration:
+                # e.g. a session of a previous service URL removed
+                jar.clear('host{0}.example'.format(iteration - 1))
+
+        self.race(lambda: [cookie.name for cookie in jar], write)
+
+
+class TestServiceUrlChange(unittest.TestCase):
+    """
+    Test that a session requested from a previous service URL is discarded
+    """
+
+    @responses.activate
+    def test_session_of_previous_url_discarded(self):
+        service = CloudantV1(CouchDbSessionAuthenticator('adm', 'pass'))
+        service.set_service_url('http://cloudant.example')
+        token_manager = service.authenticator.token_manager
+
+        def post_session(request):
+            # the service URL changes while the session is requested
+            service.set_service_url('http://cloudant2.example')
+            return (200, {'Set-Cookie': 'AuthSession=old; Version=1; Path=/; HttpOnly; Max-Age=600'}, '{"ok":true}')
+
+        responses.add_callback(responses.POST, 'http://cloudant.example/_session', post_session)
+        responses.add(responses.POST, 'http://cloudant2.example/_session', json={'ok': True},
+                      headers={'Set-Cookie': 'AuthSession=new; Version=1; Path=/; HttpOnly; Max-Age=600'})
+        cookies = token_manager.get_token()
+        self.assertEqual([cookie.value for cookie in cookies], ['new'])
+        self.assertEqual([call.request.url for call in responses.calls],
+                         ['http://cloudant.example/_session', 'http://cloudant2.example/_session'])